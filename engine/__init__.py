@@ -0,0 +1,5 @@
+"""Shared infrastructure for the strategies in this tree.
+
+Strategies stay plain ``main.py`` files written against the Surmount API;
+nothing here is imported by them unless they opt in.
+"""
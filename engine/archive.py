@@ -0,0 +1,186 @@
+"""Memory-mapped on-disk bar archive.
+
+Deep lookbacks (3000-bar momentum, a 2000-bar SPY trend) do not need to
+live on the Python heap. Bars are kept one directory per ticker and
+interval, one flat file per column::
+
+    <root>/<interval>/<TICKER>/timestamp.i8
+    <root>/<interval>/<TICKER>/open.f8  high.f8  low.f8  close.f8  volume.f8
+
+Readers map the files read-only, so a window only faults in the pages it
+touches and every process reading the same archive shares one copy in
+the page cache. Writers only ever append, price columns first and the
+timestamp column last, so a reader never sees a timestamp whose prices
+are not yet on disk. A writer trims whatever an interrupted append left
+beyond the last timestamp, and skips bars not newer than the last one
+stored, so replaying a feed or a file into an archive is idempotent.
+"""
+import os
+
+import numpy as np
+
+from engine.sessions import stamp, to_epoch
+from engine.store import FIELDS
+
+COLUMNS = (("timestamp", np.int64),) + tuple((f, np.float64) for f in FIELDS)
+_SUFFIX = {np.int64: "i8", np.float64: "f8"}
+
+
+def _path(directory, field, dtype):
+    return os.path.join(directory, f"{field}.{_SUFFIX[dtype]}")
+
+
+class ArchiveWriter:
+    """Appends bars for one ticker and interval.
+
+    Bars stamped at or before ``last``, the newest timestamp stored or
+    pending, are skipped.
+    """
+
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._pending = []
+        self.last = self._recover()
+
+    def _recover(self):
+        """Trim columns to the stored timestamps; returns the last one."""
+        stamps = _path(self.directory, "timestamp", np.int64)
+        size = os.path.getsize(stamps) // 8 if os.path.exists(stamps) else 0
+        for name, dtype in COLUMNS:
+            path = _path(self.directory, name, dtype)
+            if os.path.exists(path) and os.path.getsize(path) > size * 8:
+                os.truncate(path, size * 8)
+        if not size:
+            return np.iinfo(np.int64).min
+        return int(np.fromfile(stamps, dtype=np.int64, offset=(size - 1) * 8)[0])
+
+    def append(self, bar):
+        epoch = stamp(bar)
+        if epoch <= self.last:
+            return
+        self.last = epoch
+        self._pending.append((epoch, [bar[f] for f in FIELDS]))
+
+    def extend(self, columns):
+        """Append whole columns at once: ``{"timestamp": ..., "close": ...}``."""
+        self.flush()
+        columns = {name: np.asarray(columns[name], dtype=dtype) for name, dtype in COLUMNS}
+        stamps = columns["timestamp"]
+        if not len(stamps):
+            return
+        newest = np.maximum.accumulate(np.concatenate(([self.last], stamps[:-1])))
+        keep = stamps > newest
+        self.last = max(self.last, int(stamps.max()))
+        self._write({name: values[keep] for name, values in columns.items()})
+
+    def flush(self):
+        if not self._pending:
+            return
+        stamps, rows = zip(*self._pending)
+        prices = np.array(rows, dtype=np.float64)
+        columns = {"timestamp": np.array(stamps, dtype=np.int64)}
+        for i, f in enumerate(FIELDS):
+            columns[f] = prices[:, i]
+        self._pending = []
+        self._write(columns)
+
+    def _write(self, columns):
+        for name, dtype in COLUMNS[1:] + COLUMNS[:1]:
+            with open(_path(self.directory, name, dtype), "ab") as fh:
+                columns[name].tofile(fh)
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveSeries:
+    """Read-only mapped columns for one ticker and interval."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._maps = {}
+        self._length = 0
+        self.refresh()
+
+    def refresh(self):
+        """Remap if writers have appended since the last look."""
+        sizes = {}
+        for name, dtype in COLUMNS:
+            path = _path(self.directory, name, dtype)
+            sizes[name] = os.path.getsize(path) // np.dtype(dtype).itemsize if os.path.exists(path) else 0
+        length = min(sizes.values())
+        if length == self._length and self._maps:
+            return length
+        self._length = length
+        for name, dtype in COLUMNS:
+            if length:
+                self._maps[name] = np.memmap(_path(self.directory, name, dtype),
+                                             dtype=dtype, mode="r", shape=(length,))
+            else:
+                self._maps[name] = np.empty(0, dtype=dtype)
+        return length
+
+    def __len__(self):
+        return self._length
+
+    def column(self, field):
+        return self._maps[field]
+
+    def window(self, field, n, end=None):
+        """The ``n`` values of ``field`` ending before row ``end`` (default: all)."""
+        end = self._length if end is None else max(0, min(end, self._length))
+        return self._maps[field][max(0, end - n):end]
+
+    def between(self, start, stop):
+        """Row range ``[i, j)`` whose timestamps fall in ``[start, stop)``."""
+        stamps = self._maps["timestamp"]
+        return (int(np.searchsorted(stamps, to_epoch(start), "left")),
+                int(np.searchsorted(stamps, to_epoch(stop), "left")))
+
+    def tail(self, n):
+        """The last ``n`` bars as a dict of column views."""
+        return {name: self.window(name, n) for name, _ in COLUMNS}
+
+    def close(self, n=None):
+        return self.column("close") if n is None else self.window("close", n)
+
+
+class BarArchive:
+    """Root of an archive; hands out writers and mapped readers."""
+
+    def __init__(self, root):
+        self.root = root
+
+    def _directory(self, ticker, interval):
+        return os.path.join(self.root, interval, ticker)
+
+    def writer(self, ticker, interval):
+        return ArchiveWriter(self._directory(ticker, interval))
+
+    def open(self, ticker, interval):
+        return ArchiveSeries(self._directory(ticker, interval))
+
+    def tickers(self, interval):
+        directory = os.path.join(self.root, interval)
+        return sorted(os.listdir(directory)) if os.path.isdir(directory) else []
+
+    def write_feed(self, feed, interval):
+        """Persist every bar a ``Feed`` has indexed so far, in arrival order.
+
+        Bars the archive already holds are skipped, so writing the same
+        feed again after it has grown appends only the new bars.
+        """
+        writers = {}
+        for _, ticker, bar in feed.events():
+            if ticker not in writers:
+                writers[ticker] = self.writer(ticker, interval)
+            writers[ticker].append(bar)
+        for w in writers.values():
+            w.close()
@@ -0,0 +1,428 @@
+"""Offline event-driven backtests for the strategies in this tree.
+
+``Bars`` holds aligned OHLCV history loaded from CSV or Parquet (or a
+``BarArchive``). ``Backtest`` walks it bar by bar: each bar goes into a
+``Feed``, the strategy's ``run`` receives ``data`` with ``ohlcv`` in the
+layout it was written against plus ``holdings`` (weights) and
+``positions`` (``{ticker: {"quantity": shares}}``), and the allocation it
+returns is applied to a ``Portfolio`` at that bar's close:
+
+    TargetAllocation / dict    rebalance to those weights; tickers left
+                               out are sold, gross weight above 1 is
+                               scaled down to 1
+    None                       hold
+
+Bar dicts are built once per ``Bars`` and shared by every backtest in the
+process, already stamped, so the per-bar cost is the strategy's own.
+``run_many`` spreads strategy directories over forked workers that
+inherit the loaded bars.
+
+    python -m engine.backtest BARS [STRATEGY ...] [--capital N] [--workers N] [--event]
+"""
+import argparse
+import inspect
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine import metrics
+from engine.feed import ROWS, SNAPSHOTS, TICKERS, Feed
+from engine.loader import discover, load_module
+from engine.sessions import OPEN_MINUTE
+from engine.store import FIELDS
+
+_ORDINAL_1970 = 719163
+_DATE_COLUMNS = ("date", "datetime", "timestamp", "time")
+_SYMBOL_COLUMNS = ("symbol", "ticker")
+_ROWS_FILTER = re.compile(r'\[["\']symbol["\']\]\s*==')
+_TICKER_INDEX = re.compile(r'\b(?:d|ohlcv|data\["ohlcv"\])\[(?!\s*-|\s*\d|\s*:)[^\]\[]+\]')
+
+
+class Bars:
+    """Aligned OHLCV history: ``(tickers, time)`` arrays, NaN where a
+    ticker has no bar at that timestamp."""
+
+    def __init__(self, tickers, epochs, prices, interval=None):
+        self.tickers = list(tickers)
+        self.epochs = np.asarray(epochs, dtype=np.int64)
+        self.interval = interval
+        for field in FIELDS:
+            setattr(self, field, np.asarray(prices[field], dtype=np.float64))
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+        self._dates = None
+        self._records = {}
+
+    def __len__(self):
+        return len(self.epochs)
+
+    def __contains__(self, ticker):
+        return ticker in self._index
+
+    def index(self, ticker):
+        return self._index[ticker]
+
+    @classmethod
+    def from_frame(cls, frame, interval=None):
+        """From a long frame with date, symbol and OHLCV columns."""
+        columns = {str(c).lower(): c for c in frame.columns}
+        date = next(columns[c] for c in _DATE_COLUMNS if c in columns)
+        symbol = next(columns[c] for c in _SYMBOL_COLUMNS if c in columns)
+        stamps = pd.to_datetime(frame[date])
+        if stamps.dt.tz is not None:
+            stamps = stamps.dt.tz_localize(None)
+        epochs = stamps.to_numpy().astype("datetime64[s]").astype(np.int64)
+        times = np.unique(epochs)
+        tickers, rows = np.unique(frame[symbol].astype(str).to_numpy(), return_inverse=True)
+        cols = np.searchsorted(times, epochs)
+        prices = {}
+        for field in FIELDS:
+            out = np.full((len(tickers), len(times)), np.nan)
+            source = columns.get(field)
+            if source is not None:
+                out[rows, cols] = frame[source].to_numpy(dtype=np.float64)
+            elif field == "volume":
+                out[rows, cols] = 0.0
+            prices[field] = out
+        return cls(tickers.tolist(), times, prices, interval)
+
+    @classmethod
+    def from_archive(cls, archive, interval, tickers=None):
+        tickers = list(tickers or archive.tickers(interval))
+        series = [archive.open(t, interval) for t in tickers]
+        stamps = [np.asarray(s.column("timestamp")) for s in series]
+        times = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, np.int64)
+        prices = {f: np.full((len(tickers), len(times)), np.nan) for f in FIELDS}
+        for i, (s, stamp) in enumerate(zip(series, stamps)):
+            cols = np.searchsorted(times, stamp)
+            for field in FIELDS:
+                prices[field][i, cols] = s.column(field)
+        return cls(tickers, times, prices, interval)
+
+    def slice(self, start=0, stop=None):
+        """The bars in ``[start, stop)``; arrays are views, not copies."""
+        window = slice(start, stop)
+        return Bars(self.tickers, self.epochs[window],
+                    {f: getattr(self, f)[:, window] for f in FIELDS}, self.interval)
+
+    def select(self, tickers):
+        rows = [self._index[t] for t in tickers]
+        return Bars([self.tickers[i] for i in rows], self.epochs,
+                    {f: getattr(self, f)[rows] for f in FIELDS}, self.interval)
+
+    def dates(self):
+        """``"YYYY-MM-DD HH:MM:SS"`` per timestamp."""
+        if self._dates is None:
+            text = np.datetime_as_string(self.epochs.astype("datetime64[s]"), unit="s")
+            self._dates = np.char.replace(text, "T", " ").tolist()
+        return self._dates
+
+    def records(self, ticker):
+        """One stamped bar dict per timestamp for ``ticker``, None where it
+        has no bar. Built once and shared; strategies must not mutate them."""
+        out = self._records.get(ticker)
+        if out is None:
+            i = self._index[ticker]
+            dates = self.dates()
+            epochs = self.epochs.tolist()
+            sessions = (self.epochs // 86400 + _ORDINAL_1970).tolist()
+            minutes = (self.epochs % 86400 // 60 - OPEN_MINUTE).tolist()
+            out = []
+            for t, (o, h, l, c, v) in enumerate(zip(*(getattr(self, f)[i].tolist() for f in FIELDS))):
+                if c != c:
+                    out.append(None)
+                    continue
+                out.append({"open": o, "high": h, "low": l, "close": c, "volume": v,
+                            "date": dates[t], "symbol": ticker,
+                            "epoch": epochs[t], "session": sessions[t], "minute": minutes[t]})
+            self._records[ticker] = out
+        return out
+
+
+def _read(path):
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def load_bars(path, interval=None):
+    """``Bars`` from one long CSV/Parquet file (with a symbol column) or a
+    directory of per-ticker files named ``<TICKER>.csv`` / ``.parquet``."""
+    if not os.path.isdir(path):
+        return Bars.from_frame(_read(path), interval)
+    frames = []
+    for name in sorted(os.listdir(path)):
+        ticker, ext = os.path.splitext(name)
+        if ext in (".csv", ".parquet"):
+            frame = _read(os.path.join(path, name))
+            if not any(str(c).lower() in _SYMBOL_COLUMNS for c in frame.columns):
+                frame["symbol"] = ticker
+            frames.append(frame)
+    return Bars.from_frame(pd.concat(frames, ignore_index=True), interval)
+
+
+def guess_layout(source):
+    """The ``data["ohlcv"]`` layout a strategy's source is written against."""
+    if _ROWS_FILTER.search(source):
+        return ROWS
+    if "from surmount.base import" in source or _TICKER_INDEX.search(source):
+        return TICKERS
+    return SNAPSHOTS
+
+
+def allocation(result):
+    """Target weights from whatever ``run`` returned; None means hold."""
+    if result is None:
+        return None
+    weights = getattr(result, "target_allocation", result)
+    return {t: float(w) for t, w in weights.items() if w is not None and w == w}
+
+
+class Portfolio:
+    """Cash plus share counts, rebalanced to target weights.
+
+    ``cost`` is charged on traded notional, as a fraction.
+    """
+
+    def __init__(self, capital=100_000.0, cost=0.0):
+        self.cash = float(capital)
+        self.cost = cost
+        self.shares = {}
+        self.trades = 0
+        self.turnover = 0.0
+
+    def value(self, prices):
+        return self.cash + sum(q * prices[t] for t, q in self.shares.items())
+
+    def weights(self, prices):
+        equity = self.value(prices)
+        if equity <= 0:
+            return {t: 0.0 for t in self.shares}
+        return {t: q * prices[t] / equity for t, q in self.shares.items()}
+
+    def positions(self):
+        return {t: {"quantity": q} for t, q in self.shares.items()}
+
+    def rebalance(self, targets, prices):
+        """Trade to ``targets`` at ``prices``; unpriced tickers are left alone."""
+        equity = self.value(prices)
+        gross = sum(abs(w) for w in targets.values())
+        scale = 1.0 / gross if gross > 1.0 else 1.0
+        for ticker in set(self.shares).union(targets):
+            price = prices.get(ticker)
+            if price is None or not price > 0:
+                continue
+            want = targets.get(ticker, 0.0) * scale * equity / price
+            held = self.shares.get(ticker, 0.0)
+            notional = (want - held) * price
+            if abs(notional) <= 1e-9 * abs(equity):
+                continue
+            self.cash -= notional + abs(notional) * self.cost
+            self.trades += 1
+            self.turnover += abs(notional) / equity if equity else 0.0
+            if want:
+                self.shares[ticker] = want
+            else:
+                del self.shares[ticker]
+
+
+class Result:
+    """Equity curve and counters from one backtest.
+
+    ``kernel`` names the ``engine.vectorized`` kernel that produced it,
+    None for the event loop.
+    """
+
+    def __init__(self, name, interval, epochs, equity, trades=0, turnover=0.0,
+                 bars=0, elapsed=0.0, error=None, kernel=None):
+        self.name = name
+        self.interval = interval
+        self.epochs = epochs
+        self.equity = equity
+        self.trades = trades
+        self.turnover = turnover
+        self.bars = bars
+        self.elapsed = elapsed
+        self.error = error
+        self.kernel = kernel
+
+    @property
+    def bars_per_second(self):
+        return self.bars / self.elapsed if self.elapsed > 0 else 0.0
+
+    def metrics(self):
+        out = metrics.summary(self.equity, metrics.periods_per_year(self.interval))
+        out.update(trades=self.trades, turnover=self.turnover)
+        return out
+
+
+def _reset_platform():
+    # The stand-in indicators and log buffer are module state; a backtest
+    # starting over from the first bar must not see the previous one's.
+    indicators = sys.modules.get("surmount.technical_indicators")
+    if indicators is not None and hasattr(indicators, "reset"):
+        indicators.reset()
+    logging = sys.modules.get("surmount.logging")
+    if logging is not None and hasattr(logging, "messages"):
+        logging.messages.clear()
+
+
+class Backtest:
+    """One strategy instance trading ``bars[start:stop]``.
+
+    Bars before ``start`` are history: they are in ``ohlcv`` from the
+    first ``run``, as the platform's lookback would be. ``lookback`` is
+    how many bars of history ``ohlcv`` holds at most, like the platform's
+    buffer. ``layout`` defaults to the one guessed from the strategy's
+    source.
+    """
+
+    def __init__(self, strategy, bars, capital=100_000.0, cost=0.0, layout=None,
+                 start=0, stop=None, name=None, lookback=4096):
+        self.strategy = strategy
+        self.bars = bars
+        self.capital = capital
+        self.cost = cost
+        self.layout = layout or self._layout(strategy)
+        self.start = start
+        self.stop = len(bars) if stop is None else stop
+        self.name = name or type(strategy).__module__
+        self.lookback = lookback
+
+    @staticmethod
+    def _layout(strategy):
+        try:
+            return guess_layout(inspect.getsource(inspect.getmodule(type(strategy))))
+        except (OSError, TypeError):
+            return SNAPSHOTS
+
+    def run(self):
+        strategy, bars = self.strategy, self.bars
+        tickers = [t for t in dict.fromkeys(strategy.assets) if t in bars]
+        records = [bars.records(t) for t in tickers]
+        feed = Feed(self.lookback)
+        view, layout = feed.view, self.layout
+        portfolio = Portfolio(self.capital, self.cost)
+        prices = {}
+        equity = np.empty(self.stop - self.start)
+        fed = 0
+        _reset_platform()
+        began = time.perf_counter()
+        for step in range(self.start):
+            for ticker, series in zip(tickers, records):
+                bar = series[step]
+                if bar is not None:
+                    feed.append(ticker, bar)
+                    prices[ticker] = bar["close"]
+        for i, step in enumerate(range(self.start, self.stop)):
+            fresh = False
+            for ticker, series in zip(tickers, records):
+                bar = series[step]
+                if bar is not None:
+                    feed.append(ticker, bar)
+                    prices[ticker] = bar["close"]
+                    fresh = True
+            if fresh:
+                fed += 1
+                data = {"ohlcv": view(layout), "holdings": portfolio.weights(prices),
+                        "positions": portfolio.positions()}
+                targets = allocation(strategy.run(data))
+                if targets is not None:
+                    portfolio.rebalance(targets, prices)
+            equity[i] = portfolio.value(prices)
+        elapsed = time.perf_counter() - began
+        return Result(self.name, getattr(strategy, "interval", None),
+                      bars.epochs[self.start:self.stop], equity,
+                      portfolio.trades, portfolio.turnover, fed * len(tickers), elapsed)
+
+
+def run_path(path, bars, fast=True, params=None, **kwargs):
+    """Load the strategy at ``path`` and backtest a fresh instance of it.
+
+    ``params`` are set on the instance as ``engine.sweep.apply`` does.
+    ``fast`` goes through ``engine.vectorized``, which falls back to the
+    event loop for strategies it has no kernel for.
+    """
+    name = os.path.basename(os.path.normpath(path))
+    try:
+        strategy = load_module(path).TradingStrategy()
+        if params:
+            from engine.sweep import apply
+            apply(strategy, params)
+        if fast:
+            from engine.vectorized import backtest
+            return backtest(strategy, bars, name=name, **kwargs)
+        return Backtest(strategy, bars, name=name, **kwargs).run()
+    except Exception as exc:
+        return Result(name, None, bars.epochs[:0], np.empty(0), error=f"{type(exc).__name__}: {exc}")
+
+
+_worker_bars = None
+
+
+def _init_worker(bars):
+    global _worker_bars
+    _worker_bars = bars
+
+
+def _run_task(task):
+    path, kwargs = task
+    return run_path(path, _worker_bars, **kwargs)
+
+
+def run_many(paths, bars, workers=None, params=None, **kwargs):
+    """``run_path`` for every path, spread over worker processes.
+
+    ``params`` maps a path to the parameters its instance gets. With the
+    fork start method the workers inherit ``bars`` (and the bar dicts
+    already built) instead of unpickling them.
+    """
+    workers = workers or os.cpu_count()
+    params = params or {}
+    tasks = [(p, dict(kwargs, params=params.get(p))) for p in paths]
+    if workers <= 1:
+        return [run_path(p, bars, **options) for p, options in tasks]
+    method = "fork" if "fork" in multiprocessing.get_all_start_methods() else None
+    context = multiprocessing.get_context(method)
+    with context.Pool(workers, _init_worker, (bars,)) as pool:
+        return pool.map(_run_task, tasks, chunksize=1)
+
+
+def _format(result):
+    name = f"{result.name:40}"
+    if result.error:
+        return f"{name} {result.error}"
+    m = result.metrics()
+    return (f"{name} {m['terminal']:14,.0f} {m['sharpe']:7.2f} {m['max_drawdown']:7.1%}"
+            f" {m['trades']:7d} {result.bars_per_second:11,.0f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.backtest", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategies", nargs="*", help="strategy directories (default: all under cwd)")
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--cost", type=float, default=0.0, help="fraction of traded notional")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--start", type=int, default=0, help="bars of history before trading begins")
+    parser.add_argument("--event", action="store_true", help="never use the vectorized kernels")
+    args = parser.parse_args(argv)
+    bars = load_bars(args.bars)
+    paths = args.strategies or discover(os.getcwd())
+    began = time.perf_counter()
+    results = run_many(paths, bars, args.workers, fast=not args.event,
+                       capital=args.capital, cost=args.cost, start=args.start)
+    elapsed = time.perf_counter() - began
+    print(f"{'strategy':40} {'terminal':>14} {'sharpe':>7} {'max dd':>7} {'trades':>7} {'bars/s':>11}")
+    for result in sorted(results, key=lambda r: r.name):
+        print(_format(result))
+    total = sum(r.bars for r in results)
+    print(f"{len(results)} strategies, {total:,} bars in {elapsed:.1f}s ({total / elapsed:,.0f} bars/s)")
+
+
+if __name__ == "__main__":
+    main()
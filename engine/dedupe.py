@@ -0,0 +1,210 @@
+"""Content-addressed strategies: run each distinct one once.
+
+Many directories in this tree hold the same strategy (37 copies of the
+fixed-weight template alone). ``strategy_hash`` hashes a ``main.py`` by
+its AST with docstrings and source positions dropped, so comments,
+formatting and docstring edits do not split a group, plus any parameters
+injected from outside. ``StrategyRegistry`` groups directories by that
+hash, backtests one representative per group and hands each directory
+its own copy of the result. Directories given different parameters land
+in different groups even when their source is the same.
+
+``ResultCache`` keeps results on disk under (engine hash, strategy hash,
+data hash). ``data_hash`` covers the bars in the backtest range, their
+interval and the backtest options, and ``engine_hash`` the harness that produced the
+result: the source of ``engine`` and the numpy and pandas versions. A
+nightly run over unchanged strategies and data is all cache hits, and a
+fix to the harness invalidates every result it could have changed.
+
+    python -m engine.dedupe BARS [STRATEGY ...] [--cache DIR] [--groups]
+"""
+import argparse
+import ast
+import copy
+import hashlib
+import os
+import pickle
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import _format, load_bars, run_many
+from engine.loader import discover, main_path
+from engine.store import FIELDS
+
+
+def _strip_docstrings(tree):
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def normalized_source(path):
+    """The AST dump hashed for ``path``; raw bytes when it does not parse."""
+    with open(main_path(path), "rb") as f:
+        source = f.read()
+    try:
+        tree = ast.parse(source)
+    except (SyntaxError, ValueError):
+        return b"raw:" + source
+    return ast.dump(_strip_docstrings(tree), include_attributes=False).encode()
+
+
+def strategy_hash(path, params=None):
+    digest = hashlib.sha256(normalized_source(path))
+    if params:
+        digest.update(repr(sorted(params.items())).encode())
+    return digest.hexdigest()[:16]
+
+
+_engine = None
+
+
+def engine_hash():
+    """Hash of every ``.py`` file in ``engine`` and the numpy/pandas versions."""
+    global _engine
+    if _engine is None:
+        root = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256(f"numpy {np.__version__} pandas {pd.__version__}".encode())
+        for directory, dirs, files in os.walk(root):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(f for f in files if f.endswith(".py")):
+                path = os.path.join(directory, name)
+                digest.update(os.path.relpath(path, root).encode() + b"\0")
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+        _engine = digest.hexdigest()[:16]
+    return _engine
+
+
+def data_hash(bars, **options):
+    """Hash of the bars a backtest with ``options`` reads, and the options."""
+    stop = options.get("stop")
+    stop = len(bars) if stop is None else stop
+    digest = hashlib.sha256(repr(sorted(options.items())).encode())
+    digest.update(f"interval {bars.interval}\0".encode())
+    digest.update("\0".join(bars.tickers).encode())
+    digest.update(bars.epochs[:stop].tobytes())
+    for field in FIELDS:
+        digest.update(getattr(bars, field)[:, :stop].tobytes())
+    return digest.hexdigest()[:16]
+
+
+class ResultCache:
+    """Pickled backtest results at ``<root>/<engine>/<strategy hash>/<data hash>.pkl``.
+
+    ``engine`` defaults to ``engine_hash()``.
+    """
+
+    def __init__(self, root, engine=None):
+        self.root = root
+        self.engine = engine_hash() if engine is None else engine
+
+    def _path(self, strategy, data):
+        return os.path.join(self.root, self.engine, strategy, data + ".pkl")
+
+    def get(self, strategy, data):
+        try:
+            with open(self._path(strategy, data), "rb") as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def put(self, strategy, data, result):
+        path = self._path(strategy, data)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(result, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+
+class StrategyRegistry:
+    """Strategy directories grouped by ``strategy_hash``.
+
+    ``params`` maps a directory to the parameters set on its instance
+    (see ``engine.sweep.apply``); they are part of its hash.
+    """
+
+    def __init__(self, paths, params=None):
+        self.groups = {}
+        self.hashes = {}
+        self.params = dict(params or {})
+        for path in paths:
+            key = strategy_hash(path, self.params.get(path))
+            self.hashes[path] = key
+            self.groups.setdefault(key, []).append(path)
+
+    @classmethod
+    def discover(cls, root):
+        return cls(discover(root))
+
+    def __len__(self):
+        return len(self.groups)
+
+    def duplicates(self):
+        """Groups with more than one directory, largest first."""
+        return sorted((paths for paths in self.groups.values() if len(paths) > 1), key=len, reverse=True)
+
+    def representatives(self):
+        return {key: paths[0] for key, paths in self.groups.items()}
+
+    def run(self, bars, cache=None, workers=None, **options):
+        """``{path: Result}`` for every directory, backtesting each group at
+        most once and not at all when ``cache`` already has its result."""
+        data = data_hash(bars, **options)
+        shared, missing = {}, []
+        for key, path in self.representatives().items():
+            cached = cache.get(key, data) if cache is not None else None
+            if cached is not None:
+                shared[key] = cached
+            else:
+                missing.append((key, path))
+        todo = [path for _, path in missing]
+        fresh = run_many(todo, bars, workers, self.params, **options) if missing else []
+        for (key, _), result in zip(missing, fresh):
+            shared[key] = result
+            if cache is not None and not result.error:
+                cache.put(key, data, result)
+        out = {}
+        for key, paths in self.groups.items():
+            for path in paths:
+                result = copy.copy(shared[key])
+                result.name = os.path.basename(os.path.normpath(path))
+                out[path] = result
+        return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.dedupe", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", nargs="?", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategies", nargs="*", help="strategy directories (default: all under cwd)")
+    parser.add_argument("--cache", default=None, help="result cache directory")
+    parser.add_argument("--groups", action="store_true", help="list duplicate groups and exit")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--start", type=int, default=0)
+    args = parser.parse_args(argv)
+    registry = StrategyRegistry(args.strategies or discover(os.getcwd()))
+    total = sum(len(paths) for paths in registry.groups.values())
+    print(f"{total} strategies, {len(registry)} distinct")
+    if args.groups or args.bars is None:
+        for paths in registry.duplicates():
+            names = ", ".join(os.path.basename(os.path.normpath(p))[:8] for p in paths)
+            print(f"{len(paths):4d}  {registry.hashes[paths[0]]}  {names}")
+        return
+    cache = ResultCache(args.cache) if args.cache else None
+    began = time.perf_counter()
+    results = registry.run(load_bars(args.bars), cache, args.workers, start=args.start)
+    elapsed = time.perf_counter() - began
+    for result in sorted(results.values(), key=lambda r: r.name):
+        print(_format(result))
+    print(f"{len(results)} results from {len(registry)} distinct strategies in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
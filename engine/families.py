@@ -0,0 +1,499 @@
+"""Strategy families: variants that differ only in literal constants.
+
+Whole groups of directories in this tree are one strategy with different
+numbers in it: the twelve conviction scalpers (``rvol_threshold``,
+``take_profit_pct``, ``trailing_stop_pct``, ``max_allocation``), the
+VENTURE NITRO copies (``atr_multiplier_map``), and so on. A ``Family`` is
+such a group. Members are compared by their AST with docstrings and
+``log`` calls dropped and every constant blanked out. The constants that
+differ become the family's parameter vector, one vector per member, and
+``build(vector)`` compiles the template with any vector, including ones
+no directory holds.
+
+``Family.backtest`` runs every variant in lockstep over one shared feed:
+each bar is ingested once and each variant steps its own ``run`` and
+portfolio. Identical vectors run once, and a variant that trades a
+different asset list than the rest (a swapped ticker) sees different bars
+and runs in its own group.
+
+Indicator work is shared only through a ``FamilyKernel``, written by hand
+for one template like the kernels of ``engine.vectorized``. A kernel
+stands in for the variant's ``run``: it computes the per-bar values that
+do not depend on the variant once per group, keyed by the template
+constants they read, and steps each variant's state machine (stops,
+peaks, entries, all of it on the instance) separately. Only scalars are
+shared, so no variant can change what another one sees. Families without
+a kernel share only the feed and cost about one member per variant.
+
+    conviction  the VWAP / RVOL scalpers of 07321b2d and 21f5b20d: the
+                conviction score of every ticker is computed once per bar
+
+    python -m engine.families [BARS] [STRATEGY ...] [--start N]
+"""
+import argparse
+import ast
+import copy
+import os
+import time
+import types
+
+import numpy as np
+import pandas as pd
+
+from engine import stubs
+from engine.backtest import (Portfolio, Result, _format, _reset_platform, allocation, guess_layout,
+                             load_bars)
+from engine.feed import Feed
+from engine.loader import discover, main_path, module_name
+from engine.vectorized import _Quiet, _function, _same
+
+
+# -- family extraction --------------------------------------------------------
+
+def template(path):
+    """The AST of ``path``'s ``main.py`` with docstrings and ``log`` calls dropped."""
+    with open(main_path(path), "rb") as f:
+        return _Quiet().visit(ast.parse(f.read()))
+
+
+def _constants(tree):
+    return [node for node in ast.walk(tree) if isinstance(node, ast.Constant)]
+
+
+class _Blank(ast.NodeTransformer):
+
+    def visit_Constant(self, node):
+        return ast.Constant(value=None)
+
+
+def family_key(tree):
+    """The template's AST dump with every constant blanked."""
+    return ast.dump(_Blank().visit(copy.deepcopy(tree)), include_attributes=False)
+
+
+def _typed(value):
+    return type(value).__name__, repr(value)
+
+
+def _labels(tree, nodes):
+    """A readable name per constant: the attribute, variable or dict key it
+    is assigned to, else ``function:line``."""
+    parents, functions = {}, {}
+    for parent in ast.walk(tree):
+        for child in ast.iter_child_nodes(parent):
+            parents[child] = parent
+        if isinstance(parent, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            for child in ast.walk(parent):
+                functions.setdefault(child, parent.name)
+
+    def label(node):
+        parent = parents.get(node)
+        if isinstance(parent, (ast.Assign, ast.AnnAssign)):
+            target = parent.targets[0] if isinstance(parent, ast.Assign) else parent.target
+            if isinstance(target, ast.Name):
+                return target.id
+            if isinstance(target, ast.Attribute):
+                return target.attr
+        if isinstance(parent, ast.Dict) and node in parent.values:
+            key = parent.keys[parent.values.index(node)]
+            outer = label(parent)
+            if outer and isinstance(key, ast.Constant):
+                return f"{outer}[{key.value!r}]"
+        if isinstance(parent, (ast.List, ast.Tuple)):
+            outer = label(parent)
+            if outer:
+                return f"{outer}[{parent.elts.index(node)}]"
+        return None
+
+    out, seen = [], {}
+    for node in nodes:
+        name = label(node) or f"{functions.get(node, 'module')}:{node.lineno}"
+        seen[name] = seen.get(name, 0) + 1
+        out.append(name if seen[name] == 1 else f"{name}#{seen[name]}")
+    return out
+
+
+
+class Family:
+    """Strategy directories whose templates differ only in constants.
+
+    ``parameters`` names the constants that differ and ``vectors`` holds
+    each member's values for them, in ``paths`` order. Backtesting the
+    family costs about one member only when a ``FamilyKernel`` matches it;
+    other families share just the feed.
+    """
+
+    def __init__(self, paths):
+        self.paths = list(paths)
+        trees = [template(path) for path in self.paths]
+        keys = {family_key(tree) for tree in trees}
+        if len(keys) > 1:
+            raise ValueError("strategies differ in more than constants")
+        self.tree = trees[0]
+        values = [[node.value for node in _constants(tree)] for tree in trees]
+        self.slots = [i for i in range(len(values[0]))
+                      if len({_typed(member[i]) for member in values}) > 1]
+        self.parameters = _labels(self.tree, [_constants(self.tree)[i] for i in self.slots])
+        self.vectors = [tuple(member[i] for i in self.slots) for member in values]
+        with open(main_path(self.paths[0])) as f:
+            self.layout = guess_layout(f.read())
+        self.sharing = {}
+        self._built = 0
+
+    def __len__(self):
+        return len(self.paths)
+
+    @property
+    def names(self):
+        return [os.path.basename(os.path.normpath(path)) for path in self.paths]
+
+    def vector(self, **values):
+        """The first member's vector with ``values`` (by parameter name) replaced."""
+        out = list(self.vectors[0])
+        for name, value in values.items():
+            out[self.parameters.index(name)] = value
+        return tuple(out)
+
+    def _tree(self, vector):
+        if len(vector) != len(self.slots):
+            raise ValueError(f"expected {len(self.slots)} values, got {len(vector)}")
+        tree = copy.deepcopy(self.tree)
+        constants = _constants(tree)
+        for slot, value in zip(self.slots, vector):
+            constants[slot].value = value
+        return tree
+
+    def build(self, vector):
+        """``TradingStrategy`` compiled from the template with ``vector``."""
+        tree = ast.fix_missing_locations(self._tree(vector))
+        stubs.install()
+        self._built += 1
+        module = types.ModuleType(f"{module_name(self.paths[0])}_variant{self._built}")
+        module.__file__ = main_path(self.paths[0])
+        exec(compile(tree, module.__file__, "exec"), module.__dict__)
+        return module.TradingStrategy
+
+    def backtest(self, bars, vectors=None, capital=100_000.0, cost=0.0, start=0, stop=None, names=None,
+                 share=True):
+        """One ``Result`` per vector (every member's by default), all from
+        one lockstep pass per distinct asset list. Equal vectors run once
+        and their results are copied under each name.
+
+        Variants a ``FamilyKernel`` matches run through it unless ``share``
+        is False. ``sharing`` then says, per name, how it ran.
+        """
+        if vectors is None:
+            vectors, names = self.vectors, names or self.names
+        names = names or [f"{self.names[0]}#{i}" for i in range(len(vectors))]
+        stop = len(bars) if stop is None else stop
+        first = {}
+        for i, vector in enumerate(vectors):
+            first.setdefault(tuple(map(_typed, vector)), i)
+        results = [None] * len(vectors)
+        groups = {}
+        self.sharing = {}
+        for i in sorted(first.values()):
+            try:
+                strategy = self.build(vectors[i])()
+                kernel, bound = recognize(self._tree(vectors[i])) if share else (None, None)
+            except Exception as exc:
+                results[i] = _failed(names[i], bars, exc)
+                continue
+            key = tuple(t for t in dict.fromkeys(strategy.assets) if t in bars)
+            groups.setdefault(key, []).append((i, strategy, kernel, bound))
+        for tickers, members in groups.items():
+            shared = {}
+            runs, kernels = [], []
+            for _, strategy, kernel, bound in members:
+                runs.append(strategy.run if kernel is None else kernel.bind(strategy, bound, shared))
+                kernels.append("family" if kernel is None else f"family-{kernel.name}")
+            group = [names[i] for i, *_ in members]
+            strategies = [strategy for _, strategy, *_ in members]
+            found = _lockstep(strategies, runs, group, kernels, tickers, bars, shared, capital, cost,
+                              self.layout, start, stop)
+            for (i, _, kernel, _), result in zip(members, found):
+                results[i] = result
+                if kernel is not None:
+                    self.sharing[names[i]] = f"kernel {kernel.name}"
+                else:
+                    self.sharing[names[i]] = "sharing off" if not share else "no family kernel"
+        for i, vector in enumerate(vectors):
+            if results[i] is None:
+                j = first[tuple(map(_typed, vector))]
+                results[i] = copy.copy(results[j])
+                results[i].name = names[i]
+                self.sharing[names[i]] = self.sharing.get(names[j], "failed to build")
+        return results
+
+
+def families(paths):
+    """Every ``Family`` of two or more among ``paths``, largest first.
+    Directories whose ``main.py`` does not parse are left out."""
+    groups = {}
+    for path in paths:
+        try:
+            key = family_key(template(path))
+        except (SyntaxError, ValueError):
+            continue
+        groups.setdefault(key, []).append(path)
+    return [Family(group) for group in sorted(groups.values(), key=len, reverse=True) if len(group) > 1]
+
+
+def _failed(name, bars, exc):
+    return Result(name, None, bars.epochs[:0], np.empty(0), error=f"{type(exc).__name__}: {exc}")
+
+
+
+def _lockstep(strategies, runs, names, kernels, tickers, bars, shared, capital, cost, layout, start, stop):
+    # Backtest.run with one feed and one portfolio per variant, stepping
+    # ``runs`` in place of the strategies' own; ``shared`` is emptied at
+    # every bar.
+    records = [bars.records(t) for t in tickers]
+    feed = Feed()
+    portfolios = [Portfolio(capital, cost) for _ in runs]
+    errors = [None] * len(runs)
+    prices = {}
+    equity = np.empty((len(runs), stop - start))
+    fed = 0
+    _reset_platform()
+    began = time.perf_counter()
+    for step in range(start):
+        for ticker, series in zip(tickers, records):
+            bar = series[step]
+            if bar is not None:
+                feed.append(ticker, bar)
+                prices[ticker] = bar["close"]
+    for i, step in enumerate(range(start, stop)):
+        fresh = False
+        for ticker, series in zip(tickers, records):
+            bar = series[step]
+            if bar is not None:
+                feed.append(ticker, bar)
+                prices[ticker] = bar["close"]
+                fresh = True
+        if fresh:
+            fed += 1
+            shared.clear()
+            ohlcv = feed.view(layout)
+            for j, (run, portfolio) in enumerate(zip(runs, portfolios)):
+                if errors[j] is not None:
+                    continue
+                data = {"ohlcv": ohlcv, "holdings": portfolio.weights(prices),
+                        "positions": portfolio.positions()}
+                try:
+                    targets = allocation(run(data))
+                except Exception as exc:
+                    errors[j] = exc
+                    continue
+                if targets is not None:
+                    portfolio.rebalance(targets, prices)
+        for j, portfolio in enumerate(portfolios):
+            equity[j, i] = portfolio.value(prices)
+    elapsed = time.perf_counter() - began
+    out = []
+    for j, (strategy, portfolio) in enumerate(zip(strategies, portfolios)):
+        if errors[j] is not None:
+            out.append(_failed(names[j], bars, errors[j]))
+            continue
+        out.append(Result(names[j], getattr(strategy, "interval", None), bars.epochs[start:stop], equity[j],
+                          portfolio.trades, portfolio.turnover, fed * len(tickers), elapsed, kernel=kernels[j]))
+    return out
+
+
+# -- family kernels -----------------------------------------------------------
+
+class FamilyKernel:
+    """Method templates plus a ``run`` that shares the per-bar work of
+    every variant they match.
+
+    Upper-case names in a template are holes bound to the member's
+    constants, as in ``engine.vectorized.Kernel``.
+    """
+
+    name = None
+    holes = frozenset()
+    templates = {}
+
+    def __init__(self):
+        self._functions = {name: _function(src) for name, src in self.templates.items()}
+
+    def match(self, tree):
+        """Bound holes if the ``TradingStrategy`` in ``tree`` implements
+        these templates, else None."""
+        methods = {}
+        for node in tree.body:
+            if isinstance(node, ast.ClassDef) and node.name == "TradingStrategy":
+                methods = {f.name: _Quiet().visit(f) for f in node.body if isinstance(f, ast.FunctionDef)}
+        bound = {}
+        for name, template in self._functions.items():
+            if name not in methods or not _same(template, methods[name], self.holes, bound):
+                return None
+        return bound
+
+    def bind(self, strategy, bound, shared):
+        """A stand-in for ``strategy.run`` that reads and fills ``shared``,
+        which holds one bar's immutable values."""
+        raise NotImplementedError
+
+
+class ConvictionKernel(FamilyKernel):
+
+    name = "conviction"
+    holes = frozenset(("MIN_BARS", "VWAP_LEN", "VOL_LEN"))
+    templates = {
+        "get_conviction_score": '''
+def get_conviction_score(self, history):
+    if len(history) < MIN_BARS: return 0
+    df = pd.DataFrame(history)
+    recent_df = df.tail(VWAP_LEN)
+    vwap = (recent_df['close'] * recent_df['volume']).sum() / recent_df['volume'].sum()
+    current_price = df['close'].iloc[-1]
+    avg_vol = df['volume'].tail(VOL_LEN).mean()
+    rvol = df['volume'].iloc[-1] / avg_vol if avg_vol > 0 else 0
+    sma_macro = df['close'].mean()
+    if current_price > vwap and current_price > sma_macro and rvol >= self.rvol_threshold:
+        return rvol
+    return 0
+''',
+        "run": '''
+def run(self, data):
+    d = data.get("ohlcv")
+    if not d: return None
+    if self.active_trade:
+        current_bar = d[-1].get(self.active_ticker)
+        if not current_bar: return None
+        cp = current_bar["close"]
+        if self.peak_price is None or cp > self.peak_price:
+            self.peak_price = cp
+        if self.entry_price and cp >= self.entry_price * (1 + self.take_profit_pct):
+            log()
+            self.active_trade = False
+            self.active_ticker = None
+            self.peak_price = None
+            self.entry_price = None
+            return TargetAllocation({})
+        if cp <= self.peak_price * (1 - self.trailing_stop_pct):
+            log()
+            self.active_trade = False
+            self.active_ticker = None
+            self.peak_price = None
+            self.entry_price = None
+            return TargetAllocation({})
+        return None
+    scores = {}
+    for t in self.tickers:
+        hist = [bar[t] for bar in d if t in bar]
+        score = self.get_conviction_score(hist)
+        if score > 0:
+            scores[t] = score
+    if scores:
+        best_ticker = max(scores, key=scores.get)
+        self.active_ticker = best_ticker
+        self.active_trade = True
+        self.peak_price = d[-1][best_ticker]["close"]
+        self.entry_price = d[-1][best_ticker]["close"]
+        log()
+        return TargetAllocation({best_ticker: self.max_allocation})
+    return None
+'''}
+
+    def bind(self, s, bound, shared):
+        key = (self.name, bound["MIN_BARS"], bound["VWAP_LEN"], bound["VOL_LEN"])
+
+        def exit_trade():
+            s.active_trade = False
+            s.active_ticker = None
+            s.peak_price = None
+            s.entry_price = None
+            return {}
+
+        def run(data):
+            d = data.get("ohlcv")
+            if not d:
+                return None
+            if s.active_trade:
+                current_bar = d[-1].get(s.active_ticker)
+                if not current_bar:
+                    return None
+                cp = current_bar["close"]
+                if s.peak_price is None or cp > s.peak_price:
+                    s.peak_price = cp
+                if s.entry_price and cp >= s.entry_price * (1 + s.take_profit_pct):
+                    return exit_trade()
+                if cp <= s.peak_price * (1 - s.trailing_stop_pct):
+                    return exit_trade()
+                return None
+            scores = {}
+            for t in s.tickers:
+                try:
+                    rvol, trend = shared[key, t]
+                except KeyError:
+                    rvol, trend = shared[key, t] = self._conviction([bar[t] for bar in d if t in bar], bound)
+                score = rvol if trend and rvol >= s.rvol_threshold else 0
+                if score > 0:
+                    scores[t] = score
+            if scores:
+                best_ticker = max(scores, key=scores.get)
+                s.active_ticker = best_ticker
+                s.active_trade = True
+                s.peak_price = d[-1][best_ticker]["close"]
+                s.entry_price = d[-1][best_ticker]["close"]
+                return {best_ticker: s.max_allocation}
+            return None
+
+        return run
+
+    @staticmethod
+    def _conviction(history, bound):
+        """``(rvol, above VWAP and mean)``: the score before the RVOL gate."""
+        if len(history) < bound["MIN_BARS"]:
+            return 0, False
+        df = pd.DataFrame(history)
+        recent_df = df.tail(bound["VWAP_LEN"])
+        vwap = (recent_df['close'] * recent_df['volume']).sum() / recent_df['volume'].sum()
+        current_price = df['close'].iloc[-1]
+        avg_vol = df['volume'].tail(bound["VOL_LEN"]).mean()
+        rvol = df['volume'].iloc[-1] / avg_vol if avg_vol > 0 else 0
+        return rvol, bool(current_price > vwap and current_price > df['close'].mean())
+
+
+FAMILY_KERNELS = [ConvictionKernel()]
+
+
+def recognize(tree):
+    """``(kernel, bound)`` for the first family kernel matching ``tree``,
+    else ``(None, None)``."""
+    for kernel in FAMILY_KERNELS:
+        bound = kernel.match(tree)
+        if bound is not None:
+            return kernel, bound
+    return None, None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.families", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", nargs="?", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategies", nargs="*", help="strategy directories (default: all under cwd)")
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--start", type=int, default=0)
+    args = parser.parse_args(argv)
+    found = families(args.strategies or discover(os.getcwd()))
+    bars = load_bars(args.bars) if args.bars else None
+    for family in found:
+        print(f"{len(family):4d}  {', '.join(name[:8] for name in family.names)}")
+        for name, *values in zip(family.parameters, *family.vectors):
+            print(f"        {name:32} {' '.join(repr(v) for v in values)}")
+        if bars is None:
+            continue
+        began = time.perf_counter()
+        results = family.backtest(bars, capital=args.capital, cost=args.cost, start=args.start)
+        elapsed = time.perf_counter() - began
+        for result in results:
+            print(_format(result))
+        notes = ", ".join(dict.fromkeys(family.sharing.values()))
+        print(f"{len(results)} variants in {elapsed:.1f}s ({notes})")
+
+
+if __name__ == "__main__":
+    main()
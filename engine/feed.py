@@ -0,0 +1,271 @@
+"""One ingestion point for the three ``data["ohlcv"]`` layouts in this tree.
+
+    snapshots  [{ticker: bar, ...}, ...]          one dict per timestamp
+    tickers    {ticker: [bar, ...], ...}          one list per ticker
+    rows       [{"symbol": ticker, **bar}, ...]   flat, interleaved
+
+A ``Feed`` reads only the bars it has not seen, whatever the layout, into
+a shared ``BarStore`` and an arrival-ordered log. Each layout is built
+from that log the first time it is asked for and then extended by the
+new bars only, so strategies written against different shapes can share
+one feed without regrouping it every bar.
+
+Like the store, the log and the views are bounded by ``capacity``: each
+view holds the bars of the newest ``capacity`` timestamps. The log keeps
+between ``capacity`` and twice that many timestamps, plus whatever the
+latest ingest added, dropping old ones in batches. Log positions count every bar ever added, so a consumer's
+cursor (``len(feed)`` after its last read) stays valid across the drops.
+
+Bars are stamped on the way in (see ``engine.sessions``), so every view
+hands strategies bars that already carry ``epoch``/``session``/``minute``.
+With ``frames`` the same bars also drive a ``Resampler``, and
+``timeframe("1day")`` reads daily bars off an intraday feed.
+"""
+from collections import deque
+
+from engine.resample import Resampler
+from engine.sessions import SessionCalendar, stamp
+from engine.store import BarStore
+
+SNAPSHOTS = "snapshots"
+TICKERS = "tickers"
+ROWS = "rows"
+LAYOUTS = (SNAPSHOTS, TICKERS, ROWS)
+
+
+def detect_layout(ohlcv):
+    if isinstance(ohlcv, dict):
+        return TICKERS
+    if ohlcv and "symbol" in ohlcv[0]:
+        return ROWS
+    return SNAPSHOTS
+
+
+class Feed:
+    """Per-ticker columnar index plus lazily built layout views.
+
+    ``capacity`` is the history kept, an int or ``{frame: int}``. A dict
+    sizes the base store by its ``base`` entry and each resampled frame
+    by its own; frames it leaves out get the base size.
+    """
+
+    def __init__(self, capacity=4096, frames=(), base="5min"):
+        sizes = capacity if isinstance(capacity, dict) else {}
+        capacity = sizes.get(base, 4096) if isinstance(capacity, dict) else capacity
+        self.capacity = capacity
+        self.store = BarStore(capacity)
+        self.calendar = SessionCalendar()
+        self.base = base
+        self.resampler = None
+        if frames:
+            self.resampler = Resampler(frames, base, {f: sizes.get(f, capacity) for f in frames})
+        self._log = []
+        self._runs = deque()
+        self._dropped = 0
+        self._views = {}
+
+    def __len__(self):
+        return self._dropped + len(self._log)
+
+    def ingest(self, ohlcv, layout=None):
+        """Index the bars of ``ohlcv`` that are newer than the store's.
+
+        Returns the number of bars added.
+        """
+        if not ohlcv:
+            return 0
+        self._trim()
+        layout = layout or detect_layout(ohlcv)
+        if layout == TICKERS:
+            fresh = self._fresh_tickers(ohlcv)
+        elif layout == ROWS:
+            fresh = self._fresh_rows(ohlcv)
+        else:
+            fresh = self._fresh_snapshots(ohlcv)
+        fresh.sort(key=lambda item: item[0])
+        added = 0
+        for epoch, ticker, bar in fresh:
+            added += self._add(epoch, ticker, bar)
+        return added
+
+    def append(self, ticker, bar):
+        """Add a single bar, e.g. from a live callback."""
+        self._trim()
+        return self._add(stamp(bar), ticker, bar)
+
+    def _add(self, epoch, ticker, bar):
+        if not self.store.append(ticker, bar):
+            return False
+        self._log.append((epoch, ticker, bar))
+        runs = self._runs
+        if runs and runs[-1][0] == epoch:
+            runs[-1][1] += 1
+        else:
+            runs.append([epoch, 1])
+        self.calendar.add(epoch, bar["session"])
+        if self.resampler is not None:
+            self.resampler.append(ticker, bar)
+        return True
+
+    def timeframe(self, frame):
+        """The ``BarStore`` for ``frame``: the base store or a resampled one."""
+        if frame == self.base:
+            return self.store
+        if self.resampler is None or frame not in self.resampler.stores:
+            raise KeyError(f"feed does not resample to {frame!r}")
+        return self.resampler.store(frame)
+
+    def _trim(self):
+        """Drop the log's oldest timestamps down to ``capacity`` once it
+        holds twice that. Runs before an ingest, never during one, so the
+        bars one ingest adds stay readable until the next."""
+        if len(self._runs) <= 2 * self.capacity:
+            return
+        runs, drop = self._runs, 0
+        while len(runs) > self.capacity:
+            drop += runs.popleft()[1]
+        del self._log[:drop]
+        self._dropped += drop
+
+    def events(self, start=0):
+        """``(epoch, ticker, bar)`` in arrival order from log position ``start``.
+
+        A position older than the retained log starts at its first bar.
+        """
+        return self._log[max(start - self._dropped, 0):]
+
+    def _is_new(self, ticker, epoch):
+        last = self.store.last_stamp(ticker)
+        return last is None or epoch > last
+
+    def _fresh_snapshots(self, ohlcv):
+        latest = self.store.latest
+        start = len(ohlcv)
+        if latest is None:
+            start = 0
+        else:
+            while start > 0:
+                snapshot = ohlcv[start - 1]
+                if snapshot and max(stamp(b) for b in snapshot.values()) < latest:
+                    break
+                start -= 1
+        fresh = []
+        for snapshot in ohlcv[start:]:
+            for ticker, bar in snapshot.items():
+                epoch = stamp(bar)
+                if self._is_new(ticker, epoch):
+                    fresh.append((epoch, ticker, bar))
+        return fresh
+
+    def _fresh_tickers(self, ohlcv):
+        fresh = []
+        for ticker, bars in ohlcv.items():
+            last = self.store.last_stamp(ticker)
+            i = len(bars)
+            while i > 0:
+                epoch = stamp(bars[i - 1])
+                if last is not None and epoch <= last:
+                    break
+                fresh.append((epoch, ticker, bars[i - 1]))
+                i -= 1
+        return fresh
+
+    def _fresh_rows(self, ohlcv):
+        latest = self.store.latest
+        fresh = []
+        i = len(ohlcv)
+        while i > 0:
+            row = ohlcv[i - 1]
+            epoch = stamp(row)
+            if latest is not None and epoch < latest:
+                break
+            if self._is_new(row["symbol"], epoch):
+                fresh.append((epoch, row["symbol"], row))
+            i -= 1
+        # Back in arrival order, so bars sharing a timestamp keep theirs.
+        fresh.reverse()
+        return fresh
+
+    def view(self, layout):
+        """``data["ohlcv"]`` in the given layout, current to the last ingest."""
+        if layout not in LAYOUTS:
+            raise ValueError(f"unknown ohlcv layout {layout!r}")
+        state = self._views.get(layout)
+        if state is None or state[1] < self._dropped:
+            # New, or so far behind that the bars it needs are gone.
+            state = self._views[layout] = [{} if layout == TICKERS else [], self._dropped, deque()]
+        out, cursor, runs = state
+        if cursor == len(self):
+            return out
+        for epoch, ticker, bar in self.events(cursor):
+            new = not runs or runs[-1][0] != epoch
+            if new:
+                runs.append([epoch, 0])
+            runs[-1][1] += 1
+            if layout == TICKERS:
+                out.setdefault(ticker, []).append(bar)
+            elif layout == ROWS:
+                out.append(bar if bar.get("symbol") == ticker else dict(bar, symbol=ticker))
+            else:
+                if new:
+                    out.append({})
+                out[-1][ticker] = bar
+        state[1] = len(self)
+        if len(runs) > self.capacity:
+            drop = 0
+            while len(runs) > self.capacity:
+                drop += runs.popleft()[1]
+            if layout == TICKERS:
+                cutoff = runs[0][0]
+                for ticker in list(out):
+                    bars = out[ticker]
+                    k = 0
+                    while k < len(bars) and bars[k]["epoch"] < cutoff:
+                        k += 1
+                    if k == len(bars):
+                        del out[ticker]
+                    elif k:
+                        del bars[:k]
+            elif layout == ROWS:
+                del out[:drop]
+            else:
+                del out[:len(out) - self.capacity]
+        return out
+
+    def snapshots(self):
+        return self.view(SNAPSHOTS)
+
+    def by_ticker(self):
+        return self.view(TICKERS)
+
+    def rows(self):
+        return self.view(ROWS)
+
+    def data(self, layout=SNAPSHOTS, **extra):
+        """A ``run(data)`` argument carrying this feed in ``layout``."""
+        data = {"ohlcv": self.view(layout)}
+        data.update(extra)
+        return data
+
+
+class StoreAdapter:
+    """Runs an unmodified strategy while keeping ``strategy.store`` current.
+
+    ``run(data)`` still receives the platform's ``data`` untouched, so
+    existing code keeps working; new code can read ``self.store`` (or
+    ``self.feed``) instead of rescanning ``data["ohlcv"]``.
+    """
+
+    def __init__(self, strategy, capacity=4096, frames=()):
+        self.strategy = strategy
+        self.feed = Feed(capacity, frames, getattr(strategy, "interval", None) or "5min")
+        self.store = self.feed.store
+        strategy.feed = self.feed
+        strategy.store = self.store
+
+    def __getattr__(self, name):
+        return getattr(self.strategy, name)
+
+    def run(self, data):
+        self.feed.ingest(data.get("ohlcv"))
+        return self.strategy.run(data)
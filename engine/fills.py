@@ -0,0 +1,243 @@
+"""Intrabar fills for stops and targets.
+
+Strategies here check stops against the bar low and targets against the
+bar high (863b4c5b, fce56700). When both levels lie inside one bar, the
+order they were reached in is unknown, and the order decides the trade.
+``exits`` settles it for many positions at once. Each position has an
+entry bar (filled at its close) and up to three levels: a fixed stop, a
+target, and a trailing stop under the high-water mark. The result is
+each position's first exit: bar, price, reason, and whether it gapped
+through its level at the open.
+
+Inside a bar, the price is taken to move open -> one extreme -> the
+other -> close. ``model`` picks the extreme that comes first:
+
+    direction     O-L-H-C on an up bar, O-H-L-C on a down bar
+    nearest       the extreme nearer the open
+    pessimistic   the adverse extreme (the stop side) always
+    optimistic    the favourable extreme always
+
+A trailing stop follows the path as well. On O-H-L-C the high raises the
+stop before the low tests it. On O-L-H-C the low tests the old stop, and
+the close tests the stop the high raised. A bar that opens beyond a
+level fills at the open.
+
+With ``sub`` (finer bars of the same tickers, e.g. 5-minute bars under
+daily ones) the same rules run on the sub-bars. Only the much smaller
+ambiguity inside one sub-bar is left to the model, and exits are mapped
+back to the bar they fall in.
+
+Positions are scanned in blocks of bars that double in width, as
+``(positions, bars)`` arrays. Positions leave once they exit. Nothing
+loops over bars or positions in Python.
+
+    python -m engine.fills BARS TICKER [--stop 0.05] [--target 0.1] [--trail 0.08] [--sub BARS]
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import load_bars
+
+MODELS = ("direction", "nearest", "pessimistic", "optimistic")
+
+NONE, STOP, TARGET = 0, 1, 2
+REASONS = {NONE: "open", STOP: "stop", TARGET: "target"}
+
+_BLOCK = 64
+
+Exits = namedtuple("Exits", "index price reason gap")
+
+
+def _high_first(model, o, h, l, c):
+    """Whether the path reaches the high before the low, per bar."""
+    if model == "direction":
+        return c < o
+    if model == "nearest":
+        return h - o < o - l
+    if model == "pessimistic":
+        return np.zeros(o.shape, dtype=bool)
+    if model == "optimistic":
+        return np.ones(o.shape, dtype=bool)
+    raise ValueError(f"unknown model {model!r}; expected one of {MODELS}")
+
+
+def resolve(o, h, l, c, before, after, target, model="direction"):
+    """``(reason, price, gap)`` per bar for a long position.
+
+    ``before`` is the stop level going into each bar and ``after`` the
+    level once the bar's high has raised it (equal without a trailing
+    stop). ``target`` is the target level; ``-inf`` and ``inf`` turn a
+    level off. Missing bars (NaN) never exit.
+    """
+    high_first = _high_first(model, o, h, l, c)
+    low_first = ~high_first
+    conditions = [
+        o <= before,
+        o >= target,
+        high_first & (h >= target),
+        high_first & (l <= after),
+        low_first & (l <= before),
+        low_first & (h >= target),
+        low_first & (c <= after),
+    ]
+    target = np.broadcast_to(target, o.shape)
+    reason = np.select(conditions, [STOP, TARGET, TARGET, STOP, STOP, TARGET, STOP], NONE)
+    price = np.select(conditions, [o, o, target, after, before, target, after], np.nan)
+    return reason, price, conditions[0] | conditions[1]
+
+
+def _levels(x, n):
+    """``x`` (scalar, array or None) as ``n`` floats; None is NaN."""
+    return np.broadcast_to(np.asarray(np.nan if x is None else x, dtype=np.float64), (n,)).copy()
+
+
+def scan(o, h, l, c, rows, starts, ends, prices, stop=None, target=None, trail=None, side=1,
+         marks=None, model="direction"):
+    """First exit of each position over ``(tickers, time)`` price arrays.
+
+    Position ``i`` is scanned over bars ``starts[i]..ends[i]-1`` of row
+    ``rows[i]``. ``stop``, ``target`` and ``trail`` are fractions of the
+    entry price (the trail of the high-water mark, which starts at
+    ``marks`` or the entry price), NaN or None for none. ``side`` is 1 for
+    long and -1 for short. Shorts are scanned as longs on negated prices.
+    A position without an entry price (NaN) never exits.
+    """
+    rows = np.asarray(rows, dtype=np.intp)
+    starts = np.asarray(starts, dtype=np.intp)
+    ends = np.asarray(ends, dtype=np.intp)
+    n = len(rows)
+    side = _levels(side, n)
+    entry = side * _levels(prices, n)
+    peak = entry.copy() if marks is None else side * _levels(marks, n)
+    fixed = entry * (1.0 - side * _levels(stop, n))
+    fixed[np.isnan(fixed)] = -np.inf
+    goal = entry * (1.0 + side * _levels(target, n))
+    goal[np.isnan(goal)] = np.inf
+    factor = 1.0 - side * _levels(trail, n)
+    factor[np.isnan(factor)] = 0.0
+
+    index = np.full(n, -1, dtype=np.intp)
+    price = np.full(n, np.nan)
+    reason = np.full(n, NONE, dtype=np.int8)
+    gap = np.zeros(n, dtype=bool)
+    alive = np.flatnonzero((starts < ends) & ~np.isnan(entry))
+    offset, width = 0, _BLOCK
+    while len(alive):
+        at = starts[alive, None] + offset + np.arange(width)
+        valid = at < ends[alive, None]
+        at = np.minimum(at, o.shape[1] - 1)
+        r = rows[alive, None]
+        s = side[alive, None]
+        bo, bc = s * o[r, at], s * c[r, at]
+        bh, bl = np.where(s > 0, h[r, at], -l[r, at]), np.where(s > 0, l[r, at], -h[r, at])
+        valid &= ~np.isnan(bc)
+        bh[~valid] = np.nan
+        run = np.fmax.accumulate(np.concatenate([peak[alive, None], bh], axis=1), axis=1)
+        f = factor[alive, None]
+        before = np.maximum(fixed[alive, None], np.where(f > 0, run[:, :-1] * f, -np.inf))
+        after = np.maximum(fixed[alive, None], np.where(f > 0, run[:, 1:] * f, -np.inf))
+        why, fill, gapped = resolve(bo, bh, bl, bc, before, after, goal[alive, None], model)
+        why[~valid] = NONE
+        hit = why != NONE
+        first = hit.argmax(axis=1)
+        done = hit[np.arange(len(alive)), first]
+        out = alive[done]
+        index[out] = starts[out] + offset + first[done]
+        reason[out] = why[done, first[done]]
+        price[out] = side[out] * fill[done, first[done]]
+        gap[out] = gapped[done, first[done]]
+        peak[alive] = run[:, -1]
+        offset += width
+        width *= 2
+        alive = alive[~done & (starts[alive] + offset < ends[alive])]
+    return Exits(index, price, reason, gap)
+
+
+def exits(bars, tickers, entries, prices=None, stop=None, target=None, trail=None, side=1,
+          marks=None, model="direction", horizon=None, sub=None):
+    """First exit after each entry, as ``Exits`` of bar indices into ``bars``.
+
+    Position ``i`` is in ``tickers[i]``, entered at the close of bar
+    ``entries[i]`` for ``prices[i]`` (that close by default). It is
+    scanned from the next bar for ``horizon`` bars (to the end by
+    default). With ``sub`` the scan runs on those finer bars, from the
+    first one after the entry bar. ``index`` is -1 and ``price`` NaN for a
+    position still open at the end.
+    """
+    entries = np.asarray(entries, dtype=np.intp)
+    rows = np.array([bars.index(t) for t in tickers], dtype=np.intp)
+    if prices is None:
+        prices = bars.close[rows, entries]
+    ends = np.full(len(entries), len(bars), dtype=np.intp)
+    if horizon is not None:
+        ends = np.minimum(ends, entries + 1 + horizon)
+    if sub is None:
+        return scan(bars.open, bars.high, bars.low, bars.close, rows, entries + 1, ends, prices,
+                    stop, target, trail, side, marks, model)
+    # A sub-bar belongs to the last bar stamped at or before it.
+    bounds = np.append(bars.epochs, np.iinfo(np.int64).max)
+    starts = np.searchsorted(sub.epochs, bounds[entries + 1])
+    stops = np.searchsorted(sub.epochs, bounds[ends])
+    found = scan(sub.open, sub.high, sub.low, sub.close, [sub.index(t) for t in tickers], starts, stops,
+                 prices, stop, target, trail, side, marks, model)
+    index = np.searchsorted(bars.epochs, sub.epochs[found.index], side="right") - 1
+    index[found.index < 0] = -1
+    return found._replace(index=index)
+
+
+def summary(found, prices, side=1):
+    """Counts and mean return by exit reason, ``prices`` being the entry prices."""
+    returns = np.asarray(side, dtype=np.float64) * (found.price / np.asarray(prices, dtype=np.float64) - 1.0)
+    rows = []
+    for code, name in REASONS.items():
+        mask = found.reason == code
+        rows.append({"reason": name, "positions": int(mask.sum()), "gaps": int((mask & found.gap).sum()),
+                     "mean_return": float(np.nanmean(returns[mask])) if code and mask.any() else np.nan})
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.fills", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("ticker")
+    parser.add_argument("--stop", type=float, default=None, help="fixed stop, fraction below entry")
+    parser.add_argument("--target", type=float, default=None, help="target, fraction above entry")
+    parser.add_argument("--trail", type=float, default=None, help="trailing stop, fraction below the peak")
+    parser.add_argument("--short", action="store_true")
+    parser.add_argument("--every", type=int, default=1, help="enter at every Nth bar")
+    parser.add_argument("--horizon", type=int, default=None, help="bars to hold at most")
+    parser.add_argument("--sub", default=None, help="finer bars to resolve exits on")
+    parser.add_argument("--model", choices=MODELS, default="direction", help="path model inside a sub-bar")
+    args = parser.parse_args(argv)
+    bars = load_bars(args.bars)
+    sub = load_bars(args.sub) if args.sub else None
+    row = bars.index(args.ticker)
+    entries = np.flatnonzero(~np.isnan(bars.close[row, :-1]))[::args.every]
+    side = -1 if args.short else 1
+    tickers = [args.ticker] * len(entries)
+    prices = bars.close[row, entries]
+    runs = [(model, model, None) for model in MODELS]
+    if sub is not None:
+        runs.append(("sub-bars", args.model, sub))
+    found = {}
+    for label, model, finer in runs:
+        began = time.perf_counter()
+        found[label] = exits(bars, tickers, entries, prices, args.stop, args.target, args.trail, side,
+                             model=model, horizon=args.horizon, sub=finer)
+        elapsed = time.perf_counter() - began
+        print(f"{label}  ({len(entries):,} positions in {elapsed:.2f}s)")
+        with pd.option_context("display.float_format", "{:.4%}".format):
+            print(summary(found[label], prices, side).to_string(index=False))
+        if finer is not None:
+            for other in MODELS:
+                same = np.mean((found[other].reason == found[label].reason)
+                               & (found[other].index == found[label].index))
+                print(f"    {other:12s} agrees with sub-bars on {same:.1%} of exits")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Append-only pandas frames per ticker.
+
+``pd.DataFrame(history)`` from a list of bar dicts is the hottest line in
+the conviction and nitro families, and several strategies do it more than
+once per ticker per bar. A ``FrameCache`` keeps each ticker's columns in
+preallocated NumPy arrays that double when full, appends only the bars it
+has not seen, and wraps the filled prefix in a DataFrame without copying.
+The frame has the same columns and RangeIndex as ``pd.DataFrame(history)``,
+so existing scoring helpers can take it unchanged.
+"""
+import numpy as np
+import pandas as pd
+
+from engine.sessions import stamp
+from engine.store import FIELDS
+
+
+class _Columns:
+
+    def __init__(self, capacity):
+        self.n = 0
+        self.prices = {f: np.empty(capacity) for f in FIELDS}
+        self.dates = np.empty(capacity, dtype=object)
+        self.stamps = np.empty(capacity, dtype=np.int64)
+        self.frame = None
+        self.frame_key = None
+
+    @property
+    def capacity(self):
+        return len(self.stamps)
+
+    def _grow(self):
+        size = 2 * self.capacity
+        n = self.n
+        for f, col in self.prices.items():
+            grown = np.empty(size)
+            grown[:n] = col[:n]
+            self.prices[f] = grown
+        for name in ("dates", "stamps"):
+            col = getattr(self, name)
+            grown = np.empty(size, dtype=col.dtype)
+            grown[:n] = col[:n]
+            setattr(self, name, grown)
+
+    def append(self, bar, epoch):
+        if self.n == self.capacity:
+            self._grow()
+        n = self.n
+        for f in FIELDS:
+            self.prices[f][n] = bar[f]
+        self.dates[n] = bar.get("date")
+        self.stamps[n] = epoch
+        self.n = n + 1
+
+    def last_stamp(self):
+        return int(self.stamps[self.n - 1]) if self.n else None
+
+
+class FrameCache:
+    """Per-ticker DataFrames that grow by one row per bar.
+
+    Frames share memory with the cache and must be treated as read-only;
+    the rows they cover are never rewritten, so a frame handed out earlier
+    stays valid after later appends.
+    """
+
+    def __init__(self, capacity=1024):
+        self.capacity = capacity
+        self._columns = {}
+        self._cursor = 0
+
+    def __contains__(self, ticker):
+        return ticker in self._columns
+
+    def length(self, ticker):
+        cols = self._columns.get(ticker)
+        return cols.n if cols else 0
+
+    def _get(self, ticker):
+        cols = self._columns.get(ticker)
+        if cols is None:
+            cols = self._columns[ticker] = _Columns(self.capacity)
+        return cols
+
+    def append(self, ticker, bar):
+        """Add one bar; bars not newer than the ticker's last are dropped."""
+        cols = self._get(ticker)
+        epoch = stamp(bar)
+        last = cols.last_stamp()
+        if last is not None and epoch <= last:
+            return False
+        cols.append(bar, epoch)
+        return True
+
+    def update(self, ticker, history):
+        """Catch up with a strategy's history list and return its frame.
+
+        Only the bars newer than the cached ones are read, walking back
+        from the end of ``history``. The returned frame covers the same
+        trailing ``len(history)`` bars that ``pd.DataFrame(history)`` would.
+        """
+        cols = self._get(ticker)
+        last = cols.last_stamp()
+        i = len(history)
+        while i > 0 and (last is None or stamp(history[i - 1]) > last):
+            i -= 1
+        for bar in history[i:]:
+            cols.append(bar, stamp(bar))
+        return self.frame(ticker, len(history))
+
+    def sync(self, feed, tickers=None):
+        """Append whatever a ``Feed`` has indexed since the last sync."""
+        for _, ticker, bar in feed.events(self._cursor):
+            if tickers is None or ticker in tickers:
+                self.append(ticker, bar)
+        self._cursor = len(feed)
+
+    def frame(self, ticker, n=None):
+        """The last ``n`` rows (default: all) as a zero-copy DataFrame."""
+        cols = self._columns.get(ticker)
+        if cols is None or not cols.n:
+            return pd.DataFrame(columns=list(FIELDS) + ["date"])
+        n = cols.n if n is None else min(n, cols.n)
+        key = (cols.n, n)
+        if cols.frame_key != key:
+            start = cols.n - n
+            data = {f: cols.prices[f][start:cols.n] for f in FIELDS}
+            # An explicit object Series stops pandas from re-inferring
+            # (and copying) the date strings on every build.
+            data["date"] = pd.Series(cols.dates[start:cols.n], dtype=object, copy=False)
+            cols.frame = pd.DataFrame(data, copy=False)
+            cols.frame_key = key
+        return cols.frame.copy(deep=False)
+
+    def column(self, ticker, field):
+        """One column as a NumPy view, for callers that skip pandas."""
+        cols = self._columns.get(ticker)
+        if cols is None:
+            return np.empty(0)
+        if field == "date":
+            return cols.dates[:cols.n]
+        if field == "timestamp":
+            return cols.stamps[:cols.n]
+        return cols.prices[field][:cols.n]
@@ -0,0 +1,10 @@
+"""Incremental indicators: each updates in O(1) per bar instead of
+recomputing over the whole history."""
+from engine.indicators.adx import ADX, DMIBook
+from engine.indicators.atr import ATR, BatchATR, TrueRange
+from engine.indicators.book import SeriesBook
+from engine.indicators.breadth import BreadthEngine
+from engine.indicators.ema import EMA, MACD
+from engine.indicators.sma import SMA, BatchRollingSum, BatchSMA, RollingSum
+from engine.indicators.volatility import BatchVolTracker, RollingMoments, VolTracker
+from engine.indicators.volume import BatchVolumeKernel, VolumeKernel
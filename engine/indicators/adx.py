@@ -0,0 +1,93 @@
+"""Incremental ADX / DMI.
+
+Wilder's construction, one bar at a time: +DM, -DM and true range are
+seeded with their sums over the first ``period`` moves and then smoothed
+as ``s - s / n + x``; DX follows from the two DIs, and ADX is the mean of
+the first ``period`` DX values, then ``(adx * (n - 1) + dx) / n``. The
+first ADX value arrives on bar ``2 * period``.
+
+``DMIBook`` serves ``ADX(ticker, ohlcv, period)``-style callers on top of
+a ``SeriesBook``: one engine per (ticker, period), fed only the bars it
+has not seen, with the result memoized for the current bar.
+"""
+from engine.indicators.book import SeriesBook
+
+
+class ADX:
+    """Average directional index with +DI/-DI, updated per bar."""
+
+    def __init__(self, period=14):
+        self.period = period
+        self.moves = 0
+        self.plus_di = None
+        self.minus_di = None
+        self.dx = None
+        self.value = None
+        self._prev = None
+        self._tr = self._plus = self._minus = 0.0
+        self._dx_sum = 0.0
+        self._dx_count = 0
+
+    def update(self, high, low, close):
+        prev = self._prev
+        self._prev = (high, low, close)
+        if prev is None:
+            return None
+        ph, pl, pc = prev
+        up, down = high - ph, pl - low
+        plus = up if up > down and up > 0 else 0.0
+        minus = down if down > up and down > 0 else 0.0
+        tr = max(high - low, abs(high - pc), abs(low - pc))
+        n = self.period
+        self.moves += 1
+        if self.moves <= n:
+            self._tr += tr
+            self._plus += plus
+            self._minus += minus
+            if self.moves < n:
+                return None
+        else:
+            self._tr += tr - self._tr / n
+            self._plus += plus - self._plus / n
+            self._minus += minus - self._minus / n
+        if self._tr > 0:
+            self.plus_di = 100.0 * self._plus / self._tr
+            self.minus_di = 100.0 * self._minus / self._tr
+        else:
+            self.plus_di = self.minus_di = 0.0
+        total = self.plus_di + self.minus_di
+        self.dx = 100.0 * abs(self.plus_di - self.minus_di) / total if total > 0 else 0.0
+        if self.value is not None:
+            self.value = (self.value * (n - 1) + self.dx) / n
+        else:
+            self._dx_sum += self.dx
+            self._dx_count += 1
+            if self._dx_count == n:
+                self.value = self._dx_sum / n
+        return self.value
+
+    def update_bar(self, bar):
+        return self.update(bar["high"], bar["low"], bar["close"])
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+
+class DMIBook(SeriesBook):
+    """ADX engines per (ticker, period) over one shared ``Feed``.
+
+    ``value`` accepts ``data["ohlcv"]`` in any layout. Each engine is
+    advanced only by bars it has not seen, and each (ticker, period) value
+    is computed at most once per bar however often it is asked for.
+    """
+
+    def engine(self, ticker, period=14):
+        return super().engine(ticker, period, lambda: ADX(period))
+
+    def value(self, ticker, ohlcv, period=14):
+        self.series(ticker, ohlcv, period, lambda: ADX(period))
+        return self.engine(ticker, period).value
+
+    def drop(self, ticker, period=14):
+        super().drop(ticker, period)
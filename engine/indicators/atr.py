@@ -0,0 +1,134 @@
+"""Incremental true range and ATR.
+
+The ATR variants in this tree differ only in how true range is smoothed:
+
+    "sma"     rolling mean of TR, first TR = high - low
+              (``calculate_atr`` in the nitro family, ``get_atr``)
+    "wilder"  SMA of the first n TRs, then ``(prev * (n - 1) + tr) / n``
+              (``surmount.technical_indicators.ATR``, the ``ta`` library;
+              TA-Lib instead skips the first TR and starts at index n)
+    "rma"     pandas_ta's default: first TR dropped, then
+              ``ewm(alpha=1/n, adjust=True, min_periods=n)``
+
+Every mode updates in O(1) per bar and returns ``None`` (``NaN`` in the
+batch form) until it has ``n`` true ranges.
+"""
+import numpy as np
+
+from engine.indicators.sma import BatchRollingSum, RollingSum
+
+SMOOTHING = ("sma", "wilder", "rma")
+
+
+class TrueRange:
+
+    def __init__(self):
+        self.prev_close = None
+
+    def update(self, high, low, close):
+        prev = self.prev_close
+        self.prev_close = close
+        if prev is None:
+            return high - low
+        return max(high - low, abs(high - prev), abs(low - prev))
+
+
+class ATR:
+    """Average true range over ``period`` bars with the given smoothing."""
+
+    def __init__(self, period=14, smoothing="sma"):
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"smoothing must be one of {SMOOTHING}")
+        self.period = period
+        self.smoothing = smoothing
+        self.count = 0
+        self.value = None
+        self._tr = TrueRange()
+        self._sum = RollingSum(period)
+        self._num = 0.0
+        self._den = 0.0
+
+    def update(self, high, low, close):
+        first = self._tr.prev_close is None
+        tr = self._tr.update(high, low, close)
+        n = self.period
+        if self.smoothing == "sma":
+            self._sum.update(tr)
+            self.count += 1
+            if self.count >= n:
+                self.value = self._sum.value / n
+        elif self.smoothing == "wilder":
+            self.count += 1
+            if self.value is not None:
+                self.value = (self.value * (n - 1) + tr) / n
+            else:
+                self._num += tr
+                if self.count == n:
+                    self.value = self._num / n
+        elif not first:
+            decay = 1.0 - 1.0 / n
+            self._num = self._num * decay + tr
+            self._den = self._den * decay + 1.0
+            self.count += 1
+            if self.count >= n:
+                self.value = self._num / self._den
+        return self.value
+
+    def update_bar(self, bar):
+        return self.update(bar["high"], bar["low"], bar["close"])
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+
+class BatchATR:
+    """ATR for many tickers in one vectorized step per bar.
+
+    ``update`` takes aligned high/low/close arrays; ``mask`` selects the
+    tickers that printed a bar, the rest keep their state untouched.
+    """
+
+    def __init__(self, size, period=14, smoothing="sma"):
+        if smoothing not in SMOOTHING:
+            raise ValueError(f"smoothing must be one of {SMOOTHING}")
+        self.period = period
+        self.smoothing = smoothing
+        self.prev_close = np.full(size, np.nan)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.values = np.full(size, np.nan)
+        self._sum = BatchRollingSum(np.full(size, period))
+        self._num = np.zeros(size)
+        self._den = np.zeros(size)
+
+    def update(self, high, low, close, mask=None):
+        high, low, close = (np.asarray(a, dtype=np.float64) for a in (high, low, close))
+        sel = np.ones(len(self.counts), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        prev = self.prev_close
+        first = np.isnan(prev)
+        with np.errstate(invalid="ignore"):
+            tr = np.where(first, high - low,
+                          np.fmax(high - low, np.fmax(np.abs(high - prev), np.abs(low - prev))))
+        n = self.period
+        if self.smoothing == "sma":
+            self._sum.update(tr, sel)
+            self.counts[sel] += 1
+            self.values = np.where(self.counts >= n, self._sum.sums / n, np.nan)
+        elif self.smoothing == "wilder":
+            self.counts[sel] += 1
+            seeding = sel & (self.counts <= n)
+            self._num[seeding] += tr[seeding]
+            seeded = sel & (self.counts == n)
+            self.values[seeded] = self._num[seeded] / n
+            rolling = sel & (self.counts > n)
+            self.values[rolling] = (self.values[rolling] * (n - 1) + tr[rolling]) / n
+        else:
+            step = sel & ~first
+            decay = 1.0 - 1.0 / n
+            self._num[step] = self._num[step] * decay + tr[step]
+            self._den[step] = self._den[step] * decay + 1.0
+            self.counts[step] += 1
+            ready = self.counts >= n
+            self.values = np.where(ready, self._num / np.where(ready, self._den, 1.0), np.nan)
+        self.prev_close = np.where(sel, close, prev)
+        return self.values
@@ -0,0 +1,60 @@
+"""Indicator histories per ticker over one shared ``Feed``.
+
+Platform helpers such as ``ATR(ticker, ohlcv, 14)`` return the whole
+indicator series although callers read only ``[-1]``. ``SeriesBook``
+keeps one engine and one output list per (ticker, key), extends both by
+the bars the engine has not seen, and memoizes the list for the current
+bar, so the n-th call costs one engine update instead of a pass over the
+history. The returned list is the book's own; callers must not mutate it.
+
+The helpers return the whole series, so the book keeps each ticker's bars
+for as long as it keeps their outputs. It takes them from the feed's log
+after every ingest rather than from the feed's views, which only hold
+the newest ``capacity`` timestamps: a key first asked for late still
+starts from the ticker's first bar.
+"""
+from engine.feed import Feed
+from engine.memo import BarMemo
+
+
+class SeriesBook:
+
+    def __init__(self, capacity=4096):
+        self.feed = Feed(capacity)
+        self.memo = BarMemo()
+        self._entries = {}
+        self._bars = {}
+
+    def _entry(self, ticker, key, factory):
+        entry = self._entries.get((ticker, key))
+        if entry is None:
+            entry = self._entries[(ticker, key)] = [factory(), [], 0]
+        return entry
+
+    def engine(self, ticker, key, factory):
+        return self._entry(ticker, key, factory)[0]
+
+    def series(self, ticker, ohlcv, key, factory, fill=None):
+        """Output of ``factory()``'s engine on every bar of ``ticker``.
+
+        ``fill`` stands in for the warm-up bars the engine reports None.
+        """
+        cursor = len(self.feed)
+        self.feed.ingest(ohlcv)
+        for _, t, bar in self.feed.events(cursor):
+            self._bars.setdefault(t, []).append(bar)
+        self.memo.advance(self.feed.store.latest)
+        return self.memo.get((ticker, key), lambda: self._catch_up(ticker, key, factory, fill))
+
+    def _catch_up(self, ticker, key, factory, fill):
+        entry = self._entry(ticker, key, factory)
+        engine, out, seen = entry
+        bars = self._bars.get(ticker, ())
+        for bar in bars[seen:]:
+            value = engine.update_bar(bar)
+            out.append(fill if value is None else value)
+        entry[2] = len(bars)
+        return out
+
+    def drop(self, ticker, key):
+        self._entries.pop((ticker, key), None)
@@ -0,0 +1,70 @@
+"""Incremental market breadth.
+
+``_breadth`` slices and sums a 200-day close list per universe member on
+every bar, which is fine for seven names and hopeless for an index. A
+``BreadthEngine`` holds a (tickers x window) rolling-sum matrix and moves
+the whole universe forward in one vectorized step per bar.
+
+A ticker counts as *seen* once it has ``window`` closes and as *above*
+when its latest close is over its own average -- the same rule as
+``_breadth``, so tickers with short histories drop out of both the
+numerator and the denominator.
+"""
+import numpy as np
+
+from engine.indicators.sma import BatchRollingSum
+
+
+class BreadthEngine:
+
+    def __init__(self, tickers, window=200):
+        self.tickers = list(tickers)
+        self.window = window
+        self._index = {t: i for i, t in enumerate(self.tickers)}
+        n = len(self.tickers)
+        self._sums = BatchRollingSum(np.full(n, window))
+        self.last_close = np.full(n, np.nan)
+        self.above = self.seen = self.advancing = self.declining = 0
+
+    def update(self, closes):
+        """Advance by one bar.
+
+        ``closes`` is either an array aligned with ``tickers`` (NaN where a
+        ticker printed no bar) or a ``{ticker: close}`` dict. Returns
+        ``(fraction_above, seen)`` like ``_breadth``.
+        """
+        if isinstance(closes, dict):
+            row = np.full(len(self.tickers), np.nan)
+            for t, c in closes.items():
+                i = self._index.get(t)
+                if i is not None:
+                    row[i] = c
+            closes = row
+        else:
+            closes = np.asarray(closes, dtype=np.float64)
+        printed = ~np.isnan(closes)
+        prev = self.last_close
+        with np.errstate(invalid="ignore"):
+            self.advancing = int(np.count_nonzero(printed & (closes > prev)))
+            self.declining = int(np.count_nonzero(printed & (closes < prev)))
+        self._sums.update(closes, printed)
+        self.last_close = np.where(printed, closes, prev)
+        ready = self._sums.ready
+        sma = self._sums.sums / self.window
+        self.seen = int(np.count_nonzero(ready))
+        self.above = int(np.count_nonzero(ready & (self.last_close > sma)))
+        return self.fraction, self.seen
+
+    def update_snapshot(self, snapshot):
+        """Advance from one ``{ticker: bar}`` snapshot."""
+        return self.update({t: bar["close"] for t, bar in snapshot.items()})
+
+    @property
+    def fraction(self):
+        return self.above / self.seen if self.seen else 0.0
+
+    def above_mask(self):
+        """Boolean per ticker: has a full window and closes above its average."""
+        ready = self._sums.ready
+        with np.errstate(invalid="ignore"):
+            return ready & (self.last_close > self._sums.sums / self.window)
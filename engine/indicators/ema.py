@@ -0,0 +1,127 @@
+"""Incremental EMA and MACD.
+
+Two seeding conventions are used in this tree and both are supported:
+
+    "first"  ``Series.ewm(span=n, adjust=False)`` -- the first value seeds
+             the average (the hand-rolled MACD in the conviction family)
+    "sma"    pandas_ta's ``ema`` -- nothing for n-1 bars, then the SMA of
+             the first n values, then the same recursion
+
+Missing values (NaN) are handled as ``ewm(adjust=False)`` handles them:
+the average holds through the gap, and the first value after it is
+weighted against an average decayed once per missing bar.
+
+``MACD(seed="sma")`` reproduces pandas_ta's ``MACD_12_26_9`` and
+``MACDs_12_26_9``: the signal line starts at the first defined MACD value.
+Both classes can ``snapshot()`` their state to a plain dict and
+``restore()`` it, so a restarted strategy does not have to warm up again.
+"""
+
+SEEDS = ("first", "sma")
+
+
+class EMA:
+    """Exponential moving average with ``alpha = 2 / (span + 1)``."""
+
+    def __init__(self, span, seed="first"):
+        if seed not in SEEDS:
+            raise ValueError(f"seed must be one of {SEEDS}")
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        self.span = span
+        self.seed = seed
+        self.alpha = 2.0 / (span + 1.0)
+        self.count = 0
+        self.value = None
+        self._seed_sum = 0.0
+        self._weight = 1.0
+
+    def update(self, x):
+        self.count += 1
+        if self.value is not None:
+            if x != x:
+                self._weight *= 1.0 - self.alpha
+            elif self._weight == 1.0:
+                self.value += self.alpha * (x - self.value)
+            else:
+                old = self._weight * (1.0 - self.alpha)
+                self.value = (old * self.value + self.alpha * x) / (old + self.alpha)
+                self._weight = 1.0
+        elif self.seed == "first":
+            if x == x:
+                self.value = float(x)
+        else:
+            if x == x:
+                self._seed_sum += x
+            if self.count == self.span:
+                self.value = self._seed_sum / self.span
+        return self.value
+
+    @property
+    def ready(self):
+        return self.value is not None
+
+    def snapshot(self):
+        return {"span": self.span, "seed": self.seed, "count": self.count,
+                "value": self.value, "seed_sum": self._seed_sum, "weight": self._weight}
+
+    @classmethod
+    def restore(cls, state):
+        ema = cls(state["span"], state["seed"])
+        ema.count = state["count"]
+        ema.value = state["value"]
+        ema._seed_sum = state["seed_sum"]
+        ema._weight = state.get("weight", 1.0)
+        return ema
+
+
+class MACD:
+    """MACD line, signal line and histogram, one bar at a time.
+
+    ``update`` returns ``(macd, signal, histogram)``; each is ``None``
+    until it is defined.
+    """
+
+    def __init__(self, fast=12, slow=26, signal=9, seed="first"):
+        self.fast = EMA(fast, seed)
+        self.slow = EMA(slow, seed)
+        self.signal = EMA(signal, seed)
+        self.macd = None
+
+    @property
+    def name(self):
+        return f"{self.fast.span}_{self.slow.span}_{self.signal.span}"
+
+    def update(self, x):
+        fast = self.fast.update(x)
+        slow = self.slow.update(x)
+        if fast is None or slow is None:
+            return None, None, None
+        self.macd = fast - slow
+        signal = self.signal.update(self.macd)
+        return self.macd, signal, None if signal is None else self.macd - signal
+
+    @property
+    def value(self):
+        signal = self.signal.value
+        hist = None if signal is None or self.macd is None else self.macd - signal
+        return self.macd, signal, hist
+
+    @property
+    def bullish(self):
+        """MACD above its signal line -- the test every caller in this tree makes."""
+        macd, signal, _ = self.value
+        return signal is not None and macd > signal
+
+    def snapshot(self):
+        return {"fast": self.fast.snapshot(), "slow": self.slow.snapshot(),
+                "signal": self.signal.snapshot(), "macd": self.macd}
+
+    @classmethod
+    def restore(cls, state):
+        macd = cls.__new__(cls)
+        macd.fast = EMA.restore(state["fast"])
+        macd.slow = EMA.restore(state["slow"])
+        macd.signal = EMA.restore(state["signal"])
+        macd.macd = state["macd"]
+        return macd
@@ -0,0 +1,165 @@
+"""Windowed Welford moments and a realized-volatility tracker.
+
+``_realised_vol`` and ``_trend_and_vol_ok`` rebuild a return series and
+take fresh standard deviations on every bar. ``RollingMoments`` keeps the
+mean and sum of squared deviations of a sliding window with Welford's
+add/replace updates, so the sample standard deviation (``ddof=1``, as
+pandas ``.std()``) is O(1) per bar. ``VolTracker`` runs several windows
+over one ticker's simple returns -- e.g. 20 and 80 -- and reports
+annualized vol and the recent/baseline ratio; ``BatchVolTracker`` does
+the same for a universe from one array of closes.
+"""
+from collections import deque
+from math import sqrt
+
+import numpy as np
+
+
+class RollingMoments:
+    """Mean and variance of the last ``window`` values."""
+
+    def __init__(self, window):
+        self.window = window
+        self._values = deque()
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def __len__(self):
+        return len(self._values)
+
+    def update(self, x):
+        values = self._values
+        if len(values) < self.window:
+            values.append(x)
+            delta = x - self.mean
+            self.mean += delta / len(values)
+            self._m2 += delta * (x - self.mean)
+        else:
+            old = values.popleft()
+            values.append(x)
+            prev_mean = self.mean
+            self.mean += (x - old) / self.window
+            self._m2 += (x - old) * (x - self.mean + old - prev_mean)
+            if self._m2 < 0.0:
+                self._m2 = 0.0
+
+    @property
+    def full(self):
+        return len(self._values) >= self.window
+
+    def variance(self, ddof=1):
+        n = len(self._values)
+        return self._m2 / (n - ddof) if n > ddof else None
+
+    def std(self, ddof=1):
+        var = self.variance(ddof)
+        return None if var is None else sqrt(var)
+
+
+class VolTracker:
+    """Simple-return volatility over several concurrent windows.
+
+    ``annualization`` is the number of bars per year (252 for daily bars);
+    leave it ``None`` to get per-bar standard deviations.
+    """
+
+    def __init__(self, windows=(20, 80), annualization=None):
+        self.windows = tuple(windows)
+        self.annualization = annualization
+        self._moments = {w: RollingMoments(w) for w in self.windows}
+        self.prev_close = None
+
+    def update(self, close):
+        """Feed one close; returns the simple return, or None for the first bar."""
+        prev = self.prev_close
+        self.prev_close = close
+        if prev is None or prev <= 0:
+            return None
+        r = close / prev - 1.0
+        for m in self._moments.values():
+            m.update(r)
+        return r
+
+    def count(self, window):
+        return len(self._moments[window])
+
+    def std(self, window):
+        return self._moments[window].std()
+
+    def vol(self, window):
+        std = self.std(window)
+        if std is None or self.annualization is None:
+            return std
+        return std * sqrt(self.annualization)
+
+    def ratio(self, recent=None, baseline=None):
+        """Recent over baseline std (default: first and last window); None until both are full."""
+        recent = self.windows[0] if recent is None else recent
+        baseline = self.windows[-1] if baseline is None else baseline
+        a, b = self._moments[recent], self._moments[baseline]
+        if not (a.full and b.full):
+            return None
+        sb = b.std()
+        return a.std() / sb if sb > 0 else None
+
+
+class BatchVolTracker:
+    """``VolTracker`` for ``size`` tickers; every result is an array, NaN when undefined."""
+
+    def __init__(self, size, windows=(20, 80), annualization=None):
+        self.windows = tuple(windows)
+        self.annualization = annualization
+        depth = max(self.windows)
+        self.prev_close = np.full(size, np.nan)
+        self.counts = np.zeros(size, dtype=np.int64)
+        self._returns = np.zeros((size, depth))
+        self._rows = np.arange(size)
+        self._mean = {w: np.zeros(size) for w in self.windows}
+        self._m2 = {w: np.zeros(size) for w in self.windows}
+
+    def update(self, close, mask=None):
+        close = np.asarray(close, dtype=np.float64)
+        sel = ~np.isnan(close) if mask is None else np.asarray(mask, dtype=bool) & ~np.isnan(close)
+        prev = self.prev_close
+        step = sel & (prev > 0)
+        self.prev_close = np.where(sel, close, prev)
+        idx = self._rows[step]
+        if not len(idx):
+            return
+        r = close[idx] / prev[idx] - 1.0
+        depth = self._returns.shape[1]
+        n = self.counts[idx]
+        for w in self.windows:
+            mean, m2 = self._mean[w], self._m2[w]
+            growing = n < w
+            g, f = idx[growing], idx[~growing]
+            if len(g):
+                x = r[growing]
+                delta = x - mean[g]
+                mean[g] += delta / (n[growing] + 1)
+                m2[g] += delta * (x - mean[g])
+            if len(f):
+                x = r[~growing]
+                old = self._returns[f, (n[~growing] - w) % depth]
+                prev_mean = mean[f].copy()
+                mean[f] += (x - old) / w
+                m2[f] = np.maximum(m2[f] + (x - old) * (x - mean[f] + old - prev_mean), 0.0)
+        self._returns[idx, n % depth] = r
+        self.counts[idx] += 1
+
+    def std(self, window):
+        n = np.minimum(self.counts, window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(n > 1, np.sqrt(self._m2[window] / (n - 1)), np.nan)
+
+    def vol(self, window):
+        std = self.std(window)
+        return std if self.annualization is None else std * sqrt(self.annualization)
+
+    def ratio(self, recent=None, baseline=None):
+        recent = self.windows[0] if recent is None else recent
+        baseline = self.windows[-1] if baseline is None else baseline
+        full = self.counts >= max(recent, baseline)
+        sb = self.std(baseline)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(full & (sb > 0), self.std(recent) / sb, np.nan)
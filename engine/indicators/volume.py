@@ -0,0 +1,130 @@
+"""Streaming VWAP/VWMA and relative volume.
+
+The conviction family rebuilds a DataFrame per ticker per bar just to take
+``(close * volume).sum() / volume.sum()`` over the last 12 bars and
+``volume.tail(20).mean()``. ``VolumeKernel`` keeps those rolling sums
+instead: VWAP (identical to pandas_ta's ``vwma`` over the same length),
+average volume and RVOL are all O(1) per bar. ``BatchVolumeKernel`` does
+the whole universe in one vectorized step and can score it directly,
+including the scalpers' two other gates: at least ``min_bars`` bars of
+history and price above the mean close of that history (all of it, or
+the last ``sma_len`` bars when the platform buffer is bounded).
+"""
+import numpy as np
+
+from engine.indicators.sma import BatchRollingSum, RollingSum
+
+
+class VolumeKernel:
+    """Rolling sum(close * volume), sum(volume) and the volume SMA for one ticker."""
+
+    def __init__(self, vwap_len=12, vol_len=20):
+        self.vwap_len = vwap_len
+        self.vol_len = vol_len
+        self._pv = RollingSum(vwap_len)
+        self._v = RollingSum(vwap_len)
+        self._vol = RollingSum(vol_len)
+        self.volume = None
+
+    def update(self, close, volume):
+        self._pv.update(close * volume)
+        self._v.update(volume)
+        self._vol.update(volume)
+        self.volume = volume
+        return self.vwap, self.rvol
+
+    def update_bar(self, bar):
+        return self.update(bar["close"], bar["volume"])
+
+    @property
+    def vwap(self):
+        if not self._pv.ready:
+            return None
+        v = self._v.value
+        return self._pv.value / v if v > 0 else None
+
+    vwma = vwap
+
+    @property
+    def avg_volume(self):
+        return self._vol.value / self.vol_len if self._vol.ready else None
+
+    @property
+    def rvol(self):
+        """Last volume over the ``vol_len`` average (which includes it); 0 if the average is 0."""
+        avg = self.avg_volume
+        if avg is None:
+            return None
+        return self.volume / avg if avg > 0 else 0.0
+
+
+class BatchVolumeKernel:
+    """``VolumeKernel`` for ``size`` tickers at once; results are arrays, NaN until ready.
+
+    ``sma_len`` is the window of the trend mean ``scores`` gates on; None
+    averages every close seen.
+    """
+
+    def __init__(self, size, vwap_len=12, vol_len=20, sma_len=None):
+        self.vwap_len = vwap_len
+        self.vol_len = vol_len
+        self.sma_len = sma_len
+        self._pv = BatchRollingSum(np.full(size, vwap_len))
+        self._v = BatchRollingSum(np.full(size, vwap_len))
+        self._vol = BatchRollingSum(np.full(size, vol_len))
+        self._close = None if sma_len is None else BatchRollingSum(np.full(size, sma_len))
+        self._total = np.zeros(size)
+        self.count = np.zeros(size, dtype=np.int64)
+        self.volume = np.full(size, np.nan)
+
+    def update(self, close, volume, mask=None):
+        close = np.asarray(close, dtype=np.float64)
+        volume = np.asarray(volume, dtype=np.float64)
+        self._pv.update(close * volume, mask)
+        self._v.update(volume, mask)
+        self._vol.update(volume, mask)
+        if self._close is not None:
+            self._close.update(close, mask)
+        seen = np.ones(len(close), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        self._total += np.where(seen, close, 0.0)
+        self.count += seen
+        self.volume = volume if mask is None else np.where(mask, volume, self.volume)
+        return self.vwap, self.rvol
+
+    @property
+    def vwap(self):
+        v = self._v.sums
+        ok = self._pv.ready & (v > 0)
+        return np.where(ok, self._pv.sums / np.where(ok, v, 1.0), np.nan)
+
+    vwma = vwap
+
+    @property
+    def avg_volume(self):
+        return np.where(self._vol.ready, self._vol.sums / self.vol_len, np.nan)
+
+    @property
+    def rvol(self):
+        avg = self.avg_volume
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(avg > 0, self.volume / avg, np.where(np.isnan(avg), np.nan, 0.0))
+
+    @property
+    def sma(self):
+        """Mean close over ``sma_len`` bars, or over every bar seen."""
+        if self._close is not None:
+            return np.where(self._close.ready, self._close.sums / self.sma_len, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.count > 0, self._total / self.count, np.nan)
+
+    def scores(self, close, rvol_threshold, min_bars=78):
+        """Conviction score per ticker, the rule of 07321b2d's
+        ``get_conviction_score``: RVOL where there are ``min_bars`` bars,
+        price is above both VWAP and ``sma`` and RVOL clears the
+        threshold, else 0."""
+        close = np.asarray(close)
+        rvol = self.rvol
+        with np.errstate(invalid="ignore"):
+            ok = ((self.count >= min_bars) & (close > self.vwap) & (close > self.sma)
+                  & (rvol >= rvol_threshold))
+        return np.where(ok, rvol, 0.0)
@@ -0,0 +1,60 @@
+"""Load a strategy directory's ``main.py`` as a module.
+
+Every directory in this tree holds one ``main.py`` defining
+``TradingStrategy``. They are loaded under a module name derived from the
+directory, so any number can live in one process side by side. Where
+the platform's ``surmount`` package is not installed, the stand-in in
+``engine.stubs`` is put on the path first. Where ``pandas_ta`` is not
+installed, ``import pandas_ta as ta`` resolves to ``engine.ta``, which
+covers every function the strategies here call.
+"""
+import importlib.util
+import os
+import sys
+
+from engine import stubs
+
+
+def main_path(path):
+    """``path`` itself if it is a file, else ``path/main.py``."""
+    return path if os.path.isfile(path) else os.path.join(path, "main.py")
+
+
+def module_name(path):
+    directory = os.path.basename(os.path.dirname(os.path.abspath(main_path(path))))
+    return "strategy_" + "".join(ch if ch.isalnum() else "_" for ch in directory)
+
+
+def _alias_pandas_ta():
+    if "pandas_ta" in sys.modules or importlib.util.find_spec("pandas_ta") is not None:
+        return
+    from engine import ta
+    sys.modules["pandas_ta"] = ta
+
+
+def load_module(path, fresh=False):
+    """Import ``main.py`` at ``path``; reuses an earlier import unless ``fresh``."""
+    name = module_name(path)
+    if not fresh and name in sys.modules:
+        return sys.modules[name]
+    stubs.install()
+    _alias_pandas_ta()
+    spec = importlib.util.spec_from_file_location(name, main_path(path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        sys.modules.pop(name, None)
+        raise
+    return module
+
+
+def strategy_class(path):
+    return load_module(path).TradingStrategy
+
+
+def discover(root):
+    """Every strategy directory under ``root``, sorted."""
+    return sorted(os.path.join(root, d) for d in os.listdir(root)
+                  if os.path.isfile(os.path.join(root, d, "main.py")))
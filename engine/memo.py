@@ -0,0 +1,34 @@
+"""Per-bar memoization.
+
+A strategy that asks for ``ADX(t, ohlcv, 14)[-1]`` in a guard and again to
+read it should pay for it once. ``BarMemo`` keeps values for the current
+bar only and forgets them as soon as a newer bar key is seen.
+"""
+
+
+class BarMemo:
+
+    def __init__(self):
+        self.bar = None
+        self._values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def advance(self, bar):
+        """Start a new bar; drops every value memoized for the previous one."""
+        if bar != self.bar:
+            self.bar = bar
+            self._values.clear()
+
+    def get(self, key, compute):
+        try:
+            value = self._values[key]
+        except KeyError:
+            self.misses += 1
+            value = self._values[key] = compute()
+            return value
+        self.hits += 1
+        return value
+
+    def __contains__(self, key):
+        return key in self._values
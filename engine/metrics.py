@@ -0,0 +1,65 @@
+"""Summary statistics for equity curves.
+
+Every function takes the equity curve (one value per bar) as a 1-D array;
+``periods`` is the number of bars per year, looked up from the strategy's
+interval with ``periods_per_year``.
+"""
+import numpy as np
+
+PERIODS = {
+    "1min": 252 * 390,
+    "5min": 252 * 78,
+    "15min": 252 * 26,
+    "30min": 252 * 13,
+    "1hour": 252 * 7,
+    "4hour": 252 * 2,
+    "1day": 252,
+    "1week": 52,
+}
+
+
+def periods_per_year(interval):
+    return PERIODS.get(interval, 252)
+
+
+def returns(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    return equity[1:] / equity[:-1] - 1.0
+
+
+def sharpe(equity, periods=252):
+    r = returns(equity)
+    if len(r) < 2:
+        return np.nan
+    std = r.std(ddof=1)
+    return float(r.mean() / std * np.sqrt(periods)) if std > 0 else np.nan
+
+
+def max_drawdown(equity):
+    """Largest peak-to-trough loss as a positive fraction."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if not len(equity):
+        return np.nan
+    return float(1.0 - (equity / np.maximum.accumulate(equity)).min())
+
+
+def terminal(equity):
+    return float(equity[-1]) if len(equity) else np.nan
+
+
+def cagr(equity, periods=252):
+    equity = np.asarray(equity, dtype=np.float64)
+    if len(equity) < 2 or equity[0] <= 0:
+        return np.nan
+    years = (len(equity) - 1) / periods
+    return float((equity[-1] / equity[0]) ** (1.0 / years) - 1.0)
+
+
+def summary(equity, periods=252):
+    return {
+        "terminal": terminal(equity),
+        "total_return": terminal(equity) / float(equity[0]) - 1.0 if len(equity) else np.nan,
+        "cagr": cagr(equity, periods),
+        "sharpe": sharpe(equity, periods),
+        "max_drawdown": max_drawdown(equity),
+    }
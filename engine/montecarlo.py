@@ -0,0 +1,125 @@
+"""Monte Carlo runs of random-entry null tests.
+
+The NULL TEST strategies draw entries from ``self.rng``, seeded from
+``self.seed`` in ``__init__``. A handful of seeds cannot separate an edge
+from luck. Here the seed and ``entry_probability`` are injected from
+outside (``engine.sweep.apply`` rebuilds the RNG), and hundreds or
+thousands of seeds fan out over the shared-memory sweep pool. The result
+is the null distribution of terminal value, drawdown and Sharpe. Where a
+real strategy is given, its result is reported next to it with the
+percentile it reaches.
+
+    python -m engine.montecarlo BARS NULL_STRATEGY [--seeds 1000] [--real STRATEGY]
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import load_bars, run_path
+from engine.sweep import Sweep
+
+REPORTED = ("terminal", "max_drawdown", "sharpe")
+QUANTILES = (0.05, 0.25, 0.5, 0.75, 0.95)
+
+
+def percentile(values, value):
+    """Share of ``values`` below ``value``, counting ties as half, in percent."""
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values) or value is None or np.isnan(value):
+        return np.nan
+    return 100.0 * (np.count_nonzero(values < value) + 0.5 * np.count_nonzero(values == value)) / len(values)
+
+
+class MonteCarloResult:
+    """Per-seed rows plus the real strategy's metrics, if one was run."""
+
+    def __init__(self, runs, real=None):
+        self.runs = runs
+        self.real = real
+
+    @property
+    def errors(self):
+        return self.runs[self.runs["error"].notna()]
+
+    def summary(self):
+        """One row per reported metric: the null distribution's moments and
+        quantiles, the real value and its percentile within the null."""
+        ok = self.runs[self.runs["error"].isna()]
+        rows = []
+        for name in REPORTED:
+            values = ok[name].to_numpy(dtype=np.float64)
+            row = {"metric": name, "seeds": int(np.count_nonzero(~np.isnan(values))),
+                   "mean": np.nanmean(values) if len(values) else np.nan,
+                   "std": np.nanstd(values, ddof=1) if len(values) > 1 else np.nan}
+            for q in QUANTILES:
+                row[f"p{int(q * 100)}"] = np.nanquantile(values, q) if len(values) else np.nan
+            real = None if self.real is None else self.real.get(name)
+            row["real"] = real
+            row["real_percentile"] = percentile(values, real) if real is not None else np.nan
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+
+class MonteCarlo:
+    """``strategy`` (a NULL TEST directory or class) over many seeds.
+
+    ``real`` is a strategy directory to compare with; ``options`` go to
+    every backtest (capital, cost, start, stop).
+    """
+
+    def __init__(self, strategy, bars, seeds=1000, entry_probability=None, real=None,
+                 workers=None, **options):
+        self.strategy = strategy
+        self.bars = bars
+        self.seeds = list(range(seeds) if isinstance(seeds, int) else seeds)
+        self.entry_probability = entry_probability
+        self.real = real
+        self.workers = workers
+        self.options = options
+
+    def points(self):
+        extra = {} if self.entry_probability is None else {"entry_probability": self.entry_probability}
+        return [{"seed": seed, **extra} for seed in self.seeds]
+
+    def run(self, out=None):
+        real = None
+        if self.real is not None:
+            result = run_path(self.real, self.bars, **self.options)
+            real = {"error": result.error} if result.error else result.metrics()
+        runs = Sweep(self.strategy, self.points(), self.bars, self.workers, **self.options).run(out)
+        return MonteCarloResult(runs, real)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.montecarlo", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategy", help="NULL TEST strategy directory")
+    parser.add_argument("--seeds", type=int, default=1000)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--entry-probability", type=float, default=None)
+    parser.add_argument("--real", default=None, help="strategy directory to place within the null")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--out", default=None, help="CSV of per-seed rows, written as they arrive")
+    args = parser.parse_args(argv)
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    began = time.perf_counter()
+    result = MonteCarlo(args.strategy, load_bars(args.bars), seeds, args.entry_probability, args.real,
+                        args.workers, capital=args.capital, cost=args.cost, start=args.start).run(args.out)
+    elapsed = time.perf_counter() - began
+    with pd.option_context("display.width", 200, "display.float_format", "{:,.4f}".format):
+        print(result.summary().to_string(index=False))
+    if result.real and "error" in result.real:
+        print(f"real strategy failed: {result.real['error']}")
+    if len(result.errors):
+        print(f"{len(result.errors)} seeds failed, first: {result.errors['error'].iloc[0]}")
+    print(f"{len(seeds)} seeds in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
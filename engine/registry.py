@@ -0,0 +1,151 @@
+"""Process-wide memoized indicator registry.
+
+Many strategies in this tree compute the same series on the same tickers
+every bar -- VXX averages, the QQQ 200-day SMA, ATR(14) on SOXL. When they
+share a process they can share the work: each strategy subscribes to the
+indicators it reads, every strategy hands the registry its ``ohlcv`` each
+bar, and each subscribed indicator is advanced exactly once per new bar,
+however many strategies ingest the same feed.
+
+Indicators are keyed by ``(ticker, interval, indicator, params)`` and
+reference counted; the engine behind a key is dropped when its last
+subscriber unsubscribes.
+"""
+from engine.feed import Feed
+from engine.indicators import ADX, ATR, EMA, MACD, SMA, VolTracker, VolumeKernel
+
+INDICATORS = {}
+
+
+def register(name, factory, feed, read=lambda engine: engine.value):
+    """Make ``name`` available to ``subscribe``.
+
+    ``factory(**params)`` builds an engine, ``feed(engine, bar)`` advances
+    it by one bar, and ``read(engine)`` returns the value ``value`` serves.
+    """
+    INDICATORS[name] = (factory, feed, read)
+
+
+def _close(engine, bar):
+    engine.update(bar["close"])
+
+
+def _hlc(engine, bar):
+    engine.update(bar["high"], bar["low"], bar["close"])
+
+
+def _close_volume(engine, bar):
+    engine.update(bar["close"], bar["volume"])
+
+
+register("sma", SMA, _close)
+register("ema", EMA, _close)
+register("macd", MACD, _close)
+register("atr", ATR, _hlc)
+register("adx", ADX, _hlc)
+register("vwap", VolumeKernel, _close_volume, lambda e: (e.vwap, e.rvol))
+register("vol", VolTracker, _close, lambda e: e.ratio())
+
+
+def make_key(ticker, interval, indicator, **params):
+    return (ticker, interval, indicator, tuple(sorted(params.items())))
+
+
+class IndicatorRegistry:
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._feeds = {}
+        self._cursors = {}
+        self._engines = {}
+        self._refs = {}
+        self._last = {}
+        self._by_series = {}
+        self.updates = 0
+
+    def feed(self, interval):
+        feed = self._feeds.get(interval)
+        if feed is None:
+            feed = self._feeds[interval] = Feed(self.capacity)
+            self._cursors[interval] = 0
+        return feed
+
+    def subscribe(self, ticker, interval, indicator, **params):
+        """Take a reference on an indicator and return its key.
+
+        A new engine is warmed up from whatever bars the registry already
+        holds for that ticker and interval.
+        """
+        if indicator not in INDICATORS:
+            raise KeyError(f"unknown indicator {indicator!r}")
+        key = make_key(ticker, interval, indicator, **params)
+        self._refs[key] = self._refs.get(key, 0) + 1
+        if key not in self._engines:
+            factory, feed, _ = INDICATORS[indicator]
+            engine = self._engines[key] = factory(**params)
+            self._by_series.setdefault((ticker, interval), set()).add(key)
+            last = None
+            for _, t, bar in self.feed(interval).events():
+                if t == ticker:
+                    feed(engine, bar)
+                    last = bar["epoch"]
+            self._last[key] = last
+        return key
+
+    def unsubscribe(self, key):
+        refs = self._refs.get(key, 0) - 1
+        if refs > 0:
+            self._refs[key] = refs
+            return
+        self._refs.pop(key, None)
+        self._engines.pop(key, None)
+        self._last.pop(key, None)
+        keys = self._by_series.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_series[key[:2]]
+
+    def refs(self, key):
+        return self._refs.get(key, 0)
+
+    def __len__(self):
+        return len(self._engines)
+
+    def ingest(self, interval, ohlcv):
+        """Advance every subscribed indicator by the bars it has not seen.
+
+        Safe to call from every strategy on every bar: bars already taken
+        in by an earlier caller are skipped, so the work happens once.
+        """
+        feed = self.feed(interval)
+        feed.ingest(ohlcv)
+        cursor = self._cursors[interval]
+        for epoch, ticker, bar in feed.events(cursor):
+            for key in self._by_series.get((ticker, interval), ()):
+                last = self._last[key]
+                if last is None or epoch > last:
+                    INDICATORS[key[2]][1](self._engines[key], bar)
+                    self._last[key] = epoch
+                    self.updates += 1
+        self._cursors[interval] = len(feed)
+
+    def engine(self, key):
+        return self._engines[key]
+
+    def value(self, key):
+        return INDICATORS[key[2]][2](self._engines[key])
+
+    def get(self, ticker, interval, indicator, **params):
+        return self.value(make_key(ticker, interval, indicator, **params))
+
+
+_shared = None
+
+
+def shared():
+    """The registry every strategy in this process should use."""
+    global _shared
+    if _shared is None:
+        _shared = IndicatorRegistry()
+    return _shared
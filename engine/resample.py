@@ -0,0 +1,179 @@
+"""Incremental resampling of intraday bars into longer timeframes.
+
+Strategies fake longer timeframes by counting 5-minute bars
+(``vix_ma_len = 390`` for five days, ``trend_len = 78`` for one day).
+That keeps thousands of bars for a few dozen daily closes and goes wrong
+on half-days, when a day is not 78 bars. A ``Resampler`` takes the base
+bars as they arrive and keeps one ``BarStore`` per longer timeframe
+(15min, 1hour, 1day by default), plus the bar each one is still forming.
+Every base bar costs O(1) per timeframe.
+
+Buckets come from the fields ``engine.sessions`` stamps on every bar, not
+from wall-clock arithmetic:
+
+    N min / N hour   ``(session, minute // N)``: aligned to the 09:30 open,
+                     so the last hour of a regular day is 15:30-16:00
+    1day             ``session``: a day is whatever bars the session has,
+                     so a 13:00 half-day is one daily bar like any other
+
+A bucket is stored when the base bar that ends it arrives (the 10:10 bar
+ends the 10:00 quarter hour, the 15:55 bar ends the day). A bucket
+whose last bar never comes, such as the end of a half-day, is stored
+when the next bucket starts or on ``flush``. Aggregated bars are stamped
+at the start of their bucket, daily bars at midnight like the daily
+files in this tree. ``forming`` hands out the bar in progress, for logic
+that wants today's high so far.
+
+``Feed(frames=...)`` drives a resampler from the same ingestion as the
+base store, so one subscription serves 5-minute entries and daily
+signals.
+"""
+import re
+from datetime import timedelta
+
+from engine.sessions import OPEN_MINUTE, _EPOCH, stamp
+from engine.store import BarStore
+
+FRAMES = ("15min", "1hour", "1day")
+CLOSE_MINUTE = 16 * 60 - OPEN_MINUTE
+
+_FRAME = re.compile(r"^(\d+)(min|hour|day)$")
+_ORDINAL_1970 = _EPOCH.toordinal()
+
+
+def frame_minutes(frame):
+    """Bucket width of ``frame`` in minutes; None for ``1day`` (one session)."""
+    match = _FRAME.match(frame)
+    if match is None:
+        raise ValueError(f"unknown timeframe {frame!r}")
+    count, unit = int(match.group(1)), match.group(2)
+    if unit == "day":
+        if count != 1:
+            raise ValueError(f"only single-session days are supported, not {frame!r}")
+        return None
+    return count * (60 if unit == "hour" else 1)
+
+
+class _Forming:
+    """The open bucket of one ticker in one timeframe."""
+
+    __slots__ = ("key", "epoch", "session", "minute", "open", "high", "low", "close", "volume")
+
+    def __init__(self, key, epoch, session, minute, bar):
+        self.key = key
+        self.epoch = epoch
+        self.session = session
+        self.minute = minute
+        self.open = bar["open"]
+        self.high = bar["high"]
+        self.low = bar["low"]
+        self.close = bar["close"]
+        self.volume = bar["volume"]
+
+    def update(self, bar):
+        if bar["high"] > self.high:
+            self.high = bar["high"]
+        if bar["low"] < self.low:
+            self.low = bar["low"]
+        self.close = bar["close"]
+        self.volume += bar["volume"]
+
+    def bar(self):
+        date = (_EPOCH + timedelta(seconds=self.epoch)).strftime("%Y-%m-%d %H:%M:%S")
+        return {"open": self.open, "high": self.high, "low": self.low, "close": self.close,
+                "volume": self.volume, "date": date,
+                "epoch": self.epoch, "session": self.session, "minute": self.minute}
+
+
+class Resampler:
+    """Longer timeframes built from base bars as they arrive.
+
+    ``base`` is the base bar width (``"5min"``). It lets a bucket be
+    stored as soon as its last bar arrives; with None, buckets are stored
+    when the next one starts. ``capacity`` is the history kept per
+    timeframe, an int or ``{frame: int}``.
+    """
+
+    def __init__(self, frames=FRAMES, base="5min", capacity=4096):
+        self.frames = tuple(frames)
+        self.widths = {frame: frame_minutes(frame) for frame in self.frames}
+        self.base = None if base is None else frame_minutes(base)
+        if not isinstance(capacity, dict):
+            capacity = dict.fromkeys(self.frames, capacity)
+        self.stores = {frame: BarStore(capacity[frame]) for frame in self.frames}
+        self._forming = {frame: {} for frame in self.frames}
+        self._last = {}
+
+    def store(self, frame):
+        return self.stores[frame]
+
+    def forming(self, frame, ticker):
+        """The bar ``ticker`` is building in ``frame``, or None."""
+        forming = self._forming[frame].get(ticker)
+        return None if forming is None else forming.bar()
+
+    def _start(self, width, epoch, session, minute):
+        """``(key, epoch, minute)`` of the bucket a bar stamped so falls in."""
+        if width is None:
+            midnight = (session - _ORDINAL_1970) * 86400
+            return session, midnight, -OPEN_MINUTE
+        start = minute // width * width
+        return (session, start), epoch - (minute - start) * 60, start
+
+    def _ends(self, width, minute):
+        if self.base is None or minute >= CLOSE_MINUTE:
+            return False
+        end = minute + self.base
+        return end >= CLOSE_MINUTE or width is not None and end % width == 0
+
+    def append(self, ticker, bar):
+        """Add one base bar; returns the frames that stored a finished bar.
+
+        Bars not newer than the ticker's last are dropped.
+        """
+        epoch = stamp(bar)
+        last = self._last.get(ticker)
+        if last is not None and epoch <= last:
+            return ()
+        self._last[ticker] = epoch
+        session, minute = bar["session"], bar["minute"]
+        done = []
+        for frame in self.frames:
+            width = self.widths[frame]
+            key, start, first = self._start(width, epoch, session, minute)
+            open_ = self._forming[frame]
+            forming = open_.get(ticker)
+            if forming is not None and forming.key == key:
+                forming.update(bar)
+            else:
+                if forming is not None:
+                    self.stores[frame].append(ticker, forming.bar())
+                    done.append(frame)
+                forming = open_[ticker] = _Forming(key, start, session, first, bar)
+            if self._ends(width, minute):
+                self.stores[frame].append(ticker, forming.bar())
+                del open_[ticker]
+                if not done or done[-1] != frame:
+                    done.append(frame)
+        return tuple(done)
+
+    def ingest(self, snapshot):
+        """Add every bar of one ``{ticker: bar}`` snapshot."""
+        for ticker, bar in snapshot.items():
+            self.append(ticker, bar)
+
+    def flush(self):
+        """Store every bucket still forming, e.g. at the end of the data."""
+        for frame in self.frames:
+            for ticker, forming in self._forming[frame].items():
+                self.stores[frame].append(ticker, forming.bar())
+            self._forming[frame].clear()
+
+
+def resample(bars, frames=FRAMES, base="5min", capacity=4096):
+    """A flushed ``Resampler`` over ``(ticker, bar)`` pairs in time order."""
+    resampler = Resampler(frames, base, capacity)
+    for ticker, bar in bars:
+        resampler.append(ticker, bar)
+    resampler.flush()
+    return resampler
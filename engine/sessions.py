@@ -0,0 +1,129 @@
+"""Bar timestamps parsed once, plus a session calendar.
+
+Strategies gate on time of day by running ``pd.to_datetime`` over a bar's
+date, sometimes over the whole history, on every bar. ``stamp`` parses a
+bar's ``date`` once at ingestion and stores three integers on the bar:
+
+    epoch    seconds since 1970, exchange wall-clock time
+    session  ``date.toordinal()`` of the trading day
+    minute   minutes since the 09:30 open (negative before it)
+
+so ``bar["minute"] >= at(15, 55)`` replaces a datetime parse. Dates are
+read as exchange wall-clock time; an aware datetime keeps its own wall
+clock and drops the zone.
+"""
+from bisect import bisect_left
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+import numpy as np
+
+OPEN_MINUTE = 9 * 60 + 30
+_EPOCH = datetime(1970, 1, 1)
+
+
+def at(hour, minute=0):
+    """Minute-of-session for a wall-clock time, e.g. ``at(15, 55) == 385``."""
+    return hour * 60 + minute - OPEN_MINUTE
+
+
+def _fields(dt):
+    if dt.tzinfo is not None:
+        dt = dt.replace(tzinfo=None)
+    epoch = (dt - _EPOCH) // timedelta(seconds=1)
+    return epoch, dt.toordinal(), dt.hour * 60 + dt.minute - OPEN_MINUTE
+
+
+@lru_cache(maxsize=8192)
+def _parse_text(text):
+    # Every ticker in a snapshot carries the same date string, so the
+    # cache turns most parses into a dict hit.
+    return _fields(datetime.fromisoformat(text))
+
+
+def parse(value):
+    """``(epoch, session, minute)`` for a date string, datetime or epoch."""
+    if isinstance(value, str):
+        return _parse_text(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return _fields(_EPOCH + timedelta(seconds=int(value)))
+    return _fields(value)
+
+
+def to_epoch(value):
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return parse(value)[0]
+
+
+def stamp(bar):
+    """Attach ``epoch``/``session``/``minute`` to a bar once; return its epoch."""
+    epoch = bar.get("epoch")
+    if epoch is None:
+        epoch, bar["session"], bar["minute"] = parse(bar["date"])
+        bar["epoch"] = epoch
+    return epoch
+
+
+class SessionCalendar:
+    """Distinct bar timestamps in order, mapped to offsets and sessions.
+
+    Offsets count timestamps from the first one seen, which is also the
+    index of the matching snapshot in a snapshot-layout history.
+    """
+
+    def __init__(self):
+        self._epochs = []
+        self._offsets = {}
+        self._session_starts = {}
+        self._sessions = []
+
+    def __len__(self):
+        return len(self._epochs)
+
+    def add(self, epoch, session):
+        """Record a timestamp; returns its offset. Out-of-order stamps are ignored."""
+        offset = self._offsets.get(epoch)
+        if offset is not None:
+            return offset
+        if self._epochs and epoch < self._epochs[-1]:
+            return None
+        offset = self._offsets[epoch] = len(self._epochs)
+        self._epochs.append(epoch)
+        if not self._sessions or self._sessions[-1] != session:
+            self._sessions.append(session)
+            self._session_starts[session] = offset
+        return offset
+
+    def offset(self, epoch):
+        """Offset of an exact timestamp, or None if it was never seen."""
+        return self._offsets.get(epoch)
+
+    def locate(self, epoch):
+        """Offset of the first timestamp at or after ``epoch``."""
+        return bisect_left(self._epochs, epoch)
+
+    def epoch(self, offset):
+        return self._epochs[offset]
+
+    @property
+    def sessions(self):
+        return list(self._sessions)
+
+    def session_start(self, session):
+        return self._session_starts.get(session)
+
+    def session_bounds(self, session):
+        """``[start, stop)`` offsets of one session's bars."""
+        start = self._session_starts.get(session)
+        if start is None:
+            return None
+        i = bisect_left(self._sessions, session)
+        stop = (self._session_starts[self._sessions[i + 1]]
+                if i + 1 < len(self._sessions) else len(self._epochs))
+        return start, stop
+
+    def bars_since_open(self, offset):
+        """How many bars of the current session precede ``offset``."""
+        epoch = self._epochs[offset]
+        return offset - self._session_starts[parse(epoch)[1]]
@@ -0,0 +1,141 @@
+"""Columnar per-ticker OHLCV ring buffers.
+
+Every strategy that rebuilds a ticker's history with
+``[bar[t] for bar in ohlcv if t in bar]`` pays O(N) per bar, O(N^2) over a
+backtest. A ``BarStore`` is filled once per bar in O(1) (see
+``engine.feed`` for reading it from ``data["ohlcv"]``) and hands back tail
+windows as NumPy views, so ``store.close("SOXL")[-390:]`` copies nothing.
+"""
+import numpy as np
+
+from engine.sessions import stamp
+
+FIELDS = ("open", "high", "low", "close", "volume")
+CLOCK = ("timestamp", "session", "minute")
+
+
+class _Ring:
+    """Mirrored column block for one ticker.
+
+    Each row is written twice, ``capacity`` slots apart, so the newest
+    ``capacity`` rows are always one contiguous slice of the block.
+    """
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        self.head = 0
+        self.prices = np.zeros((len(FIELDS), 2 * capacity))
+        self.clock = np.zeros((len(CLOCK), 2 * capacity), dtype=np.int64)
+
+    def append(self, row, clock):
+        h, c = self.head, self.capacity
+        self.prices[:, h] = row
+        self.prices[:, h + c] = row
+        self.clock[:, h] = clock
+        self.clock[:, h + c] = clock
+        self.head = h + 1 if h + 1 < c else 0
+        self.count += 1
+
+    def _window(self, column):
+        end = self.head + self.capacity
+        view = column[end - min(self.count, self.capacity):end]
+        view.flags.writeable = False
+        return view
+
+    def prices_view(self, index):
+        return self._window(self.prices[index])
+
+    def clock_view(self, index):
+        return self._window(self.clock[index])
+
+    def last_stamp(self):
+        return int(self.clock[0, self.head + self.capacity - 1]) if self.count else None
+
+
+class BarStore:
+    """Per-ticker ring buffers of OHLCV plus timestamp/session/minute.
+
+    Appends are O(1). Column accessors return read-only views of at most
+    ``capacity`` rows, oldest first; a view is only valid until the next
+    append to that ticker overwrites the slot it points at.
+    """
+
+    def __init__(self, capacity=4096):
+        self.capacity = capacity
+        self._rings = {}
+        self._latest = None
+
+    def __contains__(self, ticker):
+        return ticker in self._rings
+
+    def __len__(self):
+        return len(self._rings)
+
+    @property
+    def tickers(self):
+        return list(self._rings)
+
+    @property
+    def latest(self):
+        """Timestamp of the newest bar stored for any ticker."""
+        return self._latest
+
+    def length(self, ticker):
+        ring = self._rings.get(ticker)
+        return min(ring.count, ring.capacity) if ring else 0
+
+    def last_stamp(self, ticker):
+        ring = self._rings.get(ticker)
+        return ring.last_stamp() if ring else None
+
+    def append(self, ticker, bar):
+        """Add one bar dict; bars not newer than the ticker's last are dropped."""
+        epoch = stamp(bar)
+        ring = self._rings.get(ticker)
+        if ring is None:
+            ring = self._rings[ticker] = _Ring(self.capacity)
+        elif ring.count and epoch <= ring.last_stamp():
+            return False
+        ring.append([bar[f] for f in FIELDS], (epoch, bar["session"], bar["minute"]))
+        if self._latest is None or epoch > self._latest:
+            self._latest = epoch
+        return True
+
+    def ingest(self, snapshot):
+        """Add every bar of one ``{ticker: bar}`` snapshot."""
+        for ticker, bar in snapshot.items():
+            self.append(ticker, bar)
+
+    def column(self, ticker, field):
+        ring = self._rings.get(ticker)
+        if ring is None:
+            return np.empty(0)
+        if field in CLOCK:
+            return ring.clock_view(CLOCK.index(field))
+        return ring.prices_view(FIELDS.index(field))
+
+    def open(self, ticker):
+        return self.column(ticker, "open")
+
+    def high(self, ticker):
+        return self.column(ticker, "high")
+
+    def low(self, ticker):
+        return self.column(ticker, "low")
+
+    def close(self, ticker):
+        return self.column(ticker, "close")
+
+    def volume(self, ticker):
+        return self.column(ticker, "volume")
+
+    def timestamp(self, ticker):
+        return self.column(ticker, "timestamp")
+
+    def session(self, ticker):
+        return self.column(ticker, "session")
+
+    def minute(self, ticker):
+        return self.column(ticker, "minute")
+
@@ -0,0 +1,7 @@
+"""Offline stand-in for the ``surmount`` platform package.
+
+Covers what the strategies in this tree use: ``base_class.Strategy`` and
+``TargetAllocation``, the older ``base`` module, ``logging.log`` and the
+``technical_indicators`` ``ATR``/``ADX`` helpers. ``engine.backtest``
+drives strategies written against it.
+"""
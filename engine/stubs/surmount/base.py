@@ -0,0 +1,15 @@
+"""The older ``surmount.base`` module; strategies using it return plain dicts."""
+from surmount.base_class import Strategy
+
+
+class Asset:
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    def __repr__(self):
+        return f"Asset({self.symbol!r})"
+
+
+class Symbol(Asset):
+    pass
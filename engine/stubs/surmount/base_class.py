@@ -0,0 +1,34 @@
+class Strategy:
+    """Base for ``TradingStrategy``; subclasses override all three members."""
+
+    @property
+    def assets(self):
+        return []
+
+    @property
+    def interval(self):
+        return "1day"
+
+    @property
+    def data(self):
+        return []
+
+    def run(self, data):
+        raise NotImplementedError
+
+
+class TargetAllocation:
+    """Target weights by ticker; tickers left out are sold."""
+
+    def __init__(self, target_allocation):
+        self.target_allocation = dict(target_allocation)
+
+    def __repr__(self):
+        return f"TargetAllocation({self.target_allocation!r})"
+
+
+def backtest(strategy, bars, **kwargs):
+    """Run ``strategy`` over ``bars`` with ``engine.backtest.Backtest``."""
+    from engine.backtest import Backtest
+
+    return Backtest(strategy, bars, **kwargs).run()
@@ -0,0 +1,22 @@
+"""``log`` for strategies run offline.
+
+Messages are kept in ``messages`` (the most recent ``MAX_MESSAGES``)
+rather than printed, so a backtest over many bars is not bound by the
+terminal; ``set_handler(print)`` restores live output.
+"""
+from collections import deque
+
+MAX_MESSAGES = 10000
+
+messages = deque(maxlen=MAX_MESSAGES)
+_handler = messages.append
+
+
+def set_handler(handler):
+    """Route messages to ``handler``; None restores the default buffer."""
+    global _handler
+    _handler = messages.append if handler is None else handler
+
+
+def log(message):
+    _handler(message)
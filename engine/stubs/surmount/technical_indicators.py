@@ -0,0 +1,25 @@
+"""``ATR`` and ``ADX`` as the platform exposes them: full series per call.
+
+Both are served from one ``SeriesBook``, so the engines advance only by
+new bars however often a strategy asks. Warm-up bars read 0.0, as in the
+``ta`` library the platform's indicators follow.
+"""
+from engine.indicators.adx import ADX as _ADX
+from engine.indicators.atr import ATR as _ATR
+from engine.indicators.book import SeriesBook
+
+_book = SeriesBook()
+
+
+def ATR(ticker, data, length):
+    return _book.series(ticker, data, ("atr", length), lambda: _ATR(length, "wilder"), fill=0.0)
+
+
+def ADX(ticker, data, length):
+    return _book.series(ticker, data, ("adx", length), lambda: _ADX(length), fill=0.0)
+
+
+def reset():
+    """Forget every series; a new backtest starts from an empty feed."""
+    global _book
+    _book = SeriesBook()
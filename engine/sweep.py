@@ -0,0 +1,263 @@
+"""Parameter sweeps over a process pool.
+
+A sweep runs one strategy class once per point of a parameter grid. Each
+point's values are set as attributes on a fresh instance after
+``__init__``, so both instance settings (``take_profit_pct``) and class
+constants (``BAND``, ``FLOOR``) can be swept without editing the file.
+
+The bars are copied once into a ``multiprocessing.shared_memory`` block
+(``SharedBars``). Workers come from the pre-warmed fork server and map
+that block instead of loading or unpickling their own copy. Each run goes
+through ``engine.vectorized.backtest``, so kernel-backed strategies never
+enter the event loop. Rows stream back as runs finish, into one table and
+optionally a CSV that grows as the sweep runs.
+
+    python -m engine.sweep BARS STRATEGY BAND=0,0.005,0.01 FLOOR=0,0.25 [--out sweep.csv]
+"""
+import argparse
+import ast
+import csv
+import inspect
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from contextlib import contextmanager
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import Bars, load_bars
+from engine.loader import load_module
+from engine.store import FIELDS
+from engine.vectorized import backtest
+from engine.zygote import PRELOAD
+
+METRICS = ("terminal", "total_return", "cagr", "sharpe", "max_drawdown", "trades", "turnover")
+
+
+class SharedBars:
+    """``Bars`` in one shared-memory block: epochs, then ``(field, ticker, time)``.
+
+    The creating process owns the block and unlinks it on ``close``;
+    ``attach(spec)`` maps it read-only in another process.
+    """
+
+    def __init__(self, bars):
+        k, n = len(bars.tickers), len(bars)
+        self.shm = SharedMemory(create=True, size=max(8 * n * (1 + len(FIELDS) * k), 1))
+        epochs, prices = self._arrays(self.shm, k, n)
+        epochs[:] = bars.epochs
+        for i, field in enumerate(FIELDS):
+            prices[i] = getattr(bars, field)
+        self.spec = (self.shm.name, list(bars.tickers), n, bars.interval)
+        self.bars = self._bars(self.spec, epochs, prices)
+
+    @staticmethod
+    def _arrays(shm, k, n):
+        epochs = np.ndarray((n,), np.int64, shm.buf)
+        prices = np.ndarray((len(FIELDS), k, n), np.float64, shm.buf, offset=8 * n)
+        return epochs, prices
+
+    @staticmethod
+    def _bars(spec, epochs, prices):
+        _, tickers, _, interval = spec
+        return Bars(tickers, epochs, dict(zip(FIELDS, prices)), interval)
+
+    @classmethod
+    def attach(cls, spec):
+        """``(shm, bars)`` for a block created elsewhere; keep ``shm`` alive."""
+        name, tickers, n, _ = spec
+        # Workers share the creator's resource tracker, so attaching
+        # registers nothing new and only the creator's unlink counts.
+        shm = SharedMemory(name=name)
+        epochs, prices = cls._arrays(shm, len(tickers), n)
+        epochs.flags.writeable = False
+        prices.flags.writeable = False
+        return shm, cls._bars(spec, epochs, prices)
+
+    def close(self):
+        self.bars = None
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def grid(**axes):
+    """Every combination of ``axes``' values, as one dict per point."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[n] for n in names))]
+
+
+def reseed(strategy, seed):
+    """Rebuild every RNG ``strategy`` built from its seed in ``__init__``.
+
+    Instance ``random.Random`` / NumPy generators are replaced, and the
+    module-level ``random`` and ``np.random`` states are seeded for
+    strategies that draw from those.
+    """
+    random.seed(seed)
+    np.random.seed(seed % 2 ** 32)
+    for name, value in list(vars(strategy).items()):
+        if isinstance(value, random.Random):
+            setattr(strategy, name, random.Random(seed))
+        elif isinstance(value, np.random.Generator):
+            setattr(strategy, name, np.random.default_rng(seed))
+        elif isinstance(value, np.random.RandomState):
+            setattr(strategy, name, np.random.RandomState(seed % 2 ** 32))
+
+
+def apply(strategy, params):
+    """Set ``params`` on ``strategy``; unknown names are an error, not a no-op.
+
+    A ``seed`` parameter also reseeds the strategy's RNGs (see ``reseed``),
+    since setting the attribute alone would not reach an RNG already built.
+    """
+    for name, value in params.items():
+        if not hasattr(strategy, name):
+            raise AttributeError(f"{type(strategy).__name__} has no parameter {name!r}")
+        setattr(strategy, name, value)
+    if "seed" in params:
+        reseed(strategy, params["seed"])
+    return strategy
+
+
+def locate(strategy):
+    """``(main.py path, class name)`` for a strategy path or class."""
+    if isinstance(strategy, str):
+        return strategy, "TradingStrategy"
+    return inspect.getfile(strategy), strategy.__name__
+
+
+_worker = {}
+
+
+def _init_worker(spec, target, options):
+    shm, bars = SharedBars.attach(spec)
+    path, name = target
+    _worker.update(shm=shm, bars=bars, cls=getattr(load_module(path), name), options=options)
+
+
+def backtest_point(params, **overrides):
+    """In a ``worker_pool`` worker: backtest a fresh instance with
+    ``params`` applied on the shared bars."""
+    options = dict(_worker["options"], **overrides)
+    return backtest(apply(_worker["cls"](), params), _worker["bars"], **options)
+
+
+def _run_point(task):
+    index, params = task
+    row = {"point": index, **params}
+    began = time.perf_counter()
+    try:
+        result = backtest_point(params)
+        row.update(result.metrics())
+        row["kernel"] = result.kernel
+        row["error"] = None
+    except Exception as exc:
+        row.update(dict.fromkeys(METRICS, np.nan))
+        row["kernel"] = None
+        row["error"] = f"{type(exc).__name__}: {exc}"
+    row["seconds"] = time.perf_counter() - began
+    return row
+
+
+@contextmanager
+def worker_pool(strategy, bars, workers=None, method="forkserver", **options):
+    """A pool whose workers map ``bars`` from shared memory and hold the
+    strategy class; ``options`` are the defaults for ``backtest_point``."""
+    context = multiprocessing.get_context(method)
+    if method == "forkserver":
+        context.set_forkserver_preload(list(PRELOAD) + ["engine.vectorized"])
+    with SharedBars(bars) as shared:
+        with context.Pool(workers or os.cpu_count(), _init_worker,
+                          (shared.spec, locate(strategy), options)) as pool:
+            yield pool
+
+
+class Sweep:
+    """One strategy over a parameter grid.
+
+    ``strategy`` is a strategy directory or a ``TradingStrategy`` class;
+    ``options`` go to ``engine.vectorized.backtest`` (capital, cost,
+    start, stop).
+    """
+
+    def __init__(self, strategy, points, bars, workers=None, method="forkserver", **options):
+        self.strategy = strategy
+        self.points = list(points)
+        self.bars = bars
+        self.workers = workers
+        self.method = method
+        self.options = options
+
+    def rows(self):
+        """Result rows in completion order, as each run finishes."""
+        with worker_pool(self.strategy, self.bars, self.workers, self.method, **self.options) as pool:
+            yield from pool.imap_unordered(_run_point, enumerate(self.points))
+
+    def run(self, out=None):
+        """All rows as a frame ordered by point; with ``out``, each row is
+        also appended to that CSV as soon as it arrives."""
+        rows = []
+        handle = writer = None
+        try:
+            for row in self.rows():
+                rows.append(row)
+                if out is not None:
+                    if writer is None:
+                        handle = open(out, "w", newline="")
+                        writer = csv.DictWriter(handle, fieldnames=list(row))
+                        writer.writeheader()
+                    writer.writerow(row)
+                    handle.flush()
+        finally:
+            if handle is not None:
+                handle.close()
+        frame = pd.DataFrame(rows)
+        return frame.sort_values("point", ignore_index=True) if len(frame) else frame
+
+
+def sweep(strategy, bars, workers=None, out=None, **axes):
+    """``Sweep(strategy, grid(**axes), bars, workers).run(out)``."""
+    return Sweep(strategy, grid(**axes), bars, workers).run(out)
+
+
+def parse_axis(text):
+    name, _, values = text.partition("=")
+    if not name or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... not {text!r}")
+    parsed = ast.literal_eval(f"[{values}]")
+    return name, parsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.sweep", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategy", help="strategy directory")
+    parser.add_argument("axes", nargs="+", type=parse_axis, metavar="NAME=v1,v2,...")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--start", type=int, default=0)
+    parser.add_argument("--out", default=None, help="CSV written as rows arrive")
+    args = parser.parse_args(argv)
+    points = grid(**dict(args.axes))
+    began = time.perf_counter()
+    frame = Sweep(args.strategy, points, load_bars(args.bars), args.workers,
+                  capital=args.capital, cost=args.cost, start=args.start).run(args.out)
+    elapsed = time.perf_counter() - began
+    with pd.option_context("display.width", 200, "display.max_rows", 50):
+        print(frame.sort_values("sharpe", ascending=False).to_string(index=False))
+    print(f"{len(points)} points in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+"""Stateful drop-in subset of the ``pandas_ta`` API.
+
+``import engine.ta as ta`` in place of ``import pandas_ta as ta`` keeps
+``ta.sma``, ``ta.ema``, ``ta.vwma``, ``ta.macd`` and ``ta.atr`` working
+with pandas_ta's defaults, warm-up NaNs and output names (``SMA_50``,
+``VWMA_12``, ``MACD_12_26_9``/``MACDh_12_26_9``/``MACDs_12_26_9``,
+``ATRr_14``). The strategies call these on a history that has grown by
+one bar since the last call and read only ``.iloc[-1]``; each call here
+is matched to the cached state of the previous one and only the new bars
+are stepped through the incremental engines in ``engine.indicators``.
+
+A call is recognized as an extension when its inputs hold every value
+and index label a cached stream has consumed, unchanged and at the same
+positions. The check is one vectorized comparison against a copy of the
+consumed inputs, far cheaper than stepping them again. Anything else --
+a sliding window, another ticker, data edited anywhere -- starts a fresh
+stream, so results never depend on the cache. Functions and options not covered here are forwarded to the
+real pandas_ta when it is installed.
+"""
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from engine.indicators import ATR, EMA, MACD, RollingSum
+
+try:
+    import pandas_ta as _pandas_ta
+except ImportError:
+    _pandas_ta = None
+
+MAX_STREAMS = 512
+_FINGERPRINT = 8
+_streams = OrderedDict()
+
+
+def __getattr__(name):
+    if _pandas_ta is None:
+        raise AttributeError(f"engine.ta has no {name!r} and pandas_ta is not installed")
+    return getattr(_pandas_ta, name)
+
+
+def _forward(name, *args, **kwargs):
+    if _pandas_ta is None:
+        raise NotImplementedError(f"engine.ta.{name} does not support {sorted(kwargs)}; "
+                                  "install pandas_ta for the full API")
+    return getattr(_pandas_ta, name)(*args, **kwargs)
+
+
+class _Stream:
+    """Engine state plus the outputs produced so far for one input stream."""
+
+    def __init__(self, step, width, inputs):
+        self.step = step
+        self.n = 0
+        self.index = None
+        self.out = np.empty((width, 256))
+        self.seen = np.empty((inputs, 256))
+
+    def extends(self, arrays, index):
+        n = self.n
+        if len(index) < n:
+            return False
+        if n == 0:
+            return True
+        if index is not self.index and not index[:n].equals(self.index[:n]):
+            return False
+        return all(np.array_equal(a[:n], seen, equal_nan=True) for a, seen in zip(arrays, self.seen[:, :n]))
+
+    @staticmethod
+    def _grow(block, n, total):
+        if total <= block.shape[1]:
+            return block
+        grown = np.empty((block.shape[0], max(total, 2 * block.shape[1])))
+        grown[:, :n] = block[:, :n]
+        return grown
+
+    def extend(self, arrays, index):
+        total = len(index)
+        self.out = self._grow(self.out, self.n, total)
+        self.seen = self._grow(self.seen, self.n, total)
+        out, step = self.out, self.step
+        for i, xs in enumerate(zip(*(a[self.n:total].tolist() for a in arrays)), self.n):
+            out[:, i] = step(*xs)
+        for seen, a in zip(self.seen, arrays):
+            seen[self.n:total] = a[self.n:total]
+        self.n = total
+        self.index = index
+
+
+def _evaluate(name, params, series, make_step, width):
+    index = series[0].index
+    arrays = [np.asarray(s, dtype=np.float64) for s in series]
+    head = arrays[0][:_FINGERPRINT]
+    key = (name, params, index[0], tuple(head.tolist()))
+    stream = _streams.get(key)
+    if stream is None or not stream.extends(arrays, index):
+        stream = _Stream(make_step(), width, len(arrays))
+    _streams[key] = stream
+    _streams.move_to_end(key)
+    while len(_streams) > MAX_STREAMS:
+        _streams.popitem(last=False)
+    if stream.n < len(index):
+        stream.extend(arrays, index)
+    return stream.out[:, :len(index)], index
+
+
+def _series(values, index, name, category):
+    s = pd.Series(values, index=index, name=name, copy=False)
+    s.category = category
+    return s
+
+
+def _nan(value):
+    return np.nan if value is None else value
+
+
+def _sma_step(length):
+    def make():
+        acc = RollingSum(length)
+
+        def step(x):
+            acc.update(x)
+            return acc.value / length if acc.ready else np.nan
+        return step
+    return make
+
+
+def sma(close, length=None, talib=None, offset=None, **kwargs):
+    length = int(length) if length and length > 0 else 10
+    if talib is not None or offset or kwargs:
+        return _forward("sma", close, length=length, talib=talib, offset=offset, **kwargs)
+    if close is None or len(close) < length:
+        return None
+    out, index = _evaluate("sma", (length,), [close], _sma_step(length), 1)
+    return _series(out[0], index, f"SMA_{length}", "overlap")
+
+
+def ema(close, length=None, talib=None, offset=None, **kwargs):
+    length = int(length) if length and length > 0 else 10
+    if talib is not None or offset or kwargs:
+        return _forward("ema", close, length=length, talib=talib, offset=offset, **kwargs)
+    if close is None or len(close) < length:
+        return None
+
+    def make():
+        e = EMA(length, seed="sma")
+        return lambda x: _nan(e.update(x))
+    out, index = _evaluate("ema", (length,), [close], make, 1)
+    return _series(out[0], index, f"EMA_{length}", "overlap")
+
+
+def vwma(close, volume, length=None, offset=None, **kwargs):
+    length = int(length) if length and length > 0 else 10
+    if offset or kwargs:
+        return _forward("vwma", close, volume, length=length, offset=offset, **kwargs)
+    if close is None or volume is None or len(close) < length or len(volume) < length:
+        return None
+
+    def make():
+        pv, v = RollingSum(length), RollingSum(length)
+
+        def step(c, vol):
+            pv.update(c * vol)
+            v.update(vol)
+            return pv.value / v.value if pv.ready and v.value else np.nan
+        return step
+    out, index = _evaluate("vwma", (length,), [close, volume], make, 1)
+    return _series(out[0], index, f"VWMA_{length}", "overlap")
+
+
+def macd(close, fast=None, slow=None, signal=None, talib=None, offset=None, **kwargs):
+    fast = int(fast) if fast and fast > 0 else 12
+    slow = int(slow) if slow and slow > 0 else 26
+    signal = int(signal) if signal and signal > 0 else 9
+    if slow < fast:
+        fast, slow = slow, fast
+    if talib is not None or offset or kwargs:
+        return _forward("macd", close, fast=fast, slow=slow, signal=signal,
+                        talib=talib, offset=offset, **kwargs)
+    if close is None or len(close) < max(fast, slow, signal):
+        return None
+
+    def make():
+        m = MACD(fast, slow, signal, seed="sma")
+
+        def step(x):
+            line, sig, hist = m.update(x)
+            return _nan(line), _nan(hist), _nan(sig)
+        return step
+    out, index = _evaluate("macd", (fast, slow, signal), [close], make, 3)
+    props = f"_{fast}_{slow}_{signal}"
+    df = pd.DataFrame({f"MACD{props}": out[0], f"MACDh{props}": out[1], f"MACDs{props}": out[2]},
+                      index=index, copy=False)
+    df.name = f"MACD{props}"
+    df.category = "momentum"
+    return df
+
+
+def atr(high, low, close, length=None, mamode=None, talib=None, drift=None, offset=None, **kwargs):
+    length = int(length) if length and length > 0 else 14
+    mamode = mamode.lower() if isinstance(mamode, str) else "rma"
+    if mamode != "rma" or talib is not None or (drift and drift != 1) or offset or kwargs:
+        return _forward("atr", high, low, close, length=length, mamode=mamode, talib=talib,
+                        drift=drift, offset=offset, **kwargs)
+    if high is None or low is None or close is None or len(close) < length:
+        return None
+
+    def make():
+        a = ATR(length, smoothing="rma")
+        return lambda h, l, c: _nan(a.update(h, l, c))
+    out, index = _evaluate("atr", (length,), [high, low, close], make, 1)
+    return _series(out[0], index, f"ATRr_{length}", "volatility")
@@ -0,0 +1,403 @@
+"""Whole-array backtests for strategies whose weights are a pure function
+of prices and the bar count.
+
+A ``Kernel`` recognizes one family of strategies by the AST of the methods
+the harness calls, compared with a template after docstrings and ``log``
+calls are dropped. Upper-case names in a template are holes that match any
+constant and bind it. Everything else (tickers, weights, class-level
+parameters) is read from the strategy instance at run time, so variants
+with different parameters share a kernel. A kernel turns the bars into the
+rebalance steps and target weights the event loop would have produced, and
+``simulate`` prices that weight path with drift between rebalances in a
+few array operations.
+
+    counter    the fixed-weight template: rebalance when
+               ``self.count % K == R`` (0c2fd861 and 36 copies)
+    gate       the hysteresis trend gate of 9627cc6f / 80950c64
+    selector   the VXX / SPY / top-2 momentum selector of 3f2fa86a
+
+``backtest`` uses a kernel when one matches and the strategy's assets
+have a bar at every step; anything else runs through
+``engine.backtest.Backtest`` unchanged.
+"""
+import ast
+import inspect
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from engine.backtest import Backtest, Result, _reset_platform
+
+_DUST = 1e-9  # Portfolio.rebalance's no-trade band, as a weight
+
+_SKIP = frozenset(("lineno", "col_offset", "end_lineno", "end_col_offset", "ctx", "type_comment"))
+
+
+def _is_log(node):
+    return (isinstance(node, ast.Expr) and isinstance(node.value, ast.Call)
+            and isinstance(node.value.func, ast.Name) and node.value.func.id == "log")
+
+
+def _is_docstring(node):
+    return isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant) \
+        and isinstance(node.value.value, str)
+
+
+class _Quiet(ast.NodeTransformer):
+    """Drops docstrings and ``log(...)`` statements, which never affect weights."""
+
+    def generic_visit(self, node):
+        super().generic_visit(node)
+        for field in ("body", "orelse", "finalbody"):
+            body = getattr(node, field, None)
+            if isinstance(body, list) and body and isinstance(body[0], ast.stmt):
+                kept = [s for s in body if not (_is_log(s) or _is_docstring(s))]
+                if not kept and field == "body":
+                    kept = [ast.Pass()]
+                setattr(node, field, kept)
+        return node
+
+
+def _function(source):
+    return _Quiet().visit(ast.parse(source).body[0])
+
+
+def _same(template, node, holes, bound):
+    if isinstance(template, ast.Name) and template.id in holes:
+        if not isinstance(node, ast.Constant):
+            return False
+        if template.id in bound:
+            return bound[template.id] == node.value
+        bound[template.id] = node.value
+        return True
+    if type(template) is not type(node):
+        return False
+    if isinstance(template, list):
+        return len(template) == len(node) and all(_same(a, b, holes, bound) for a, b in zip(template, node))
+    if not isinstance(template, ast.AST):
+        return template == node
+    return all(_same(value, getattr(node, field, None), holes, bound)
+               for field, value in ast.iter_fields(template) if field not in _SKIP)
+
+
+_methods = {}
+
+
+def _class_methods(cls):
+    """``{name: FunctionDef}`` defined in ``cls`` itself, or None without source."""
+    methods = _methods.get(cls)
+    if methods is None:
+        try:
+            tree = ast.parse(inspect.getsource(inspect.getmodule(cls)))
+        except (OSError, TypeError, SyntaxError):
+            return None
+        methods = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef) and node.name == cls.__name__:
+                methods = {f.name: _Quiet().visit(f) for f in node.body if isinstance(f, ast.FunctionDef)}
+                break
+        _methods[cls] = methods
+    return methods
+
+
+def simulate(close, steps, weights, capital=100_000.0, cost=0.0):
+    """Equity per bar for ``weights[m]`` applied at the close of ``steps[m]``.
+
+    ``close`` is ``(tickers, time)``. Between rebalances the positions
+    drift with prices; gross weight above 1 is scaled down and columns
+    without a price are left in cash, as ``Portfolio.rebalance`` does.
+    Returns ``(equity, trades, turnover)``.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    steps = np.asarray(steps, dtype=np.intp)
+    equity = np.full(close.shape[1], float(capital))
+    if not len(steps):
+        return equity, 0, 0.0
+    w = np.asarray(weights, dtype=np.float64).reshape(len(steps), -1)
+    gross = np.abs(w).sum(axis=1, keepdims=True)
+    w = np.where(gross > 1.0, w / np.where(gross > 0, gross, 1.0), w)
+    at = close[:, steps].T
+    priced = at > 0
+    w = np.where(priced, w, 0.0)
+    base = np.where(priced, at, 1.0)
+    # Growth of each sleeve until the next rebalance.
+    ratio = np.nan_to_num(close[:, steps[1:]].T / base[:-1])
+    turn = np.empty(len(steps))
+    turn[0] = np.abs(w[0]).sum()
+    if cost:
+        # Costs leave every position slightly off target (by cost, then
+        # cost squared, ...) and Portfolio skips trades within _DUST of
+        # the target, so the path is stepped with the same rule.
+        drifted = np.empty_like(ratio)
+        for m in range(1, len(steps)):
+            grown = w[m - 1] * ratio[m - 1]
+            drifted[m - 1] = grown / (grown.sum() + 1.0 - w[m - 1].sum() - cost * turn[m - 1])
+            w[m] = np.where(np.abs(w[m] - drifted[m - 1]) > _DUST, w[m], drifted[m - 1])
+            turn[m] = np.abs(w[m] - drifted[m - 1]).sum()
+    cash = 1.0 - w.sum(axis=1)
+    # Value of each sleeve at the next rebalance, per unit of equity.
+    grown = w[:-1] * ratio
+    before = grown.sum(axis=1) + cash[:-1]
+    if not cost:
+        drifted = grown / before[:, None]
+        turn[1:] = np.abs(w[1:] - drifted).sum(axis=1)
+    trades = int(np.count_nonzero(w[0]) + np.count_nonzero(np.abs(w[1:] - drifted) > _DUST))
+    start = np.empty(len(steps))
+    start[0] = capital
+    start[1:] = capital * np.cumprod(before - cost * turn[:-1])
+    first = steps[0]
+    seg = np.searchsorted(steps, np.arange(first, close.shape[1]), "right") - 1
+    rel = np.nan_to_num(close[:, first:] / base[seg].T)
+    value = (w[seg].T * rel).sum(axis=0) + cash[seg] - cost * turn[seg]
+    equity[first:] = start[seg] * value
+    return equity, trades, float(turn.sum())
+
+
+class Kernel:
+    """A strategy family: method templates plus the weight path they imply."""
+
+    name = None
+    holes = frozenset()
+    templates = {}
+
+    def __init__(self):
+        self._functions = {name: _function(src) for name, src in self.templates.items()}
+
+    def match(self, cls):
+        """Bound holes if ``cls`` implements these templates, else None."""
+        methods = _class_methods(cls)
+        if not methods:
+            return None
+        bound = {}
+        for name, template in self._functions.items():
+            if name not in methods or not _same(template, methods[name], self.holes, bound):
+                return None
+        return bound
+
+    def path(self, strategy, bound, columns, close, start, stop):
+        """``(steps, weights, extra)`` for run calls at ``start..stop-1``.
+
+        ``weights`` has one column per ticker in ``columns``; ``extra`` is
+        the gross weight the strategy puts on tickers outside them. None
+        when the event loop has to decide.
+        """
+        raise NotImplementedError
+
+
+class CounterKernel(Kernel):
+
+    name = "counter"
+    holes = frozenset(("K", "R"))
+    templates = {"run": '''
+def run(self, data):
+    self.count += 1
+    if (self.count % K == R):
+        allocation_dict = {self.tickers[i]: self.weights[i]/sum(self.weights) for i in range(len(self.tickers))}
+        return TargetAllocation(allocation_dict)
+    return None
+'''}
+
+    def path(self, strategy, bound, columns, close, start, stop):
+        tickers, weights = strategy.tickers, strategy.weights
+        target = {tickers[i]: weights[i] / sum(weights) for i in range(len(tickers))}
+        counts = strategy.count + 1 + np.arange(stop - start)
+        steps = start + np.flatnonzero(counts % bound["K"] == bound["R"])
+        strategy.count += stop - start
+        row = [target.get(t, 0.0) for t in columns]
+        extra = sum(abs(w) for t, w in target.items() if t not in columns)
+        return steps, np.tile(row, (len(steps), 1)), extra
+
+
+class GateKernel(Kernel):
+
+    name = "gate"
+    templates = {
+        "_closes": '''
+def _closes(self, ticker, ohlcv):
+    return [b[ticker]["close"] for b in ohlcv if ticker in b][:-1]
+''',
+        "run": '''
+def run(self, data):
+    ohlcv = data.get("ohlcv")
+    if not ohlcv:
+        return TargetAllocation({self.RISK: 0.0, self.PARK: 0.0})
+
+    macro = self._closes(self.MACRO, ohlcv)
+    risk = self._closes(self.RISK, ohlcv)
+    if len(macro) < self.SMA_LEN or not risk:
+        return TargetAllocation({self.RISK: self.FLOOR,
+                                 self.PARK: 1.0 - self.FLOOR})
+
+    sma = sum(macro[-self.SMA_LEN:]) / float(self.SMA_LEN)
+    q, price = macro[-1], risk[-1]
+
+    rel = q / sma - 1
+    if self._state:
+        want_risk = rel > -self.BAND
+    else:
+        want_risk = rel > self.BAND
+
+    if want_risk != self._state:
+        if want_risk:
+            log()
+            self._peak, self._milestone = price, 0
+        else:
+            log()
+        self._state = want_risk
+
+    if want_risk:
+        if price > self._peak:
+            self._peak, self._milestone = price, 0
+        else:
+            drop = (price / self._peak - 1) * 100
+            m = int(abs(drop) // 10) * 10
+            if m > self._milestone:
+                self._milestone = m
+                log()
+
+    risk_w = 1.0 if want_risk else self.FLOOR
+    return TargetAllocation({self.RISK: risk_w, self.PARK: 1.0 - risk_w})
+'''}
+
+    def path(self, strategy, bound, columns, close, start, stop):
+        s = strategy
+        if s.RISK not in columns or s.PARK not in columns or s.MACRO not in columns:
+            return None
+        n = s.SMA_LEN
+        macro = close[columns.index(s.MACRO), :stop]
+        steps = np.arange(start, stop)
+        # Step t sees completed closes [0, t): ready once t >= SMA_LEN.
+        rel = np.full(stop, np.nan)
+        if n >= 1 and stop > n:
+            window = sliding_window_view(macro[:stop - 1], n)
+            rel[n:] = macro[n - 1:stop - 1] / (window.sum(axis=1) / float(n)) - 1
+        ready = (steps >= max(n, 1)) & ~np.isnan(rel[start:])
+        events = np.where(rel[start:] > s.BAND, 1.0, np.where(rel[start:] <= -s.BAND, 0.0, np.nan))
+        events[~ready] = np.nan
+        seed = 1.0 if s._state else 0.0
+        state = _ffill(np.r_[seed, events])[1:]
+        risk_w = np.where(ready, np.where(state > 0, 1.0, s.FLOOR), s.FLOOR)
+        if ready.any():
+            s._state = bool(state[ready][-1])
+        weights = np.zeros((len(steps), len(columns)))
+        weights[:, columns.index(s.PARK)] = 1.0 - risk_w
+        weights[:, columns.index(s.RISK)] = risk_w
+        return steps, weights, 0.0
+
+
+class SelectorKernel(Kernel):
+
+    name = "selector"
+    holes = frozenset(("VOL", "SAFE", "MARKET", "VOL_LEN", "TREND_LEN", "HEDGE_LEN", "MOM_LEN"))
+    templates = {"run": '''
+def run(self, data):
+    d = data["ohlcv"]
+    vxx_history = [i[VOL]["close"] for i in d]
+    vxx_sma_5 = np.mean(vxx_history[-VOL_LEN:])
+    current_vxx = vxx_history[-1]
+    if current_vxx > vxx_sma_5:
+        return TargetAllocation({SAFE: 1.0})
+    spy_history = [i[MARKET]["close"] for i in d]
+    spy_sma_200 = np.mean(spy_history[-TREND_LEN:])
+    current_spy = spy_history[-1]
+    if current_spy < spy_sma_200:
+        returns = {t: (d[-1][t]["close"] / d[-HEDGE_LEN][t]["close"]) - 1 for t in self.secondary_pool}
+        top_2 = sorted(returns, key=returns.get, reverse=True)[:2]
+        return TargetAllocation({top_2[0]: 0.5, top_2[1]: 0.5})
+    offensive_returns = {t: (d[-1][t]["close"] / d[-MOM_LEN][t]["close"]) - 1 for t in self.offensive_pool}
+    top_offensive = sorted(offensive_returns, key=offensive_returns.get, reverse=True)[:2]
+    return TargetAllocation({top_offensive[0]: 0.5, top_offensive[1]: 0.5})
+'''}
+
+    def path(self, strategy, bound, columns, close, start, stop):
+        hedge, offense = list(strategy.secondary_pool), list(strategy.offensive_pool)
+        needed = {bound["VOL"], bound["SAFE"], bound["MARKET"], *hedge, *offense}
+        if not needed <= set(columns) or len(hedge) < 2 or len(offense) < 2:
+            return None
+        steps = np.arange(start, stop)
+        vol = close[columns.index(bound["VOL"]), :stop]
+        market = close[columns.index(bound["MARKET"]), :stop]
+        risk_off = vol[start:] > _trailing_mean(vol, bound["VOL_LEN"])[start:]
+        bear = ~risk_off & (market[start:] < _trailing_mean(market, bound["TREND_LEN"])[start:])
+        bull = ~risk_off & ~bear
+        weights = np.zeros((len(steps), len(columns)))
+        weights[risk_off, columns.index(bound["SAFE"])] = 1.0
+        for mask, pool, lag in ((bear, hedge, bound["HEDGE_LEN"]), (bull, offense, bound["MOM_LEN"])):
+            if not mask.any():
+                continue
+            rows = steps[mask]
+            if rows[0] + 1 < lag:
+                return None  # d[-lag] would raise on the platform too
+            idx = [columns.index(t) for t in pool]
+            scores = close[idx][:, rows] / close[idx][:, rows - lag + 1] - 1
+            top = np.argsort(-scores, axis=0, kind="stable")[:2]
+            cols = np.asarray(idx)[top]
+            where = np.flatnonzero(mask)
+            np.add.at(weights, (where, cols[0]), 0.5)
+            np.add.at(weights, (where, cols[1]), 0.5)
+        return steps, weights, 0.0
+
+
+def _ffill(values):
+    idx = np.where(np.isnan(values), 0, np.arange(len(values)))
+    return values[np.maximum.accumulate(idx)]
+
+
+def _trailing_mean(values, n):
+    """``np.mean(values[:t + 1][-n:])`` for every t."""
+    out = np.empty(len(values))
+    head = min(n - 1, len(values))
+    for t in range(head):
+        out[t] = np.mean(values[:t + 1])
+    if len(values) >= n:
+        out[n - 1:] = sliding_window_view(values, n).mean(axis=1)
+    return out
+
+
+KERNELS = [CounterKernel(), GateKernel(), SelectorKernel()]
+
+
+def recognize(cls):
+    """``(kernel, bound)`` for the first kernel matching ``cls``, else ``(None, None)``."""
+    for kernel in KERNELS:
+        bound = kernel.match(cls)
+        if bound is not None:
+            return kernel, bound
+    return None, None
+
+
+def backtest(strategy, bars, capital=100_000.0, cost=0.0, start=0, stop=None, name=None, layout=None,
+             lookback=4096):
+    """``Backtest(...).run()``, through a kernel where one applies.
+
+    The result's ``kernel`` names the kernel used, None for the event loop.
+    """
+    stop = len(bars) if stop is None else stop
+    event = Backtest(strategy, bars, capital, cost, layout, start, stop, name, lookback)
+    kernel, bound = recognize(type(strategy))
+    if kernel is None:
+        return event.run()
+    began = time.perf_counter()
+    columns = list(dict.fromkeys(strategy.assets))
+    rows = [bars.index(t) if t in bars else None for t in columns]
+    close = np.full((len(columns), stop), np.nan)
+    for i, row in enumerate(rows):
+        if row is not None:
+            close[i] = bars.close[row, :stop]
+    present = [i for i, row in enumerate(rows) if row is not None]
+    if not present or np.isnan(close[present]).any():
+        return event.run()
+    path = kernel.path(strategy, bound, columns, close, start, stop)
+    if path is None:
+        return event.run()
+    steps, weights, extra = path
+    if extra:
+        # Targets for tickers never priced still count toward gross weight.
+        gross = np.abs(weights).sum(axis=1) + extra
+        weights = np.where((gross > 1.0)[:, None], weights / gross[:, None], weights)
+    _reset_platform()
+    equity, trades, turnover = simulate(close[:, start:], np.asarray(steps) - start, weights, capital, cost)
+    return Result(event.name, getattr(strategy, "interval", None), bars.epochs[start:stop], equity,
+                  trades, turnover, (stop - start) * len(present), time.perf_counter() - began,
+                  kernel=kernel.name)
@@ -0,0 +1,266 @@
+"""Walk-forward optimization.
+
+Folds are consecutive ``(train, test)`` windows over the bars, rolling by
+``step`` (the test length by default) or anchored at the first bar. For
+every fold the parameter point with the best in-sample ``objective`` is
+traded over the test window, and the test windows chain into one
+out-of-sample equity curve.
+
+By default the folds are split into runs of ``chunk`` consecutive folds,
+one run per worker, and each parameter point is backtested once over the
+span of each run. Every fold in a run reads its train and test windows
+from that curve. Folds overlap heavily (train 4y, trade 1y, 12 folds is
+the same decade twelve times), so indicators, kernel arrays and strategy
+state are built once per point and run rather than once per fold, while
+the runs go in parallel. Each run starts with fresh strategy state at its
+first training bar, so the choices depend on ``chunk``; pass it to pin
+them across machines. ``independent=True`` runs every window as its own
+backtest instead. Each window then starts with fresh strategy state, with
+the earlier bars as lookback. This costs points x folds runs, all in
+parallel.
+
+When ``step`` is shorter than the test window, test windows overlap; the
+stitched curve takes each fold's returns from the end of the previous
+fold's window on, so every bar appears once.
+
+Both modes run on the shared-memory pool of ``engine.sweep``.
+
+    python -m engine.walkforward BARS STRATEGY BAND=0,0.005 FLOOR=0,0.25 --train 1008 --test 252
+"""
+import argparse
+import math
+import os
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from engine import metrics
+from engine.backtest import load_bars
+from engine.loader import load_module
+from engine.sweep import backtest_point, grid, locate, parse_axis, worker_pool
+
+OBJECTIVES = ("sharpe", "terminal", "cagr")
+
+Fold = namedtuple("Fold", "index train_start test_start test_stop")
+
+
+def folds(length, train, test, step=None, anchored=False, start=0):
+    """Folds of ``train`` then ``test`` bars that fit in ``[start, length)``."""
+    step = step or test
+    out = []
+    at = start
+    while at + train + test <= length:
+        out.append(Fold(len(out), start if anchored else at, at + train, at + train + test))
+        at += step
+    return out
+
+
+def score(equity, objective="sharpe", periods=252):
+    """``objective`` of an equity window; a callable receives the window."""
+    if callable(objective):
+        return objective(equity)
+    if len(equity) < 2:
+        return np.nan
+    if objective == "sharpe":
+        return metrics.sharpe(equity, periods)
+    if objective == "terminal":
+        return float(equity[-1] / equity[0])
+    if objective == "cagr":
+        return metrics.cagr(equity, periods)
+    raise ValueError(f"unknown objective {objective!r}; expected one of {OBJECTIVES}")
+
+
+def _curve(task):
+    key, params, start, stop = task
+    try:
+        return key, backtest_point(params, start=start, stop=stop).equity, None
+    except Exception as exc:
+        return key, None, f"{type(exc).__name__}: {exc}"
+
+
+class WalkForwardResult:
+    """Per-fold choices plus the stitched out-of-sample curve.
+
+    ``errors`` maps ``(fold, point)`` to the failure of that backtest.
+    """
+
+    def __init__(self, folds, epochs, equity, errors, periods):
+        self.folds = folds
+        self.epochs = epochs
+        self.equity = equity
+        self.errors = errors
+        self.periods = periods
+
+    def metrics(self):
+        return metrics.summary(self.equity, self.periods)
+
+    def curve(self):
+        dates = pd.to_datetime(self.epochs, unit="s")
+        return pd.Series(self.equity, index=dates, name="equity")
+
+
+class WalkForward:
+    """``strategy`` (directory or class) over ``points`` and ``folds``.
+
+    ``chunk`` is the number of folds per shared run, by default the folds
+    spread evenly over the workers. ``options`` go to every backtest
+    (capital, cost).
+    """
+
+    def __init__(self, strategy, points, bars, folds, objective="sharpe", independent=False,
+                 workers=None, method="forkserver", chunk=None, **options):
+        if not folds:
+            raise ValueError("no folds fit in the bars")
+        self.strategy = strategy
+        self.points = list(points)
+        self.bars = bars
+        self.fold_list = list(folds)
+        self.objective = objective
+        self.independent = independent
+        self.workers = workers
+        self.method = method
+        self.chunk = chunk or math.ceil(len(self.fold_list) / (workers or os.cpu_count()))
+        self.capital = options.get("capital", 100_000.0)
+        self.options = options
+        path, name = locate(strategy)
+        interval = getattr(getattr(load_module(path), name)(), "interval", None)
+        self.periods = metrics.periods_per_year(interval)
+
+    def run(self):
+        with worker_pool(self.strategy, self.bars, self.workers, self.method, **self.options) as pool:
+            if self.independent:
+                chosen, segments, errors = self._independent(pool)
+            else:
+                chosen, segments, errors = self._shared(pool)
+        return self._stitch(chosen, segments, errors)
+
+    def _shared(self, pool):
+        runs = [self.fold_list[at:at + self.chunk] for at in range(0, len(self.fold_list), self.chunk)]
+        starts = [min(f.train_start for f in run) for run in runs]
+        tasks = [((r, i), p, starts[r], max(f.test_stop for f in run))
+                 for r, run in enumerate(runs) for i, p in enumerate(self.points)]
+        curves, errors = {}, {}
+        for (r, i), equity, error in pool.imap_unordered(_curve, tasks):
+            if error:
+                errors.update({(f.index, i): error for f in runs[r]})
+            else:
+                curves.setdefault(r, {})[i] = equity
+
+        chosen, segments = [], []
+        for r, run in enumerate(runs):
+            first = starts[r]
+
+            def window(curve, a, b):
+                # One bar before the window so its first return is included.
+                return curve[max(a - 1 - first, 0):b - first]
+
+            for fold in run:
+                scores = {i: score(window(c, fold.train_start, fold.test_start), self.objective, self.periods)
+                          for i, c in curves.get(r, {}).items()}
+                best = _best(scores)
+                chosen.append((best, scores.get(best)))
+                segments.append(None if best is None else window(curves[r][best], fold.test_start, fold.test_stop))
+        return chosen, segments, errors
+
+    def _independent(self, pool):
+        tasks = [((i, f.index), p, f.train_start, f.test_start)
+                 for f in self.fold_list for i, p in enumerate(self.points)]
+        scores, errors = {}, {}
+        for (i, k), equity, error in pool.imap_unordered(_curve, tasks):
+            if error:
+                errors[k, i] = error
+            else:
+                scores.setdefault(k, {})[i] = score(equity, self.objective, self.periods)
+        chosen = []
+        for fold in self.fold_list:
+            best = _best(scores.get(fold.index, {}))
+            chosen.append((best, scores.get(fold.index, {}).get(best)))
+        tests = [((best, f.index), self.points[best], f.test_start, f.test_stop)
+                 for f, (best, _) in zip(self.fold_list, chosen) if best is not None]
+        segments = [None] * len(self.fold_list)
+        for (i, k), equity, error in pool.imap_unordered(_curve, tests):
+            if error:
+                errors[k, i] = error
+            else:
+                segments[k] = equity
+        return chosen, segments, errors
+
+    def _stitch(self, chosen, segments, errors):
+        rows, returns, epochs = [], [], []
+        end = None
+        for fold, (best, train_score), segment in zip(self.fold_list, chosen, segments):
+            length = fold.test_stop - fold.test_start
+            if segment is None:
+                # Nothing usable was chosen: the fold sits in cash.
+                r = np.zeros(length)
+            else:
+                r = segment[1:] / segment[:-1] - 1.0
+                r = np.concatenate([np.zeros(length - len(r)), r])
+            # Overlapping test windows: only the bars past the previous one.
+            begin = fold.test_start if end is None else min(max(fold.test_start, end), fold.test_stop)
+            returns.append(r[begin - fold.test_start:])
+            epochs.append(self.bars.epochs[begin:fold.test_stop])
+            end = fold.test_stop if end is None else max(end, fold.test_stop)
+            test_curve = np.concatenate([[1.0], np.cumprod(1.0 + r)])
+            rows.append({"fold": fold.index,
+                         "train_start": _date(self.bars, fold.train_start),
+                         "test_start": _date(self.bars, fold.test_start),
+                         "test_stop": _date(self.bars, fold.test_stop - 1),
+                         "point": best,
+                         **(self.points[best] if best is not None else {}),
+                         "train_score": train_score,
+                         "test_score": score(test_curve, self.objective, self.periods)})
+        returns = np.concatenate(returns)
+        equity = self.capital * np.cumprod(1.0 + returns)
+        return WalkForwardResult(pd.DataFrame(rows), np.concatenate(epochs), equity, errors, self.periods)
+
+
+def _best(scores):
+    finite = {i: s for i, s in scores.items() if s is not None and np.isfinite(s)}
+    return max(finite, key=lambda i: (finite[i], -i)) if finite else None
+
+
+def _date(bars, index):
+    return bars.dates()[index]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m engine.walkforward", description=__doc__.splitlines()[0])
+    parser.add_argument("bars", help="CSV/Parquet file or directory of per-ticker files")
+    parser.add_argument("strategy", help="strategy directory")
+    parser.add_argument("axes", nargs="+", type=parse_axis, metavar="NAME=v1,v2,...")
+    parser.add_argument("--train", type=int, required=True, help="bars per training window")
+    parser.add_argument("--test", type=int, required=True, help="bars per test window")
+    parser.add_argument("--step", type=int, default=None)
+    parser.add_argument("--start", type=int, default=0, help="first bar of the first fold")
+    parser.add_argument("--anchored", action="store_true")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="sharpe")
+    parser.add_argument("--independent", action="store_true", help="one backtest per window")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--chunk", type=int, default=None, help="folds per shared run")
+    parser.add_argument("--capital", type=float, default=100_000.0)
+    parser.add_argument("--cost", type=float, default=0.0)
+    parser.add_argument("--out", default=None, help="CSV for the out-of-sample equity curve")
+    args = parser.parse_args(argv)
+    bars = load_bars(args.bars)
+    geometry = folds(len(bars), args.train, args.test, args.step, args.anchored, args.start)
+    began = time.perf_counter()
+    result = WalkForward(args.strategy, grid(**dict(args.axes)), bars, geometry, args.objective,
+                         args.independent, args.workers, chunk=args.chunk,
+                         capital=args.capital, cost=args.cost).run()
+    elapsed = time.perf_counter() - began
+    with pd.option_context("display.width", 200):
+        print(result.folds.to_string(index=False))
+    for (fold, i), error in sorted(result.errors.items()):
+        print(f"fold {fold} point {i}: {error}")
+    m = result.metrics()
+    print(f"out of sample: ${m['terminal']:,.0f}  {m['cagr']:.1%}/yr  {-m['max_drawdown']:.1%}  "
+          f"Sharpe {m['sharpe']:.2f}  ({len(geometry)} folds in {elapsed:.1f}s)")
+    if args.out:
+        result.curve().to_csv(args.out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""Imported by the fork server: touches pandas' lazily loaded paths once
+so forked strategies do not pay for them on their first bar."""
+import numpy as np
+import pandas as pd
+
+_frame = pd.DataFrame([{"open": 1.0, "high": 1.0, "low": 1.0, "close": 1.0, "volume": 1.0,
+                        "date": "2024-01-02 09:30:00"}] * 30)
+_close = _frame["close"]
+pd.concat([_frame["high"] - _frame["low"], (_frame["high"] - _close.shift()).abs()], axis=1).max(axis=1)
+_close.rolling(14).mean().iloc[-1]
+_close.ewm(span=12, adjust=False).mean().iloc[-1]
+_close.pct_change().dropna().tail(20).std()
+pd.to_datetime(_frame["date"]).dt.hour
+np.mean(_close.to_numpy())
+del _frame, _close
@@ -0,0 +1,109 @@
+"""Pre-warmed fork-server runner for strategy processes.
+
+Importing pandas, numpy and pandas_ta costs a large part of a second, and
+a fresh interpreter per strategy pays it every time. Here one fork server
+imports the scientific stack once; every strategy then runs in a child
+forked from it, loads its ``main.py`` with the heavy modules already in
+``sys.modules``, and reports how long each stage took:
+
+    startup_ms    submit to child running (fork + handoff)
+    import_ms     loading main.py
+    init_ms       TradingStrategy()
+    first_bar_ms  the first run(data), when data is supplied
+
+Each child serves one strategy (``maxtasksperchild=1``) so strategies
+never see each other's module state.
+
+    python -m engine.zygote <strategy dir> [<strategy dir> ...]
+"""
+import multiprocessing
+import os
+import sys
+import time
+
+from engine.loader import discover, load_module
+
+PRELOAD = ["numpy", "pandas", "pandas_ta", "engine.warmup", "engine.feed", "engine.indicators", "engine.ta"]
+
+
+def _probe(task):
+    path, data, submitted = task
+    began = time.time()
+    report = {"strategy": path, "pid": os.getpid(),
+              "startup_ms": (began - submitted) * 1e3,
+              "import_ms": None, "init_ms": None, "first_bar_ms": None, "error": None}
+    try:
+        t = time.perf_counter()
+        module = load_module(path)
+        report["import_ms"] = (time.perf_counter() - t) * 1e3
+        t = time.perf_counter()
+        strategy = module.TradingStrategy()
+        report["init_ms"] = (time.perf_counter() - t) * 1e3
+        if data is not None:
+            if callable(data):
+                data = data(strategy)
+            t = time.perf_counter()
+            strategy.run(data)
+            report["first_bar_ms"] = (time.perf_counter() - t) * 1e3
+    except Exception as exc:
+        report["error"] = f"{type(exc).__name__}: {exc}"
+    return report
+
+
+class Zygote:
+    """A pool of workers forked from one pre-importing server.
+
+    ``method="spawn"`` gives the cold baseline the fork server is meant
+    to beat: every worker starts a fresh interpreter.
+    """
+
+    def __init__(self, workers=None, preload=PRELOAD, method="forkserver"):
+        self.context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            self.context.set_forkserver_preload(list(preload))
+        self.workers = workers or os.cpu_count()
+        self._pool = None
+
+    def __enter__(self):
+        self._pool = self.context.Pool(self.workers, maxtasksperchild=1)
+        return self
+
+    def __exit__(self, *exc):
+        self._pool.close()
+        self._pool.join()
+        self._pool = None
+
+    def run(self, paths, data=None):
+        """Reports for ``paths`` in completion order.
+
+        ``data`` is passed to each strategy's first ``run``; it may be a
+        picklable callable ``data(strategy)`` building it per strategy.
+        """
+        tasks = ((p, data, time.time()) for p in paths)
+        return list(self._pool.imap_unordered(_probe, tasks))
+
+
+def measure(paths, data=None, workers=None, method="forkserver"):
+    with Zygote(workers, method=method) as zygote:
+        return zygote.run(paths, data)
+
+
+def _format(report):
+    def ms(key):
+        v = report[key]
+        return f"{v:9.1f}" if v is not None else "        -"
+    name = os.path.basename(os.path.normpath(report["strategy"]))
+    line = f"{name:40} {ms('startup_ms')} {ms('import_ms')} {ms('init_ms')} {ms('first_bar_ms')}"
+    return line + (f"  {report['error']}" if report["error"] else "")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    paths = argv or discover(os.getcwd())
+    print(f"{'strategy':40} {'startup':>9} {'import':>9} {'init':>9} {'1st bar':>9}  (ms)")
+    for report in sorted(measure(paths), key=lambda r: r["strategy"]):
+        print(_format(report))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Shared fixtures: synthetic bars in the shapes the platform hands out.
+
+Bars are plain dicts with ``date`` strings and no ``epoch``/``session``/
+``minute`` fields, as ``data["ohlcv"]`` delivers them, on a 09:30-16:00
+5-minute weekday grid unless a test asks otherwise.
+"""
+import os
+import sys
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _stamps(n, start, step):
+    out = []
+    t = datetime.fromisoformat(start)
+    while len(out) < n:
+        if t.weekday() < 5 and (step >= 1440 or (9, 30) <= (t.hour, t.minute) < (16, 0)):
+            out.append(t)
+        t += timedelta(minutes=step)
+    return out
+
+
+def make_history(n=300, seed=0, start="2024-01-02 09:30:00", step=5, price=100.0, symbol=None):
+    """``n`` random-walk bar dicts, oldest first."""
+    rng = np.random.default_rng(seed)
+    close = price * np.exp(np.cumsum(rng.normal(0, 0.004, n)))
+    open_ = np.concatenate([[price], close[:-1]]) * (1 + rng.normal(0, 0.001, n))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, 0.002, n)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, 0.002, n)))
+    volume = rng.integers(1_000, 100_000, n).astype(float)
+    out = []
+    for t, o, h, l, c, v in zip(_stamps(n, start, step), open_, high, low, close, volume):
+        bar = {"open": float(o), "high": float(h), "low": float(l), "close": float(c),
+               "volume": float(v), "date": t.strftime("%Y-%m-%d %H:%M:%S")}
+        if symbol is not None:
+            bar["symbol"] = symbol
+        out.append(bar)
+    return out
+
+
+def make_frame(tickers=("AAA", "BBB", "CCC"), n=300, seed=0, step=5):
+    """A long date/symbol/OHLCV frame, as ``load_bars`` reads from CSV."""
+    rows = []
+    for k, ticker in enumerate(tickers):
+        rows += make_history(n, seed + k, step=step, price=50.0 + 25 * k, symbol=ticker)
+    return pd.DataFrame(rows)
+
+
+@pytest.fixture
+def history():
+    return make_history
+
+
+@pytest.fixture
+def frame():
+    return make_frame
+
+
+@pytest.fixture
+def bars():
+    from engine.backtest import Bars
+
+    def make(tickers=("AAA", "BBB", "CCC"), n=300, seed=0, step=5, interval=None):
+        return Bars.from_frame(make_frame(tickers, n, seed, step), interval)
+    return make
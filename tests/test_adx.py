@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from engine.indicators import ADX, DMIBook
+from engine.memo import BarMemo
+from engine.stubs.surmount import technical_indicators
+
+
+def wilder_adx(df, n):
+    """Wilder's ADX recomputed over the whole history, as a list per bar."""
+    high, low, close = (df[f].tolist() for f in ("high", "low", "close"))
+    out = [None] * len(df)
+    tr_s = plus_s = minus_s = 0.0
+    dxs, adx = [], None
+    for i in range(1, len(df)):
+        up, down = high[i] - high[i - 1], low[i - 1] - low[i]
+        plus = up if up > down and up > 0 else 0.0
+        minus = down if down > up and down > 0 else 0.0
+        tr = max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+        if i <= n:
+            tr_s, plus_s, minus_s = tr_s + tr, plus_s + plus, minus_s + minus
+            if i < n:
+                continue
+        else:
+            tr_s, plus_s, minus_s = tr_s - tr_s / n + tr, plus_s - plus_s / n + plus, minus_s - minus_s / n + minus
+        pdi, mdi = 100 * plus_s / tr_s, 100 * minus_s / tr_s
+        dx = 100 * abs(pdi - mdi) / (pdi + mdi)
+        if adx is None:
+            dxs.append(dx)
+            if len(dxs) == n:
+                adx = sum(dxs) / n
+        else:
+            adx = (adx * (n - 1) + dx) / n
+        out[i] = adx
+    return out
+
+
+def test_adx_matches_full_recompute(history):
+    df = pd.DataFrame(history(200))
+    for period in (3, 14):
+        adx = ADX(period)
+        got = [adx.update(h, l, c) for h, l, c in zip(df["high"], df["low"], df["close"])]
+        want = wilder_adx(df, period)
+        assert [g is None for g in got] == [w is None for w in want]
+        assert got.index(next(g for g in got if g is not None)) == 2 * period - 1
+        np.testing.assert_allclose([g for g in got if g is not None], [w for w in want if w is not None],
+                                   rtol=1e-12)
+
+
+def test_dmi_book_updates_once_per_bar(history):
+    bars = history(80)
+    df = pd.DataFrame(bars)
+    want = wilder_adx(df, 14)
+    book = DMIBook()
+    ohlcv = []
+    for i, bar in enumerate(bars):
+        ohlcv.append({"AAA": bar})
+        values = {book.value("AAA", ohlcv, 14) for _ in range(3)}
+        assert len(values) == 1
+        value, = values
+        assert value == want[i] if want[i] is None else np.isclose(value, want[i], rtol=1e-12)
+        assert book.engine("AAA", 14).moves == i
+    assert book.memo.hits == 2 * len(bars)
+
+    technical_indicators.reset()
+    series = technical_indicators.ADX("AAA", ohlcv, 14)
+    np.testing.assert_allclose(series, [0.0 if w is None else w for w in want], rtol=1e-12)
+
+
+def test_bar_memo_forgets_previous_bar():
+    memo, calls = BarMemo(), []
+    for bar in (1, 1, 2):
+        memo.advance(bar)
+        for _ in range(2):
+            memo.get("k", lambda: calls.append(bar) or len(calls))
+    assert calls == [1, 2]
+    assert "k" in memo and (memo.hits, memo.misses) == (4, 2)
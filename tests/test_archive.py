@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+
+from engine.archive import BarArchive
+from engine.feed import Feed
+from engine.sessions import stamp
+from engine.store import FIELDS
+
+
+def _expected(bars):
+    return {"timestamp": [stamp(dict(b)) for b in bars], **{f: [b[f] for b in bars] for f in FIELDS}}
+
+
+def _stored(series):
+    return {name: series.column(name).tolist() for name in ("timestamp",) + FIELDS}
+
+
+def test_writer_round_trips_bars(tmp_path, history):
+    bars = history(50)
+    archive = BarArchive(str(tmp_path))
+    with archive.writer("AAA", "5min") as w:
+        for bar in bars:
+            w.append(dict(bar))
+    series = archive.open("AAA", "5min")
+    assert _stored(series) == _expected(bars)
+    assert series.close(3).tolist() == [b["close"] for b in bars[-3:]]
+    i, j = series.between(bars[10]["date"], bars[20]["date"])
+    assert (i, j) == (10, 20)
+
+
+def test_writes_are_idempotent(tmp_path, history):
+    bars = history(60)
+    archive = BarArchive(str(tmp_path))
+    with archive.writer("AAA", "5min") as w:
+        for bar in bars[:40]:
+            w.append(dict(bar))
+    with archive.writer("AAA", "5min") as w:
+        for bar in bars[30:] + bars[:5]:
+            w.append(dict(bar))
+    with archive.writer("AAA", "5min") as w:
+        w.extend(_expected(bars))
+    assert _stored(archive.open("AAA", "5min")) == _expected(bars)
+
+
+def test_extend_skips_old_and_out_of_order_rows(tmp_path, history):
+    bars = history(20)
+    archive = BarArchive(str(tmp_path))
+    columns = _expected(bars)
+    order = list(range(10)) + [3, 4] + list(range(10, 20)) + [19]
+    with archive.writer("AAA", "5min") as w:
+        w.extend({name: [values[k] for k in order] for name, values in columns.items()})
+        w.extend(columns)
+    assert _stored(archive.open("AAA", "5min")) == columns
+
+
+def test_write_feed_appends_only_new_bars(tmp_path, history):
+    feed = Feed()
+    aaa, bbb = history(30, symbol="AAA"), history(30, seed=1, symbol="BBB")
+    archive = BarArchive(str(tmp_path))
+    for k in range(30):
+        feed.append("AAA", aaa[k])
+        feed.append("BBB", bbb[k])
+        if k in (9, 19, 29):
+            archive.write_feed(feed, "5min")
+    archive.write_feed(feed, "5min")
+    assert archive.tickers("5min") == ["AAA", "BBB"]
+    assert _stored(archive.open("AAA", "5min")) == _expected(aaa)
+    assert _stored(archive.open("BBB", "5min")) == _expected(bbb)
+
+
+def test_writer_trims_an_interrupted_append(tmp_path, history):
+    bars = history(10)
+    archive = BarArchive(str(tmp_path))
+    with archive.writer("AAA", "5min") as w:
+        for bar in bars[:8]:
+            w.append(dict(bar))
+    # Prices of one more bar reached disk, its timestamp did not.
+    directory = os.path.join(str(tmp_path), "5min", "AAA")
+    for f in FIELDS:
+        with open(os.path.join(directory, f"{f}.f8"), "ab") as fh:
+            np.array([-1.0]).tofile(fh)
+    with archive.writer("AAA", "5min") as w:
+        for bar in bars:
+            w.append(dict(bar))
+    assert _stored(archive.open("AAA", "5min")) == _expected(bars)
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.ta as ta
+from engine.indicators import ATR, BatchATR, TrueRange
+from engine.stubs.surmount import technical_indicators
+
+
+def _true_range(df):
+    high_low = df["high"] - df["low"]
+    high_cp = np.abs(df["high"] - df["close"].shift())
+    low_cp = np.abs(df["low"] - df["close"].shift())
+    return pd.concat([high_low, high_cp, low_cp], axis=1).max(axis=1)
+
+
+def calculate_atr(df, period):
+    # The nitro family's calculate_atr and 83d429a2's get_atr.
+    return _true_range(df).rolling(window=period).mean()
+
+
+def ta_library_atr(df, window):
+    # ta.volatility.AverageTrueRange, which surmount's ATR follows.
+    tr = _true_range(df)
+    atr = np.zeros(len(df))
+    atr[window - 1] = tr[0:window].mean()
+    for i in range(window, len(atr)):
+        atr[i] = (atr[i - 1] * (window - 1) + tr.iloc[i]) / float(window)
+    return atr
+
+
+def pandas_ta_atr(df, length):
+    tr = _true_range(df)
+    tr.iloc[:1] = np.nan
+    return tr.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+REFERENCES = {"sma": calculate_atr, "wilder": ta_library_atr, "rma": pandas_ta_atr}
+
+
+def _run(engine, df):
+    out = [engine.update(h, l, c) for h, l, c in zip(df["high"], df["low"], df["close"])]
+    return np.array([np.nan if v is None else v for v in out])
+
+
+@pytest.mark.parametrize("smoothing", sorted(REFERENCES))
+def test_atr_matches_reference(frame, smoothing):
+    df = frame(("AAA",), n=300)
+    for period in (1, 5, 14):
+        got = _run(ATR(period, smoothing), df)
+        want = np.asarray(REFERENCES[smoothing](df, period), dtype=float)
+        if smoothing == "wilder":
+            want[:period - 1] = np.nan
+        np.testing.assert_allclose(got, want, rtol=1e-10)
+
+
+@pytest.mark.parametrize("smoothing", sorted(REFERENCES))
+def test_batch_atr_matches_scalar(frame, smoothing):
+    df = frame(("AAA", "BBB", "CCC"), n=200)
+    cols = {f: df.pivot(index="date", columns="symbol", values=f).to_numpy() for f in ("high", "low", "close")}
+    mask = np.random.default_rng(0).random(cols["close"].shape) < 0.7
+    batch = BatchATR(3, 14, smoothing)
+    scalars = [ATR(14, smoothing) for _ in range(3)]
+    for t in range(len(mask)):
+        got = batch.update(cols["high"][t], cols["low"][t], cols["close"][t], mask[t])
+        for j, atr in enumerate(scalars):
+            if mask[t, j]:
+                atr.update(cols["high"][t, j], cols["low"][t, j], cols["close"][t, j])
+            want = np.nan if atr.value is None else atr.value
+            np.testing.assert_allclose(got[j], want, rtol=1e-10)
+
+
+def test_true_range_first_bar_is_high_low():
+    tr = TrueRange()
+    assert tr.update(10.0, 8.0, 9.0) == 2.0
+    assert tr.update(9.5, 9.2, 9.3) == 0.5
+
+
+def test_ta_atr_and_surmount_atr(history):
+    bars = history(120)
+    df = pd.DataFrame(bars)
+    np.testing.assert_allclose(ta.atr(df["high"], df["low"], df["close"], length=14),
+                               pandas_ta_atr(df, 14), rtol=1e-10)
+
+    technical_indicators.reset()
+    data = [{"AAA": bar} for bar in bars]
+    assert technical_indicators.ATR("AAA", data[:10], 14) == [0.0] * 10
+    for n in (14, 15, 60, 120):
+        got = technical_indicators.ATR("AAA", data[:n], 14)
+        np.testing.assert_allclose(got, ta_library_atr(df.iloc[:n], 14), rtol=1e-10)
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from conftest import make_frame
+from engine.backtest import Backtest, Bars, load_bars
+from engine.feed import SNAPSHOTS
+from engine.stubs.surmount.base_class import TargetAllocation
+
+PRICE_FIELDS = ("open", "high", "low", "close", "volume", "date")
+
+
+class Rotator:
+    """Rotates between two books every few bars and records what it saw."""
+
+    assets = ["AAA", "BBB", "CCC"]
+    interval = "5min"
+
+    def __init__(self):
+        self.seen = []
+
+    def run(self, data):
+        ohlcv = data["ohlcv"]
+        self.seen.append(([{t: {f: b[f] for f in PRICE_FIELDS} for t, b in s.items()} for s in ohlcv[-3:]],
+                          len(ohlcv), dict(data["holdings"])))
+        k = len(ohlcv)
+        if k % 7 == 0:
+            return TargetAllocation({"AAA": 0.6, "BBB": 0.7})
+        if k % 7 == 3:
+            return {"CCC": 1.0}
+        return None
+
+
+def _frame():
+    df = make_frame(n=200)
+    # Some bars are missing: CCC lists late, BBB skips every 11th bar.
+    drop = ((df["symbol"] == "CCC") & (df.index % 200 < 30)) | ((df["symbol"] == "BBB") & (df.index % 11 == 0))
+    return df[~drop].reset_index(drop=True)
+
+
+def naive_backtest(strategy, df, capital=100_000.0, cost=0.0, start=0):
+    """Snapshots rebuilt from the frame every bar and a plain cash/shares book."""
+    history, prices, shares, cash, equity = [], {}, {}, capital, []
+    for k, (date, group) in enumerate(df.sort_values("date").groupby("date", sort=True)):
+        snapshot = {r["symbol"]: {f: r[f] for f in PRICE_FIELDS} for r in group.to_dict("records")}
+        history.append(snapshot)
+        prices.update({t: b["close"] for t, b in snapshot.items()})
+        if k < start:
+            continue
+        value = cash + sum(q * prices[t] for t, q in shares.items())
+        holdings = {t: q * prices[t] / value for t, q in shares.items()}
+        result = strategy.run({"ohlcv": list(history), "holdings": holdings,
+                               "positions": {t: {"quantity": q} for t, q in shares.items()}})
+        if result is not None:
+            targets = getattr(result, "target_allocation", result)
+            gross = sum(abs(w) for w in targets.values())
+            scale = 1.0 / gross if gross > 1.0 else 1.0
+            for t in set(shares) | set(targets):
+                if t not in prices:
+                    continue
+                want = targets.get(t, 0.0) * scale * value / prices[t]
+                notional = (want - shares.get(t, 0.0)) * prices[t]
+                if abs(notional) > 1e-9 * value:
+                    cash -= notional + abs(notional) * cost
+                    if want:
+                        shares[t] = want
+                    else:
+                        del shares[t]
+        equity.append(cash + sum(q * prices[t] for t, q in shares.items()))
+    return np.array(equity)
+
+
+@pytest.mark.parametrize("cost,start", [(0.0, 0), (0.002, 0), (0.002, 40)])
+def test_backtest_matches_naive_loop(cost, start):
+    df = _frame()
+    got_strategy, want_strategy = Rotator(), Rotator()
+    result = Backtest(got_strategy, Bars.from_frame(df), cost=cost, start=start, layout=SNAPSHOTS).run()
+    want = naive_backtest(want_strategy, df, cost=cost, start=start)
+    np.testing.assert_allclose(result.equity, want, rtol=1e-12)
+    assert result.trades > 0 and result.error is None
+    assert len(got_strategy.seen) == len(want_strategy.seen)
+    for (got_tail, got_len, got_holdings), (want_tail, want_len, want_holdings) in zip(
+            got_strategy.seen, want_strategy.seen):
+        assert got_tail == want_tail and got_len == want_len
+        assert got_holdings.keys() == want_holdings.keys()
+        assert all(np.isclose(got_holdings[t], want_holdings[t]) for t in got_holdings)
+
+
+def test_load_bars_reads_files_and_directories(tmp_path):
+    df = _frame()
+    df.to_csv(tmp_path / "all.csv", index=False)
+    (tmp_path / "split").mkdir()
+    for ticker, part in df.groupby("symbol"):
+        part.drop(columns="symbol").to_csv(tmp_path / "split" / f"{ticker}.csv", index=False)
+    one, many = load_bars(str(tmp_path / "all.csv")), load_bars(str(tmp_path / "split"))
+    assert one.tickers == many.tickers == ["AAA", "BBB", "CCC"]
+    np.testing.assert_array_equal(one.epochs, many.epochs)
+    for ticker in one.tickers:
+        assert one.records(ticker) == many.records(ticker)
+        np.testing.assert_array_equal(one.close[one.index(ticker)], many.close[many.index(ticker)])
+    assert sum(r is None for r in one.records("CCC")) == 30
@@ -0,0 +1,50 @@
+import numpy as np
+
+from conftest import make_history
+from engine.indicators import BreadthEngine
+
+TICKERS = ("AAA", "BBB", "CCC", "DDD")
+
+
+def _breadth(ohlcv, tickers, length):
+    # cf1bdf3f's _breadth, over every bar given.
+    above = seen = 0
+    for t in tickers:
+        c = [b[t]["close"] for b in ohlcv if t in b]
+        if len(c) < length:
+            continue
+        sma = sum(c[-length:]) / float(length)
+        above += 1 if c[-1] > sma else 0
+        seen += 1
+    return (above / seen if seen else 0.0), seen
+
+
+def _ohlcv(n=300):
+    histories = {t: make_history(n, seed=i, symbol=t) for i, t in enumerate(TICKERS)}
+    rng = np.random.default_rng(5)
+    # DDD lists late and every name misses a few bars.
+    return [{t: histories[t][k] for t in TICKERS
+             if rng.random() > 0.1 and not (t == "DDD" and k < 120)} for k in range(n)]
+
+
+def test_breadth_engine_matches_breadth():
+    ohlcv = _ohlcv()
+    engine = BreadthEngine(TICKERS, window=50)
+    last = {}
+    for k, snapshot in enumerate(ohlcv):
+        fraction, seen = engine.update_snapshot(snapshot)
+        assert (fraction, seen) == _breadth(ohlcv[:k + 1], TICKERS, 50)
+        assert engine.advancing == sum(t in last and bar["close"] > last[t] for t, bar in snapshot.items())
+        assert engine.declining == sum(t in last and bar["close"] < last[t] for t, bar in snapshot.items())
+        last.update({t: bar["close"] for t, bar in snapshot.items()})
+    assert 0 < engine.seen == len(TICKERS)
+
+
+def test_breadth_engine_takes_aligned_arrays():
+    ohlcv = _ohlcv(120)
+    by_dict, by_row = BreadthEngine(TICKERS, window=20), BreadthEngine(TICKERS, window=20)
+    for snapshot in ohlcv:
+        row = [snapshot[t]["close"] if t in snapshot else np.nan for t in TICKERS]
+        assert by_dict.update_snapshot(snapshot) == by_row.update(row)
+        assert by_dict.above_mask().tolist() == by_row.above_mask().tolist()
+    assert by_row.update({"ZZZ": 1.0}) == (by_row.fraction, by_row.seen)
@@ -0,0 +1,71 @@
+import numpy as np
+
+from engine.backtest import run_path
+from engine.dedupe import ResultCache, StrategyRegistry, data_hash, engine_hash, strategy_hash
+
+SOURCE = '''
+"""Hold {ticker}."""
+from surmount.base_class import Strategy, TargetAllocation
+
+
+class TradingStrategy(Strategy):
+    WEIGHT = 1.0
+
+    @property
+    def assets(self):
+        return ["{ticker}"]
+
+    def run(self, data):
+        # rebalance every bar
+        return TargetAllocation({{"{ticker}": self.WEIGHT}})
+'''
+
+
+def _write(tmp_path, name, ticker, docstring=None):
+    path = tmp_path / name
+    path.mkdir()
+    source = SOURCE.format(ticker=ticker)
+    if docstring:
+        source = source.replace(f"Hold {ticker}.", docstring).replace("# rebalance every bar", "")
+    (path / "main.py").write_text(source)
+    return str(path)
+
+
+def test_registry_runs_each_distinct_strategy_once(tmp_path, bars):
+    paths = [_write(tmp_path, "a1", "AAA"), _write(tmp_path, "a2", "AAA", "Same strategy, new words."),
+             _write(tmp_path, "b1", "BBB")]
+    assert strategy_hash(paths[0]) == strategy_hash(paths[1]) != strategy_hash(paths[2])
+    data = bars(n=120)
+    registry = StrategyRegistry(paths)
+    assert len(registry) == 2
+    results = registry.run(data, workers=1)
+    for path in paths:
+        want = run_path(path, data)
+        assert results[path].name == want.name
+        np.testing.assert_array_equal(results[path].equity, want.equity)
+
+
+def test_cache_is_keyed_by_engine_version(tmp_path, bars):
+    path = _write(tmp_path, "a1", "AAA")
+    data = bars(n=120)
+    key, stamp = strategy_hash(path), data_hash(data, start=0)
+    assert stamp != data_hash(data, start=1)
+    cache = ResultCache(str(tmp_path / "cache"))
+    assert cache.engine == engine_hash()
+    StrategyRegistry([path]).run(data, cache, workers=1, start=0)
+    assert cache.get(key, stamp) is not None
+    assert ResultCache(str(tmp_path / "cache")).get(key, stamp) is not None
+    assert ResultCache(str(tmp_path / "cache"), engine="older").get(key, stamp) is None
+
+
+def test_params_and_interval_split_the_key(tmp_path, bars):
+    paths = [_write(tmp_path, "a1", "AAA"), _write(tmp_path, "a2", "AAA")]
+    registry = StrategyRegistry(paths, {paths[1]: {"WEIGHT": 0.5}})
+    assert len(registry) == 2
+    data = bars(n=120)
+    results = registry.run(data, workers=1)
+    np.testing.assert_array_equal(results[paths[0]].equity, run_path(paths[0], data).equity)
+    half = run_path(paths[1], data, params={"WEIGHT": 0.5})
+    np.testing.assert_array_equal(results[paths[1]].equity, half.equity)
+    assert not np.array_equal(half.equity, results[paths[0]].equity)
+    assert data_hash(data) != data_hash(bars(n=120, interval="1day")) != data_hash(bars(n=120, interval="5min"))
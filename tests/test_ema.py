@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from engine.indicators import EMA, MACD
+
+
+def _closes(n=300, seed=0):
+    return 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+
+def test_ema_first_seed_matches_ewm():
+    x = _closes()
+    for span in (1, 5, 12, 200):
+        ema = EMA(span)
+        got = [ema.update(v) for v in x]
+        np.testing.assert_allclose(got, pd.Series(x).ewm(span=span, adjust=False).mean(), rtol=1e-12)
+
+
+def test_macd_matches_conviction_macd():
+    x = _closes()
+    macd = MACD()
+    for i, v in enumerate(x):
+        line, signal, hist = macd.update(v)
+        # The hand-rolled MACD of the conviction family (1ac8db96), over the
+        # whole history every bar.
+        close = pd.Series(x[:i + 1])
+        macd_line = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+        signal_line = macd_line.ewm(span=9, adjust=False).mean()
+        assert np.isclose(line, macd_line.iloc[-1], rtol=0, atol=1e-9)
+        assert np.isclose(signal, signal_line.iloc[-1], rtol=0, atol=1e-9)
+        assert np.isclose(hist, macd_line.iloc[-1] - signal_line.iloc[-1], rtol=0, atol=1e-9)
+        assert macd.bullish == (macd_line.iloc[-1] > signal_line.iloc[-1])
+
+
+def test_macd_sma_seed_warms_up_like_pandas_ta():
+    macd = MACD(seed="sma")
+    out = [macd.update(v) for v in _closes(60)]
+    assert out[24] == (None, None, None)
+    assert out[25][0] is not None and out[25][1] is None
+    assert all(v is not None for v in out[33])
+    assert out[32][1] is None
+
+
+def test_snapshot_restore_continues_identically():
+    x = _closes()
+    for seed in ("first", "sma"):
+        whole = MACD(seed=seed)
+        half = MACD(seed=seed)
+        for v in x[:150]:
+            whole.update(v)
+            half.update(v)
+        resumed = MACD.restore(half.snapshot())
+        for v in x[150:]:
+            assert resumed.update(v) == whole.update(v)
+        assert resumed.snapshot() == whole.snapshot()
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_frame
+from engine.backtest import Bars, run_path
+from engine.families import Family, families
+from engine.loader import discover
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAMILIES = families(discover(ROOT))
+
+VARIANT = '''
+from surmount.base_class import Strategy, TargetAllocation
+
+
+class TradingStrategy(Strategy):
+    def __init__(self):
+        self.tickers = ["AAA", "BBB", "CCC"]
+        self.fast = {fast}
+        self.slow = 12
+        self.band = {band}
+        self.held = None
+
+    @property
+    def assets(self):
+        return self.tickers
+
+    @property
+    def interval(self):
+        return "5min"
+
+    def mean(self, closes, n):
+        return sum(closes[-n:]) / n
+
+    def run(self, data):
+        d = data["ohlcv"]
+        if len(d) < self.slow:
+            return None
+        best, score = None, 0.0
+        for t in self.tickers:
+            closes = [bar[t]["close"] for bar in d if t in bar]
+            edge = self.mean(closes, self.fast) / self.mean(closes, self.slow) - 1
+            if edge > self.band and edge > score:
+                best, score = t, edge
+        if best == self.held:
+            return None
+        self.held = best
+        return TargetAllocation({{best: 1.0}} if best else {{}})
+'''
+
+
+def _same(got, want):
+    assert got.error == want.error
+    assert got.trades == want.trades
+    np.testing.assert_array_equal(got.equity, want.equity)
+
+
+def _family(tmp_path, values):
+    paths = []
+    for i, (fast, band) in enumerate(values):
+        path = tmp_path / f"variant{i}"
+        path.mkdir()
+        (path / "main.py").write_text(VARIANT.format(fast=fast, band=band))
+        paths.append(str(path))
+    return Family(paths)
+
+
+@pytest.mark.parametrize("share", [True, False])
+def test_family_matches_independent_backtests(tmp_path, bars, share):
+    family = _family(tmp_path, [(3, 0.0), (5, 0.0), (3, 0.001), (3, 0.0)])
+    assert family.parameters == ["fast", "band"]
+    data = bars(n=400)
+    results = family.backtest(data, share=share)
+    for path, result in zip(family.paths, results):
+        _same(result, run_path(path, data, fast=False))
+    assert sum(r.trades for r in results) > 0
+    assert set(family.sharing.values()) == {"no family kernel" if share else "sharing off"}
+
+
+def test_variants_that_change_arrays_in_place_stay_independent(tmp_path, bars):
+    source = VARIANT.replace("closes = [bar[t][\"close\"] for bar in d if t in bar]",
+                             "closes = np.array([bar[t][\"close\"] for bar in d if t in bar])\n"
+                             "            np.multiply(closes, self.scale, out=closes)")
+    source = source.replace("self.held = None", "self.held = None\n        self.scale = {scale}")
+    source = "import numpy as np\n" + source
+    paths = []
+    for i, scale in enumerate([1.0, 2.0, 0.5]):
+        path = tmp_path / f"scaled{i}"
+        path.mkdir()
+        (path / "main.py").write_text(source.format(fast=3, band=0.0, scale=scale))
+        paths.append(str(path))
+    data = bars(n=300)
+    for path, result in zip(paths, Family(paths).backtest(data)):
+        _same(result, run_path(path, data, fast=False))
+
+
+def test_family_build_runs_new_vectors(tmp_path, bars):
+    family = _family(tmp_path, [(3, 0.0), (5, 0.0)])
+    data = bars(n=200)
+    result, = family.backtest(data, vectors=[family.vector(fast=4)], names=["four"])
+    (tmp_path / "four").mkdir()
+    (tmp_path / "four" / "main.py").write_text(VARIANT.format(fast=4, band=0.0))
+    _same(result, run_path(str(tmp_path / "four"), data, fast=False))
+
+
+@pytest.mark.parametrize("family", FAMILIES, ids=[f.names[0][:8] for f in FAMILIES])
+def test_tree_families_match_independent_backtests(family):
+    try:
+        assets = family.build(family.vectors[0])().assets
+    except Exception as exc:
+        pytest.skip(f"does not build here: {exc}")
+    data = Bars.from_frame(make_frame(tuple(dict.fromkeys(assets)), n=240))
+    results = family.backtest(data, share=True)
+    for path, result in zip(family.paths, results):
+        _same(result, run_path(path, data, fast=False))
+
+
+def test_conviction_family_runs_through_its_kernel():
+    family = next(f for f in FAMILIES if "07321b2d-2654-48b9-be38-1a9cd47a409d" in f.names)
+    assets = family.build(family.vectors[0])().assets
+    data = Bars.from_frame(make_frame(tuple(dict.fromkeys(assets)), n=400, seed=3))
+    results = family.backtest(data)
+    assert set(family.sharing.values()) == {"kernel conviction"}
+    assert {r.kernel for r in results} == {"family-conviction"}
+    assert sum(r.trades for r in results) > 0
+    for path, result in zip(family.paths, results):
+        _same(result, run_path(path, data, fast=False))
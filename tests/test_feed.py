@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from engine.feed import LAYOUTS, ROWS, SNAPSHOTS, TICKERS, Feed, StoreAdapter, detect_layout
+
+
+def _platform(history, n=120):
+    """The same bars in the three layouts the platform hands out."""
+    aaa, bbb = history(n, 0, symbol="AAA"), history(n, 1, symbol="BBB")
+    gaps = np.random.default_rng(0).random(n) < 0.2
+    snapshots = [{"AAA": a} if gap else {"AAA": a, "BBB": b} for a, b, gap in zip(aaa, bbb, gaps)]
+    rows = [bar for snapshot in snapshots for bar in snapshot.values()]
+    tickers = {"AAA": aaa, "BBB": [b for b, gap in zip(bbb, gaps) if not gap]}
+    return {SNAPSHOTS: snapshots, ROWS: rows, TICKERS: tickers}
+
+
+def _prefix(layouts, layout, k):
+    """The history as it stood after the first ``k`` snapshots."""
+    snapshots = layouts[SNAPSHOTS][:k]
+    if layout == SNAPSHOTS:
+        return snapshots
+    rows = [bar for snapshot in snapshots for bar in snapshot.values()]
+    if layout == ROWS:
+        return rows
+    out = {}
+    for bar in rows:
+        out.setdefault(bar["symbol"], []).append(bar)
+    return out
+
+
+@pytest.mark.parametrize("layout", LAYOUTS)
+def test_views_match_platform_layouts(history, layout):
+    layouts = _platform(history)
+    feed = Feed()
+    for k in list(range(1, 40)) + [40, 40, 90, 120]:
+        ohlcv = _prefix(layouts, layout, k)
+        assert detect_layout(ohlcv) == layout
+        feed.ingest(ohlcv)
+        for other in LAYOUTS:
+            assert feed.view(other) == _prefix(layouts, other, k)
+    assert len(feed) == len(layouts[ROWS])
+    assert feed.store.close("BBB").tolist() == [b["close"] for b in layouts[TICKERS]["BBB"]]
+
+
+def test_sliding_window_history_is_ingested_once(history):
+    snapshots = _platform(history)[SNAPSHOTS]
+    feed = Feed()
+    added = [feed.ingest(snapshots[max(0, k - 10):k]) for k in range(1, len(snapshots) + 1)]
+    assert added == [len(s) for s in snapshots]
+    assert feed.snapshots() == snapshots
+
+
+def test_store_adapter_passes_data_through(history):
+    seen = []
+
+    class Strategy:
+        assets = ["AAA"]
+
+        def run(self, data):
+            seen.append((data["ohlcv"], len(self.store.close("AAA"))))
+            return None
+
+    adapter = StoreAdapter(Strategy())
+    bars = history(20)
+    for k in range(1, 21):
+        data = {"ohlcv": [{"AAA": bar} for bar in bars[:k]]}
+        adapter.run(data)
+        assert seen[-1] == (data["ohlcv"], k)
+    assert adapter.assets == ["AAA"]
+
+
+def _bounded(layouts, layout, k, capacity):
+    """The platform layout holding only the newest ``capacity`` timestamps."""
+    kept = {"snapshots": layouts[SNAPSHOTS][max(0, k - capacity):k]}
+    return _prefix(kept, layout, len(kept["snapshots"]))
+
+
+@pytest.mark.parametrize("every", [1, 7, 40])
+def test_log_and_views_are_bounded_by_capacity(history, every):
+    layouts = _platform(history, n=300)
+    feed = Feed(capacity=25)
+    seen, cursor = [], 0
+    for k in range(1, 301):
+        feed.ingest(layouts[SNAPSHOTS][:k])
+        # A registry-style consumer reading every few bars sees each bar once.
+        if k % 3 == 0 or k == 300:
+            seen += [bar for _, _, bar in feed.events(cursor)]
+            cursor = len(feed)
+        if k % every == 0:
+            for layout in LAYOUTS:
+                assert feed.view(layout) == _bounded(layouts, layout, k, 25)
+        assert len({epoch for epoch, _, _ in feed.events()}) <= 2 * 25 + 1
+    assert seen == layouts[ROWS]
+    assert len(feed) == len(layouts[ROWS])
+    assert feed.events(0) == feed.events(feed._dropped) and feed._dropped > 0
+
+
+def test_series_book_catches_up_past_capacity(history):
+    from engine.indicators import ATR
+    from engine.indicators.book import SeriesBook
+
+    bars = history(200)
+    book = SeriesBook(capacity=20)
+    atr = ATR(14)
+    want = [atr.update(b["high"], b["low"], b["close"]) for b in bars]
+    for k in list(range(1, 60)) + [150, 200]:
+        got = book.series("AAA", [{"AAA": b} for b in bars[:k]], "atr", lambda: ATR(14))
+        assert got == want[:k]
@@ -0,0 +1,114 @@
+import math
+
+import numpy as np
+import pytest
+
+from engine.backtest import Bars
+from engine.fills import MODELS, NONE, STOP, TARGET, exits
+from engine.store import FIELDS
+
+
+def brute_exit(o, h, l, c, start, end, entry, stop, target, trail, side, model, mark=None):
+    """The per-bar loop the strategies run, walking each bar's path in order."""
+    peak = entry if mark is None else mark
+    fixed = None if stop is None else entry * (1 - side * stop)
+    goal = None if target is None else entry * (1 + side * target)
+
+    def level():
+        levels = [x for x in (fixed, None if trail is None else peak * (1 - side * trail)) if x is not None]
+        if not levels:
+            return None
+        return max(levels) if side > 0 else min(levels)
+
+    def stopped(p):
+        return level() is not None and side * (p - level()) <= 0
+
+    def reached(p):
+        return goal is not None and side * (p - goal) >= 0
+
+    for t in range(start, end):
+        if math.isnan(c[t]):
+            continue
+        favourable, adverse = (h[t], l[t]) if side > 0 else (l[t], h[t])
+        if stopped(o[t]):
+            return t, o[t], STOP, True
+        if reached(o[t]):
+            return t, o[t], TARGET, True
+        if model == "direction":
+            favourable_first = side * (o[t] - c[t]) > 0
+        elif model == "nearest":
+            favourable_first = abs(favourable - o[t]) < abs(o[t] - adverse)
+        else:
+            favourable_first = model == "optimistic"
+        if favourable_first:
+            if reached(favourable):
+                return t, goal, TARGET, False
+            peak = max(peak, favourable) if side > 0 else min(peak, favourable)
+            if stopped(adverse):
+                return t, level(), STOP, False
+        else:
+            if stopped(adverse):
+                return t, level(), STOP, False
+            if reached(favourable):
+                return t, goal, TARGET, False
+            peak = max(peak, favourable) if side > 0 else min(peak, favourable)
+            if stopped(c[t]):
+                return t, level(), STOP, False
+    return -1, math.nan, NONE, False
+
+
+def _positions(bars, n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    pick = lambda *options: [options[k] for k in rng.integers(0, len(options), n)]
+    tickers = pick(*bars.tickers)
+    entries = rng.integers(0, len(bars) - 1, n)
+    return dict(tickers=tickers, entries=entries,
+                stop=pick(None, 0.002, 0.01), target=pick(None, 0.003, 0.02), trail=pick(None, 0.001, 0.005),
+                side=pick(1, -1))
+
+
+def _gapped(bars):
+    for field in FIELDS:
+        getattr(bars, field)[1, 50:60] = np.nan
+    return bars
+
+
+def _check(found, want):
+    index, price, reason, gap = (np.array(x) for x in zip(*want))
+    np.testing.assert_array_equal(found.index, index)
+    np.testing.assert_array_equal(found.reason, reason)
+    np.testing.assert_array_equal(found.gap, gap)
+    np.testing.assert_allclose(found.price, price, rtol=1e-12)
+    assert {STOP, TARGET} <= set(found.reason.tolist())
+
+
+@pytest.mark.parametrize("model", MODELS)
+def test_exits_match_per_bar_loop(bars, model):
+    data = _gapped(bars(n=400))
+    p = _positions(data)
+    levels = {k: np.array([np.nan if x is None else x for x in p[k]]) for k in ("stop", "target", "trail")}
+    found = exits(data, p["tickers"], p["entries"], side=np.array(p["side"]), model=model,
+                  horizon=150, **levels)
+    want = []
+    for i, (ticker, entry) in enumerate(zip(p["tickers"], p["entries"])):
+        row = data.index(ticker)
+        o, h, l, c = (getattr(data, f)[row] for f in ("open", "high", "low", "close"))
+        want.append(brute_exit(o, h, l, c, entry + 1, min(len(data), entry + 151), c[entry], p["stop"][i],
+                               p["target"][i], p["trail"][i], p["side"][i], model))
+    _check(found, want)
+
+
+def test_sub_bars_match_per_bar_loop(bars):
+    sub = bars(n=600)
+    every = np.arange(0, len(sub), 12)
+    coarse = Bars(sub.tickers, sub.epochs[every], {f: getattr(sub, f)[:, every] for f in FIELDS})
+    p = _positions(coarse, n=100, seed=1)
+    found = exits(coarse, p["tickers"], p["entries"], stop=0.004, target=0.006, trail=0.003, sub=sub)
+    want = []
+    for ticker, entry in zip(p["tickers"], p["entries"]):
+        row = sub.index(ticker)
+        o, h, l, c = (getattr(sub, f)[row] for f in ("open", "high", "low", "close"))
+        t, price, reason, gap = brute_exit(o, h, l, c, every[entry + 1], len(sub), coarse.close[row, entry],
+                                           0.004, 0.006, 0.003, 1, "direction")
+        want.append((-1 if t < 0 else t // 12, price, reason, gap))
+    _check(found, want)
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from engine.frames import FrameCache
+from engine.store import FIELDS
+
+
+def _same(frame, history):
+    expected = pd.DataFrame(history)
+    assert list(frame.index) == list(expected.index)
+    for field in FIELDS:
+        np.testing.assert_array_equal(frame[field].to_numpy(), expected[field].to_numpy())
+    assert list(frame["date"]) == list(expected["date"])
+
+
+def test_update_from_empty_with_unstamped_bars(history):
+    bars = history(40)
+    cache = FrameCache(8)
+    _same(cache.update("A", bars), bars)
+    assert cache.length("A") == 40
+
+
+def test_update_matches_dataframe_as_history_grows(history):
+    bars = history(120, seed=1)
+    cache = FrameCache(4)
+    for n in (1, 2, 7, 50, 51, 120):
+        _same(cache.update("A", bars[:n]), bars[:n])
+    assert cache.length("A") == 120
+
+
+def test_update_with_trimmed_history_returns_its_tail(history):
+    bars = history(100, seed=2)
+    cache = FrameCache(16)
+    cache.update("A", bars[:60])
+    _same(cache.update("A", bars[40:100]), bars[40:100])
+
+
+def test_frames_handed_out_stay_valid(history):
+    bars = history(30, seed=3)
+    cache = FrameCache(2)
+    early = cache.update("A", bars[:10])
+    cache.update("A", bars)
+    _same(early, bars[:10])
+
+
+def test_sync_follows_a_feed(history):
+    from engine.feed import Feed
+
+    feed = Feed()
+    cache = FrameCache(4)
+    aaa, bbb = history(50, symbol="AAA"), history(50, seed=1, symbol="BBB")
+    for k in range(50):
+        feed.append("AAA", aaa[k])
+        if k % 3:
+            feed.append("BBB", bbb[k])
+        cache.sync(feed, tickers={"AAA", "BBB"})
+        for ticker, bars in feed.by_ticker().items():
+            _same(cache.frame(ticker), bars)
+            _same(cache.frame(ticker, 5), bars[-5:])
+    assert cache.column("BBB", "close").tolist() == [b["close"] for b in feed.by_ticker()["BBB"]]
+    assert cache.frame("CCC").empty
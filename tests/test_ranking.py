@@ -0,0 +1,50 @@
+import numpy as np
+
+from engine.ranking import CloseMatrix, momentum, tail_matrix, top_k
+from engine.store import BarStore
+
+
+def _reference(scores, k, mask=None):
+    keep = [i for i, s in enumerate(scores) if s == s and (mask is None or mask[i])]
+    return sorted(keep, key=lambda i: scores[i], reverse=True)[:k]
+
+
+def test_top_k_matches_sorted_with_ties():
+    rng = np.random.default_rng(0)
+    for _ in range(2000):
+        n = int(rng.integers(1, 30))
+        scores = rng.integers(0, 5, n).astype(float)
+        scores[rng.random(n) < 0.1] = np.nan
+        mask = rng.random(n) < 0.8
+        k = int(rng.integers(0, n + 2))
+        assert top_k(scores, k).tolist() == _reference(scores, k)
+        assert top_k(scores, k, mask).tolist() == _reference(scores, k, mask)
+
+
+def test_momentum_matches_calculate_momentum(history):
+    bars = history(60)
+    closes = np.array([[b["close"] for b in bars]])
+
+    def calculate_momentum(history, length):
+        if len(history) >= length:
+            return history[-1]["close"] / history[-length]["close"] - 1
+        return history[-1]["close"] / history[0]["close"] - 1
+
+    for length in (2, 10, 40, 60):
+        assert momentum(closes, length)[0] == calculate_momentum(bars, length)
+    short = np.concatenate([[np.nan] * 50, closes[0, :10]])[None, :]
+    assert momentum(short, 40, partial=True)[0] == calculate_momentum(bars[:10], 40)
+
+
+def test_tail_matrix_and_close_matrix_agree(history):
+    store = BarStore(64)
+    tickers = ["A", "B"]
+    matrix = CloseMatrix(tickers, 32)
+    a, b = history(50, seed=1), history(50, seed=2)
+    for i in range(50):
+        snapshot = {"A": a[i]} if i < 10 else {"A": a[i], "B": b[i]}
+        store.ingest(snapshot)
+        matrix.append_snapshot(snapshot)
+    tail = tail_matrix(store, tickers, 20)
+    np.testing.assert_array_equal(tail, matrix.window(20))
+    np.testing.assert_array_equal(tail[0], [bar["close"] for bar in a[-20:]])
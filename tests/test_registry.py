@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from conftest import make_history
+from engine.indicators import ATR
+from engine.registry import IndicatorRegistry
+
+
+def _ohlcv(n=150):
+    aaa, bbb = make_history(n, symbol="AAA"), make_history(n, seed=1, symbol="BBB")
+    return [{"AAA": a, "BBB": b} for a, b in zip(aaa, bbb)]
+
+
+def _sma(ohlcv, ticker, n):
+    # How the strategies compute it each bar.
+    closes = [bar[ticker]["close"] for bar in ohlcv if ticker in bar]
+    return sum(closes[-n:]) / n if len(closes) >= n else None
+
+
+def test_strategies_share_one_update_per_bar():
+    ohlcv = _ohlcv()
+    registry = IndicatorRegistry()
+    first = registry.subscribe("AAA", "5min", "sma", window=20)
+    second = registry.subscribe("AAA", "5min", "sma", window=20)
+    other = registry.subscribe("BBB", "5min", "atr", period=14)
+    assert first == second and len(registry) == 2 and registry.refs(first) == 2
+    atr = ATR(14)
+    for k in range(len(ohlcv)):
+        # Two strategies hand over the same sliding history each bar.
+        for _ in range(2):
+            registry.ingest("5min", ohlcv[max(0, k - 50):k + 1])
+        bar = ohlcv[k]["BBB"]
+        want = atr.update(bar["high"], bar["low"], bar["close"])
+        got = registry.value(first)
+        assert (got is None) if k < 19 else np.isclose(got, _sma(ohlcv[:k + 1], "AAA", 20))
+        assert registry.value(other) == want
+    assert registry.updates == 2 * len(ohlcv)
+
+
+def test_late_subscriber_warms_up_from_held_bars():
+    ohlcv = _ohlcv(80)
+    registry = IndicatorRegistry()
+    early = registry.subscribe("AAA", "5min", "ema", span=10)
+    for k in range(40):
+        registry.ingest("5min", ohlcv[:k + 1])
+    late = registry.subscribe("AAA", "5min", "sma", window=10)
+    for k in range(40, 80):
+        registry.ingest("5min", ohlcv[:k + 1])
+        assert np.isclose(registry.value(late), _sma(ohlcv[:k + 1], "AAA", 10))
+    assert registry.get("AAA", "5min", "ema", span=10) == registry.value(early)
+
+
+def test_unsubscribe_drops_the_last_reference():
+    registry = IndicatorRegistry()
+    key = registry.subscribe("AAA", "5min", "sma", window=5)
+    registry.subscribe("AAA", "5min", "sma", window=5)
+    registry.unsubscribe(key)
+    assert registry.refs(key) == 1 and len(registry) == 1
+    registry.unsubscribe(key)
+    assert registry.refs(key) == 0 and len(registry) == 0
+    registry.ingest("5min", _ohlcv(3))
+    assert registry.updates == 0
+    with pytest.raises(KeyError):
+        registry.subscribe("AAA", "5min", "nope")
@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_history
+from engine.feed import ROWS, Feed
+from engine.resample import FRAMES, Resampler, resample
+
+AGG = {"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"}
+RULES = {"15min": dict(rule="15min"), "1hour": dict(rule="1h", offset="30min"), "1day": dict(rule="1D")}
+
+
+def _bars(seed=0, symbol="AAA"):
+    # Five sessions of 5-minute bars; the third one closes at 13:00.
+    bars = make_history(5 * 78, seed=seed, symbol=symbol)
+    return [b for b in bars if not (b["date"].startswith("2024-01-04") and b["date"][11:] >= "13:00")]
+
+
+def pandas_resample(bars, frame):
+    df = pd.DataFrame(bars).set_index(pd.to_datetime([b["date"] for b in bars]))[list(AGG)]
+    out = df.resample(**RULES[frame]).agg(AGG).dropna(subset=["close"])
+    out.index = out.index.astype("datetime64[s]").astype(np.int64)
+    return out
+
+
+def _stored(store, ticker):
+    return pd.DataFrame({f: store.column(ticker, f) for f in AGG},
+                        index=store.timestamp(ticker).astype(np.int64))
+
+
+@pytest.mark.parametrize("base", ["5min", None])
+def test_resampler_matches_pandas_resample(base):
+    aaa, bbb = _bars(0, "AAA"), _bars(1, "BBB")
+    resampler = resample([p for pair in zip([("AAA", b) for b in aaa], [("BBB", b) for b in bbb])
+                          for p in pair], base=base)
+    for ticker, bars in (("AAA", aaa), ("BBB", bbb)):
+        for frame in FRAMES:
+            want = pandas_resample(bars, frame)
+            pd.testing.assert_frame_equal(_stored(resampler.store(frame), ticker), want,
+                                          check_dtype=False, check_names=False, check_index_type=False)
+    assert len(resampler.store("1day").column("AAA", "close")) == 5
+
+
+def test_buckets_are_stored_when_their_last_bar_arrives():
+    bars = _bars()
+    resampler = Resampler(base="5min")
+    for k, bar in enumerate(bars):
+        done = resampler.append("AAA", bar)
+        # The 15:55 bar ends a day; a half-day ends when the next one starts.
+        prev = bars[k - 1]["date"] if k else bar["date"]
+        ended = bar["date"].endswith("15:55:00") or prev[:10] != bar["date"][:10] and not prev.endswith("15:55:00")
+        assert ("1day" in done) == ended
+        seen = [b for b in bars[:k + 1] if b["date"][:10] == bar["date"][:10]]
+        forming = resampler.forming("1day", "AAA")
+        if forming is not None:
+            assert [forming[f] for f in AGG] == pytest.approx(pandas_resample(seen, "1day").iloc[-1].tolist())
+    assert resampler.append("AAA", dict(bars[3])) == ()
+
+
+def test_feed_drives_the_resampler():
+    bars = _bars()
+    feed = Feed(frames=("1hour",))
+    for bar in bars:
+        feed.append("AAA", dict(bar))
+    pd.testing.assert_frame_equal(_stored(feed.timeframe("1hour"), "AAA"),
+                                  pandas_resample(bars, "1hour"),
+                                  check_dtype=False, check_names=False, check_index_type=False)
+    with pytest.raises(KeyError):
+        feed.timeframe("1day")
+
+
+def test_feed_sizes_each_frame_by_its_own_capacity():
+    feed = Feed({"5min": 100, "1day": 10}, frames=("1hour", "1day"))
+    assert feed.capacity == 100 and feed.store.capacity == 100
+    assert feed.timeframe("1day").capacity == 10
+    assert feed.timeframe("1hour").capacity == 100
+    for bar in _bars():
+        feed.append("AAA", dict(bar))
+    assert len(feed.view(ROWS)) <= 100
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from conftest import make_history
+from engine.sessions import SessionCalendar, at, parse, stamp, to_epoch
+
+
+def _pandas_fields(text):
+    # What the strategies did per bar: pd.to_datetime on the date.
+    ts = pd.to_datetime(text)
+    if ts.tzinfo is not None:
+        ts = ts.tz_localize(None)
+    return (int(ts.value // 10 ** 9), ts.date().toordinal(), ts.hour * 60 + ts.minute - 570)
+
+
+def test_parse_matches_pandas():
+    texts = [b["date"] for b in make_history(200, step=5)] + [
+        "2024-03-08 15:55:00-05:00", "2024-07-01T09:30:00+00:00", "2024-01-02", "2023-12-29 16:00:00"]
+    for text in texts:
+        fields = _pandas_fields(text)
+        assert parse(text) == fields
+        assert parse(fields[0]) == parse(np.int64(fields[0])) == fields
+        assert parse(pd.Timestamp(text).to_pydatetime()) == fields
+        assert to_epoch(text) == to_epoch(fields[0]) == fields[0]
+    assert at(15, 55) == _pandas_fields("2024-01-02 15:55:00")[2] == 385
+
+
+def test_stamp_parses_once():
+    bar = make_history(1)[0]
+    assert stamp(bar) == _pandas_fields(bar["date"])[0]
+    bar["date"] = "1999-01-01 00:00:00"
+    assert stamp(bar) == _pandas_fields("2024-01-02 09:30:00")[0]
+
+
+def test_calendar_matches_pandas_grouping():
+    bars = make_history(400)
+    calendar = SessionCalendar()
+    for bar in bars + bars[100:110]:
+        stamp(bar)
+        calendar.add(bar["epoch"], bar["session"])
+    assert calendar.add(bars[5]["epoch"] - 1, bars[5]["session"]) is None
+    dates = pd.to_datetime(pd.Series([b["date"] for b in bars]))
+    days = dates.dt.date
+    assert len(calendar) == len(bars)
+    assert calendar.sessions == [d.toordinal() for d in days.unique()]
+    for day, group in dates.groupby(days):
+        assert calendar.session_bounds(day.toordinal()) == (group.index[0], group.index[-1] + 1)
+    for k in (0, 77, 78, 250, 399):
+        epoch = bars[k]["epoch"]
+        assert calendar.offset(epoch) == calendar.locate(epoch) == k
+        assert calendar.locate(epoch + 1) == k + 1
+        assert calendar.bars_since_open(k) == int((days == days[k])[:k].sum())
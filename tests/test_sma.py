@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+import engine.ta as ta
+from engine.indicators import EMA, SMA, BatchRollingSum, BatchSMA, RollingSum
+
+
+def _closes(n=400, seed=0, gaps=(0, 7, 60, 61, 62, 200, 399)):
+    x = 100 + np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+    x[list(gaps)] = np.nan
+    return x
+
+
+def _pandas_ta_ema(close, length):
+    # pandas_ta.ema with its defaults (sma=True, adjust=False).
+    close = close.copy()
+    seed = close[0:length].sum() / length
+    close[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def test_rolling_sum_matches_window_sum():
+    x = np.random.default_rng(1).normal(0, 1e6, 5000) + 1e-3
+    acc, sma = RollingSum(20), SMA(20)
+    for i, v in enumerate(x):
+        acc.update(v)
+        mean = sma.update(v)
+        window = x[max(0, i - 19):i + 1]
+        assert np.isclose(acc.value, sum(window), rtol=0, atol=1e-6)
+        assert (mean is None) == (i < 19)
+    assert np.isclose(mean, sum(x[-20:]) / 20, rtol=0, atol=1e-9)
+
+
+def test_rolling_sum_recovers_after_nan():
+    x = _closes()
+    for window in (1, 3, 20):
+        acc = RollingSum(window)
+        got = []
+        for v in x:
+            acc.update(v)
+            got.append(acc.value if acc.ready else np.nan)
+        np.testing.assert_allclose(got, pd.Series(x).rolling(window).sum(), rtol=1e-12)
+
+
+def test_batch_rolling_sum_recovers_after_nan():
+    x = _closes()
+    windows = np.array([1, 3, 20])
+    acc = BatchSMA(windows)
+    got = []
+    for i, v in enumerate(x):
+        values = np.array([v, v if i % 2 else np.nan, v])
+        got.append(acc.update(values))
+    got = np.array(got)
+    odd = np.where(np.arange(len(x)) % 2 == 1, x, np.nan)
+    np.testing.assert_allclose(got[:, 0], pd.Series(x).rolling(1).mean(), rtol=1e-12)
+    np.testing.assert_allclose(got[:, 1], pd.Series(odd).rolling(3).mean(), rtol=1e-12)
+    np.testing.assert_allclose(got[:, 2], pd.Series(x).rolling(20).mean(), rtol=1e-12)
+
+    masked = BatchRollingSum(np.array([4, 4]))
+    for v in x[:-1]:
+        masked.update(np.array([v, 1.0]), np.array([True, False]))
+    assert masked.counts.tolist() == [len(x) - 1, 0]
+    assert np.isclose(masked.sums[0], np.sum(x[-5:-1]))
+
+
+def test_ema_skips_nan_like_ewm():
+    x = _closes()
+    for seed in ("first", "sma"):
+        ema = EMA(10, seed)
+        got = [ema.update(v) for v in x]
+        got = np.array([np.nan if v is None else v for v in got])
+        if seed == "first":
+            ref = pd.Series(x).ewm(span=10, adjust=False).mean()
+        else:
+            ref = _pandas_ta_ema(pd.Series(x), 10)
+        np.testing.assert_allclose(got, ref, rtol=1e-12)
+    restored = EMA.restore(ema.snapshot())
+    assert restored.update(np.nan) == ema.update(np.nan)
+    assert restored.update(101.0) == ema.update(101.0)
+
+
+def test_ta_sma_and_ema_recover_like_pandas():
+    close = pd.Series(_closes(120, gaps=(3, 70, 71)), index=pd.RangeIndex(120))
+    for n in range(60, 121, 7):
+        part = close.iloc[:n]
+        np.testing.assert_allclose(ta.sma(part, 10), part.rolling(10).mean(), rtol=1e-12)
+        np.testing.assert_allclose(ta.ema(part, 10), _pandas_ta_ema(part, 10), rtol=1e-12)
+    assert ta.sma(close, 10).name == "SMA_10"
+    assert not np.isnan(ta.sma(close, 10).iloc[-2])
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from engine.sessions import stamp
+from engine.store import FIELDS, BarStore
+
+
+def _snapshots(history, n=200, seed=0):
+    aaa, bbb = history(n, seed, symbol="AAA"), history(n, seed + 1, symbol="BBB")
+    gaps = np.random.default_rng(seed).random(n) < 0.2
+    return [{"AAA": a} if gap else {"AAA": a, "BBB": b} for a, b, gap in zip(aaa, bbb, gaps)]
+
+
+@pytest.mark.parametrize("capacity", [7, 64, 4096])
+def test_columns_match_history_scan(history, capacity):
+    ohlcv = _snapshots(history)
+    store = BarStore(capacity)
+    for i, snapshot in enumerate(ohlcv):
+        store.ingest(snapshot)
+        for t in ("AAA", "BBB"):
+            # What the strategies compute from the whole history every bar.
+            bars = [bar[t] for bar in ohlcv[:i + 1] if t in bar][-capacity:]
+            for field in FIELDS:
+                assert store.column(t, field).tolist() == [b[field] for b in bars]
+            assert store.timestamp(t).tolist() == [stamp(b) for b in bars]
+            assert store.length(t) == len(bars)
+    assert store.latest == stamp(ohlcv[-1]["AAA"])
+    assert sorted(store.tickers) == ["AAA", "BBB"]
+
+
+def test_stale_bars_are_dropped_and_views_read_only(history):
+    bars = history(5)
+    store = BarStore(4)
+    assert all(store.append("AAA", bar) for bar in bars)
+    assert not store.append("AAA", dict(bars[2]))
+    assert store.close("AAA").tolist() == [b["close"] for b in bars[1:]]
+    with pytest.raises(ValueError):
+        store.close("AAA")[0] = 0.0
+    assert store.close("ZZZ").size == 0 and "ZZZ" not in store
@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.backtest import Backtest
+from engine.loader import load_module
+from engine.sweep import METRICS, SharedBars, Sweep, grid
+
+STRATEGY = '''
+import random
+
+from surmount.base_class import Strategy, TargetAllocation
+
+
+class TradingStrategy(Strategy):
+    BAND = 0.0
+
+    def __init__(self):
+        self.fast = 3
+        self.seed = 0
+        self.rng = random.Random(self.seed)
+
+    @property
+    def assets(self):
+        return ["AAA", "BBB"]
+
+    @property
+    def interval(self):
+        return "5min"
+
+    def run(self, data):
+        d = data["ohlcv"]
+        if len(d) < 10:
+            return None
+        closes = [bar["AAA"]["close"] for bar in d]
+        edge = sum(closes[-self.fast:]) / self.fast / (sum(closes[-10:]) / 10) - 1
+        if self.rng.random() < 0.1:
+            return None
+        return TargetAllocation({"AAA": 1.0} if edge > self.BAND else {"BBB": 0.5})
+'''
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    (tmp_path / "main.py").write_text(STRATEGY)
+    return str(tmp_path)
+
+
+def _edited_copy(path, params):
+    # What a sweep replaces: the constants edited in place, one serial run each.
+    instance = load_module(path).TradingStrategy()
+    for name, value in params.items():
+        setattr(instance, name, value)
+    if "seed" in params:
+        instance.rng = random.Random(params["seed"])
+    return instance
+
+
+def test_sweep_matches_serial_runs(strategy, bars, tmp_path):
+    data = bars(("AAA", "BBB"), n=300)
+    points = grid(BAND=[0.0, 0.002], fast=[2, 5], seed=[1, 2])
+    out = tmp_path / "sweep.csv"
+    frame = Sweep(strategy, points, data, workers=2, cost=0.001).run(str(out))
+    assert frame["point"].tolist() == list(range(len(points)))
+    assert frame["error"].isna().all()
+    for row, params in zip(frame.to_dict("records"), points):
+        want = Backtest(_edited_copy(strategy, params), data, cost=0.001).run().metrics()
+        for name in METRICS:
+            assert np.isclose(row[name], want[name], rtol=1e-9, equal_nan=True), (params, name)
+    written = pd.read_csv(out).sort_values("point", ignore_index=True)
+    np.testing.assert_allclose(written["terminal"], frame["terminal"], rtol=1e-12)
+
+
+def test_unknown_parameter_is_an_error_row(strategy, bars):
+    frame = Sweep(strategy, [{"BAND": 0.0}, {"nope": 1}], bars(("AAA", "BBB"), n=50), workers=1).run()
+    assert pd.isna(frame["error"][0])
+    assert frame["error"].tolist()[1] == "AttributeError: TradingStrategy has no parameter 'nope'"
+    assert np.isnan(frame["terminal"][1])
+
+
+def test_shared_bars_round_trip(bars):
+    data = bars(n=40)
+    with SharedBars(data) as shared:
+        shm, view = SharedBars.attach(shared.spec)
+        assert view.tickers == data.tickers
+        np.testing.assert_array_equal(view.epochs, data.epochs)
+        for field in ("open", "close", "volume"):
+            np.testing.assert_array_equal(getattr(view, field), getattr(data, field))
+        assert not view.close.flags.writeable
+        del view
+        shm.close()
@@ -0,0 +1,100 @@
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import engine.ta as ta
+from engine import loader
+
+# The pandas_ta 0.3.14b formulas engine.ta stands in for, with their defaults.
+
+
+def _sma(close, length):
+    return close.rolling(length, min_periods=length).mean()
+
+
+def _ema(close, length):
+    close = close.copy()
+    seed = close[0:length].sum() / length
+    close[:length - 1] = np.nan
+    close.iloc[length - 1] = seed
+    return close.ewm(span=length, adjust=False).mean()
+
+
+def _vwma(close, volume, length):
+    return _sma(close * volume, length) / _sma(volume, length)
+
+
+def _macd(close, fast=12, slow=26, signal=9):
+    macd = _ema(close, fast) - _ema(close, slow)
+    signalma = _ema(macd.loc[macd.first_valid_index():], signal)
+    return macd, macd - signalma, signalma
+
+
+def _atr(high, low, close, length=14):
+    prev = close.shift(1)
+    ranges = [high - low, (high - prev).abs(), (low - prev).abs()]
+    tr = pd.concat(ranges, axis=1).abs().max(axis=1)
+    tr.iloc[:1] = np.nan
+    return tr.ewm(alpha=1.0 / length, min_periods=length).mean()
+
+
+def _df(frame, gaps=()):
+    df = frame(("AAA",), n=400)[["open", "high", "low", "close", "volume"]].copy()
+    df.loc[list(gaps), ["close", "volume"]] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("gaps", [(), (5, 120, 121, 300)])
+def test_matches_pandas_ta_formulas(frame, gaps):
+    df = _df(frame, gaps)
+    close, volume = df["close"], df["volume"]
+    # Called the way the strategies call them: on a history one bar longer each time.
+    for n in list(range(200, 221)) + [400]:
+        c, v = close.iloc[:n], volume.iloc[:n]
+        sma = ta.sma(c, length=20)
+        assert sma.name == "SMA_20"
+        np.testing.assert_allclose(sma, _sma(c, 20), rtol=1e-10)
+        np.testing.assert_allclose(ta.ema(c, 10), _ema(c, 10), rtol=1e-10)
+        np.testing.assert_allclose(ta.vwma(c, v, length=12), _vwma(c, v, 12), rtol=1e-10)
+        macd = ta.macd(c)
+        assert list(macd.columns) == ["MACD_12_26_9", "MACDh_12_26_9", "MACDs_12_26_9"]
+        for got, want in zip(macd.T.values, _macd(c)):
+            np.testing.assert_allclose(got, want.reindex(c.index), rtol=1e-9, atol=1e-12)
+    assert ta.sma(close.iloc[:5], length=20) is None
+
+
+def test_atr_matches_pandas_ta(frame):
+    df = _df(frame)
+    for n in (100, 101, 400):
+        part = df.iloc[:n]
+        atr = ta.atr(part["high"], part["low"], part["close"], length=14)
+        assert atr.name == "ATRr_14"
+        np.testing.assert_allclose(atr, _atr(part["high"], part["low"], part["close"]), rtol=1e-10)
+
+
+def test_loader_aliases_pandas_ta(tmp_path, monkeypatch):
+    if ta._pandas_ta is not None:
+        pytest.skip("pandas_ta is installed")
+    monkeypatch.delitem(sys.modules, "pandas_ta", raising=False)
+    (tmp_path / "strategy").mkdir()
+    (tmp_path / "strategy" / "main.py").write_text("import pandas_ta as ta\nTradingStrategy = ta.sma\n")
+    module = loader.load_module(str(tmp_path / "strategy"), fresh=True)
+    assert module.ta is ta
+    assert module.TradingStrategy is ta.sma
+
+
+def test_edits_anywhere_start_a_fresh_stream(frame):
+    close = _df(frame)["close"]
+    for n in (100, 101):
+        ta.ema(close.iloc[:n], 10)
+    edited = close.iloc[:102].copy()
+    edited.iloc[50] *= 1.5
+    np.testing.assert_allclose(ta.ema(edited, 10), _ema(edited, 10), rtol=1e-10)
+    np.testing.assert_allclose(ta.ema(close.iloc[:103], 10), _ema(close.iloc[:103], 10), rtol=1e-10)
+    relabelled = close.iloc[:104].copy()
+    relabelled.index = close.index[:104].where(close.index[:104] != 60, -1)
+    sma = ta.sma(relabelled, 5)
+    assert sma.index.equals(relabelled.index)
+    np.testing.assert_allclose(sma, _sma(relabelled, 5), rtol=1e-10)
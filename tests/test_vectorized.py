@@ -0,0 +1,49 @@
+import os
+
+import numpy as np
+import pytest
+
+from conftest import make_frame
+from engine.backtest import Backtest, Bars, Portfolio
+from engine.loader import load_module
+from engine.vectorized import backtest, simulate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+KERNELS = {
+    "counter": "0c2fd861-5fd8-4c67-a41c-2d8bc80edc87",
+    "gate": "9627cc6f-ad9d-4b2e-b954-11d44ffe2152",
+    "selector": "3f2fa86a-a0fa-43a3-a3fe-26c0d2d43d99",
+}
+
+
+def _strategy(name):
+    return load_module(os.path.join(ROOT, KERNELS[name])).TradingStrategy()
+
+
+@pytest.mark.parametrize("cost", [0.0, 0.001, 0.01])
+@pytest.mark.parametrize("name", sorted(KERNELS))
+def test_kernel_matches_event_loop(name, cost):
+    tickers = tuple(dict.fromkeys(_strategy(name).assets))
+    bars = Bars.from_frame(make_frame(tickers, n=600))
+    fast = backtest(_strategy(name), bars, cost=cost, start=250)
+    slow = Backtest(_strategy(name), bars, cost=cost, start=250).run()
+    assert fast.kernel == name and slow.kernel is None
+    assert fast.trades == slow.trades > 0
+    np.testing.assert_allclose(fast.equity, slow.equity, rtol=1e-12)
+    assert np.isclose(fast.turnover, slow.turnover, rtol=1e-12)
+
+
+def test_simulate_skips_dust_like_portfolio():
+    # Holding one ticker at 100% with costs leaves it off target by cost,
+    # cost squared, cost cubed (1e-9 at 0.1%): the last is within the
+    # Portfolio's no-trade band and must not trade.
+    prices = np.linspace(100.0, 101.0, 8)
+    portfolio = Portfolio(100_000.0, 0.001)
+    want = []
+    for price in prices:
+        portfolio.rebalance({"A": 1.0}, {"A": price})
+        want.append(portfolio.value({"A": price}))
+    equity, trades, turnover = simulate(prices[None, :], np.arange(8), np.ones((8, 1)), cost=0.001)
+    assert trades == portfolio.trades == 3
+    np.testing.assert_allclose(equity, want, rtol=1e-12)
+    assert np.isclose(turnover, portfolio.turnover, rtol=1e-9)
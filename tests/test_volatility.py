@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from engine.indicators import BatchVolTracker, RollingMoments, VolTracker
+
+
+def _realised_vol(closes, lookback=20):
+    # cf1bdf3f's _realised_vol.
+    w = closes[-(lookback + 1):]
+    if len(w) < 20:
+        return None
+    rets = [w[i] / w[i - 1] - 1 for i in range(1, len(w)) if w[i - 1] > 0]
+    if len(rets) < 15:
+        return None
+    mean = sum(rets) / len(rets)
+    var = sum((r - mean) ** 2 for r in rets) / (len(rets) - 1)
+    return (var ** 0.5) * (252 ** 0.5)
+
+
+def _closes(n=400, seed=0):
+    return (100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))).tolist()
+
+
+def test_rolling_moments_match_pandas():
+    x = np.random.default_rng(1).normal(5.0, 2.0, 1000)
+    m = RollingMoments(30)
+    std = pd.Series(x).rolling(30, min_periods=2).std()
+    for i, v in enumerate(x):
+        m.update(v)
+        if i:
+            assert np.isclose(m.std(), std[i], rtol=1e-9)
+    assert np.isclose(m.mean, x[-30:].mean(), rtol=1e-12)
+
+
+def test_vol_tracker_matches_realised_vol():
+    closes = _closes()
+    tracker = VolTracker((20, 80), annualization=252)
+    returns = pd.Series(closes).pct_change()
+    for i, c in enumerate(closes):
+        tracker.update(c)
+        if i >= 20:
+            assert np.isclose(tracker.vol(20), _realised_vol(closes[:i + 1]), rtol=1e-9)
+        if i >= 80:
+            want = returns[i - 19:i + 1].std() / returns[i - 79:i + 1].std()
+            assert np.isclose(tracker.ratio(), want, rtol=1e-9)
+        else:
+            assert tracker.ratio() is None
+
+
+def test_batch_tracker_matches_scalar():
+    closes = np.array([_closes(300, seed) for seed in range(3)]).T
+    mask = np.random.default_rng(2).random(closes.shape) < 0.8
+    batch = BatchVolTracker(3, (5, 20), annualization=252)
+    scalars = [VolTracker((5, 20), annualization=252) for _ in range(3)]
+    for t in range(len(closes)):
+        batch.update(closes[t], mask[t])
+        for j, tracker in enumerate(scalars):
+            if mask[t, j]:
+                tracker.update(closes[t, j])
+            for w in (5, 20):
+                want = tracker.vol(w)
+                assert np.isnan(batch.vol(w)[j]) if want is None else np.isclose(batch.vol(w)[j], want, rtol=1e-9)
+            want = tracker.ratio()
+            assert np.isnan(batch.ratio()[j]) if want is None else np.isclose(batch.ratio()[j], want, rtol=1e-9)
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from engine.indicators import BatchVolumeKernel, VolumeKernel
+
+
+def _reference(history):
+    # The conviction scalpers' VWAP and RVOL (07321b2d), from a fresh frame.
+    df = pd.DataFrame(history)
+    recent_df = df.tail(12)
+    vwap = (recent_df["close"] * recent_df["volume"]).sum() / recent_df["volume"].sum()
+    avg_vol = df["volume"].tail(20).mean()
+    rvol = df["volume"].iloc[-1] / avg_vol if avg_vol > 0 else 0
+    return vwap, rvol
+
+
+def get_conviction_score(history, rvol_threshold, min_bars=78):
+    # 07321b2d's score, whole.
+    if len(history) < min_bars:
+        return 0
+    vwap, rvol = _reference(history)
+    df = pd.DataFrame(history)
+    current_price = df["close"].iloc[-1]
+    sma_macro = df["close"].mean()
+    if current_price > vwap and current_price > sma_macro and rvol >= rvol_threshold:
+        return rvol
+    return 0
+
+
+def test_volume_kernel_matches_dataframe(history):
+    bars = history(150)
+    bars[60]["volume"] = 0.0
+    kernel = VolumeKernel()
+    for i, bar in enumerate(bars):
+        vwap, rvol = kernel.update_bar(bar)
+        if i < 19:
+            assert rvol is None and (vwap is None) == (i < 11)
+            continue
+        want_vwap, want_rvol = _reference(bars[:i + 1])
+        assert np.isclose(vwap, want_vwap, rtol=1e-12)
+        assert np.isclose(rvol, want_rvol, rtol=1e-12)
+
+
+def test_batch_kernel_matches_scalar_and_scores(frame):
+    df = frame(("AAA", "BBB", "CCC"), n=200)
+    close = df.pivot(index="date", columns="symbol", values="close").to_numpy()
+    volume = df.pivot(index="date", columns="symbol", values="volume").to_numpy()
+    mask = np.random.default_rng(0).random(close.shape) < 0.8
+    batch = BatchVolumeKernel(3)
+    scalars = [VolumeKernel() for _ in range(3)]
+    histories = [[] for _ in range(3)]
+    gated = scored = 0
+    for t in range(len(close)):
+        vwap, rvol = batch.update(close[t], volume[t], mask[t])
+        scores = batch.scores(close[t], 1.0)
+        for j, kernel in enumerate(scalars):
+            if mask[t, j]:
+                kernel.update(close[t, j], volume[t, j])
+                histories[j].append({"close": close[t, j], "volume": volume[t, j]})
+            if kernel.rvol is None:
+                assert np.isnan(rvol[j]) and scores[j] == 0.0
+                continue
+            assert np.isclose(vwap[j], kernel.vwap, rtol=1e-12)
+            assert np.isclose(rvol[j], kernel.rvol, rtol=1e-12)
+            if mask[t, j]:
+                assert np.isclose(scores[j], get_conviction_score(histories[j], 1.0), rtol=1e-12)
+                gated += scores[j] == 0 and _reference(histories[j])[1] >= 1.0
+                scored += scores[j] > 0
+    assert gated and scored
+
+
+def test_scores_gate_on_a_bounded_trend_window(frame):
+    df = frame(("AAA", "BBB"), n=200)
+    close = df.pivot(index="date", columns="symbol", values="close").to_numpy()
+    volume = df.pivot(index="date", columns="symbol", values="volume").to_numpy()
+    batch = BatchVolumeKernel(2, sma_len=50)
+    scored = 0
+    for t in range(len(close)):
+        batch.update(close[t], volume[t])
+        if t >= 49:
+            np.testing.assert_allclose(batch.sma, close[t - 49:t + 1].mean(axis=0), rtol=1e-12)
+        histories = [[{"close": c, "volume": v} for c, v in zip(close[max(0, t - 49):t + 1, j],
+                                                                 volume[max(0, t - 49):t + 1, j])]
+                     for j in range(2)]
+        want = [get_conviction_score(h, 1.0, 50) for h in histories]
+        np.testing.assert_allclose(batch.scores(close[t], 1.0, min_bars=50), want, rtol=1e-12)
+        scored += sum(w > 0 for w in want)
+    assert scored
@@ -0,0 +1,120 @@
+import numpy as np
+import pytest
+
+from engine import metrics
+from engine.backtest import Backtest
+from engine.loader import load_module
+from engine.sweep import grid
+from engine.walkforward import WalkForward, folds, score
+
+STRATEGY = '''
+from surmount.base_class import Strategy, TargetAllocation
+
+
+class TradingStrategy(Strategy):
+    BAND = 0.0
+
+    def __init__(self):
+        self.fast = 3
+
+    @property
+    def assets(self):
+        return ["AAA", "BBB"]
+
+    @property
+    def interval(self):
+        return "1day"
+
+    def run(self, data):
+        d = data["ohlcv"]
+        if len(d) < 10:
+            return None
+        closes = [bar["AAA"]["close"] for bar in d]
+        edge = sum(closes[-self.fast:]) / self.fast / (sum(closes[-10:]) / 10) - 1
+        return TargetAllocation({"AAA": 1.0} if edge > self.BAND else {"BBB": 1.0})
+'''
+
+POINTS = grid(BAND=[-0.01, 0.0, 0.01], fast=[2, 5])
+PERIODS = metrics.periods_per_year("1day")
+
+
+@pytest.fixture
+def strategy(tmp_path):
+    (tmp_path / "main.py").write_text(STRATEGY)
+    return str(tmp_path)
+
+
+def _equity(path, params, bars, start, stop, cost):
+    instance = load_module(path).TradingStrategy()
+    for name, value in params.items():
+        setattr(instance, name, value)
+    return Backtest(instance, bars, cost=cost, start=start, stop=stop).run().equity
+
+
+def naive_walk_forward(path, bars, geometry, objective, cost, independent, chunk=None):
+    """Every fold re-scores every point from scratch, then trades the winner."""
+    chunk = chunk or len(geometry)
+    chosen, curve, end = [], [100_000.0], None
+    for fold in geometry:
+        if fold.index % chunk == 0:
+            run = geometry[fold.index:fold.index + chunk]
+            first = run[0].train_start
+            whole = [_equity(path, p, bars, first, max(f.test_stop for f in run), cost) for p in POINTS]
+        if independent:
+            train = [_equity(path, p, bars, fold.train_start, fold.test_start, cost) for p in POINTS]
+            test = lambda i: _equity(path, POINTS[i], bars, fold.test_start, fold.test_stop, cost)
+        else:
+            lead = max(fold.train_start - 1 - first, 0)
+            train = [e[lead:fold.test_start - first] for e in whole]
+            test = lambda i: whole[i][fold.test_start - 1 - first:fold.test_stop - first]
+        scores = [score(e, objective, PERIODS) for e in train]
+        best = int(np.nanargmax(scores))
+        equity = test(best)
+        growth = equity[1:] / equity[:-1]
+        growth = np.concatenate([[1.0] * (fold.test_stop - fold.test_start - len(growth)), growth])
+        begin = fold.test_start if end is None else max(fold.test_start, end)
+        curve += list(curve[-1] * np.cumprod(growth[begin - fold.test_start:]))
+        end = fold.test_stop
+        chosen.append(best)
+    return chosen, np.array(curve[1:])
+
+
+def test_folds_roll_and_anchor():
+    assert [tuple(f) for f in folds(100, 40, 20)] == [(0, 0, 40, 60), (1, 20, 60, 80), (2, 40, 80, 100)]
+    assert [f.train_start for f in folds(100, 40, 20, anchored=True)] == [0, 0, 0]
+    assert [tuple(f) for f in folds(100, 40, 20, step=30, start=5)] == [(0, 5, 45, 65), (1, 35, 75, 95)]
+
+
+@pytest.mark.parametrize("independent,chunk", [(False, 1), (False, 2), (False, 5), (True, None)])
+@pytest.mark.parametrize("objective", ["sharpe", "terminal"])
+def test_walk_forward_matches_naive_refit(strategy, bars, independent, chunk, objective):
+    data = bars(("AAA", "BBB"), n=260, step=1440)
+    geometry = folds(len(data), 80, 40, start=20)
+    result = WalkForward(strategy, POINTS, data, geometry, objective, independent,
+                         workers=2, chunk=chunk, cost=0.001).run()
+    chosen, curve = naive_walk_forward(strategy, data, geometry, objective, 0.001, independent, chunk)
+    assert result.folds["point"].tolist() == chosen
+    assert not result.errors
+    np.testing.assert_allclose(result.equity, curve, rtol=1e-10)
+    np.testing.assert_array_equal(result.epochs, data.epochs[geometry[0].test_start:geometry[-1].test_stop])
+
+
+def test_overlapping_test_windows_stitch_each_bar_once(strategy, bars):
+    data = bars(("AAA", "BBB"), n=260, step=1440)
+    geometry = folds(len(data), 80, 40, step=25, start=20)
+    result = WalkForward(strategy, POINTS, data, geometry, "terminal", workers=2, chunk=2).run()
+    chosen, curve = naive_walk_forward(strategy, data, geometry, "terminal", 0.0, False, 2)
+    assert result.folds["point"].tolist() == chosen
+    np.testing.assert_array_equal(result.epochs, data.epochs[geometry[0].test_start:geometry[-1].test_stop])
+    np.testing.assert_allclose(result.equity, curve, rtol=1e-10)
+
+
+@pytest.mark.parametrize("independent", [False, True])
+def test_errors_are_keyed_by_fold_and_point(strategy, bars, independent):
+    data = bars(("AAA", "BBB"), n=260, step=1440)
+    geometry = folds(len(data), 80, 40, start=20)
+    points = POINTS + [{"BAND": 0.0, "fast": 0}]
+    result = WalkForward(strategy, points, data, geometry, "terminal", independent,
+                         workers=2, chunk=2).run()
+    assert set(result.errors) == {(f.index, len(POINTS)) for f in geometry}
+    assert all(e.startswith("ZeroDivisionError") for e in result.errors.values())
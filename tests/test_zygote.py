@@ -0,0 +1,56 @@
+import os
+import sys
+
+import pytest
+
+from engine.loader import module_name
+from engine.zygote import _probe, measure
+
+STRATEGY = '''
+COUNT = 0
+
+
+class TradingStrategy:
+    def __init__(self):
+        global COUNT
+        COUNT += 1
+        if COUNT > 1:
+            raise RuntimeError("module state leaked between strategies")
+
+    def run(self, data):
+        if data["fail"]:
+            raise ValueError("bad bar")
+'''
+
+
+def _strategies(tmp_path):
+    (tmp_path / "good").mkdir()
+    (tmp_path / "good" / "main.py").write_text(STRATEGY)
+    (tmp_path / "broken").mkdir()
+    (tmp_path / "broken" / "main.py").write_text("raise ImportError('no such package')\n")
+    return [str(tmp_path / "good")] * 3 + [str(tmp_path / "broken")]
+
+
+def _cold(path, data):
+    # A first load in this process, as a fresh interpreter would do it.
+    sys.modules.pop(module_name(path), None)
+    return _probe((path, data, 0.0))["error"]
+
+
+@pytest.mark.parametrize("method", ["forkserver", "spawn"])
+def test_reports_match_a_cold_in_process_run(tmp_path, method):
+    paths = _strategies(tmp_path)
+    for fail in (False, True):
+        data = {"fail": fail}
+        reports = measure(paths, data, workers=2, method=method)
+        assert sorted(r["strategy"] for r in reports) == sorted(paths)
+        pids = {r["pid"] for r in reports}
+        assert len(pids) == len(paths) and os.getpid() not in pids
+        # Each child sees its strategy exactly as the first load in a fresh process would.
+        want = {p: _cold(p, data) for p in set(paths)}
+        for report in reports:
+            assert report["error"] == want[report["strategy"]]
+            if report["error"] is None:
+                assert min(report[k] for k in ("startup_ms", "import_ms", "init_ms", "first_bar_ms")) >= 0
+    assert want[paths[0]] == "ValueError: bad bar"
+    assert want[paths[-1]] == "ImportError: no such package"